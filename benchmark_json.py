@@ -0,0 +1,122 @@
+# benchmark_json.py
+"""
+Serialization time and bytes on the wire for typical API payloads, comparing
+Flask's default JSON provider with tubealgo.json_provider.OrjsonProvider,
+and the uncompressed body with gzip and brotli (tubealgo.compression).
+
+Usage: python benchmark_json.py [--repeat N]
+Payloads are synthetic but shaped like the real ones: a competitor package
+with two full 550-video lists (its shape before cursor pagination), the
+current package with 20-video first pages, and a dashboard main-data payload.
+"""
+
+import argparse
+import random
+import string
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from tubealgo.compression import BROTLI_AVAILABLE, compress_body
+from tubealgo.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+
+
+def _words(rng, count):
+    return ' '.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(count))
+
+
+def _video(rng, index, now):
+    duration = rng.choice([rng.randint(15, 60), rng.randint(120, 3600)])
+    return {
+        'id': f"vid{index:08d}",
+        'title': _words(rng, rng.randint(5, 12)).title(),
+        'thumbnail': f"https://i.ytimg.com/vi/vid{index:08d}/mqdefault.jpg",
+        'view_count': rng.randint(100, 5_000_000),
+        'like_count': rng.randint(0, 200_000),
+        'comment_count': rng.randint(0, 20_000),
+        'upload_date': (now - timedelta(hours=index * 13)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'duration_seconds': duration,
+        'is_short': duration <= 61,
+        'trending_status': rng.choice([None, None, None, '🔥 Trending']),
+    }
+
+
+def build_payloads(seed=7):
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    videos = [_video(rng, i, now) for i in range(550)]
+    details = {'id': 'UC' + 'x' * 22, 'Title': 'Example Channel', 'Subscribers': 1_250_000,
+               'Total Views': 310_000_000, 'Video Count': 550, 'description': _words(rng, 120),
+               'keywords': _words(rng, 30).split()}
+    package_common = {
+        'details': details,
+        'growth': {'1d': None, '7d': None},
+        'playlists': [{'id': f"PL{i}", 'title': _words(rng, 4), 'video_count': rng.randint(3, 80)} for i in range(25)],
+        'top_tags': [[_words(rng, 2), rng.randint(1, 40)] for _ in range(50)],
+        'category': 'Education',
+    }
+    full_package = {
+        **package_common,
+        'recent_videos_data': {'videos': sorted(videos, key=lambda v: v['upload_date'], reverse=True), 'nextPageToken': None},
+        'most_viewed_videos_data': {'videos': sorted(videos, key=lambda v: v['view_count'], reverse=True), 'nextPageToken': None},
+    }
+    paged_package = {
+        **package_common,
+        'recent_videos_data': {'videos': full_package['recent_videos_data']['videos'][:20], 'next_cursor': 'eyJzIjoxfQ'},
+        'most_viewed_videos_data': {'videos': full_package['most_viewed_videos_data']['videos'][:20], 'next_cursor': 'eyJzIjoxfQ'},
+    }
+    dashboard = {
+        'kpis': {'subscribers': 48_210, 'views': 3_120_554, 'videos': 212, 'subscribers_change': 312},
+        'growth_chart': {'labels': [(now - timedelta(days=d)).strftime('%d %b') for d in range(30, 0, -1)],
+                         'data': [48_000 + d * 7 for d in range(30)]},
+        'top_recent_videos': [_video(rng, 10_000 + i, now) for i in range(15)],
+        'ai_assistant': {'suggestions': [_words(rng, 14) for _ in range(5)]},
+        'goal': {'target': 50_000, 'current': 48_210, 'type': 'subscribers'},
+        'best_time_to_post': {'by_day': [rng.randint(0, 30) for _ in range(7)],
+                              'by_hour': [rng.randint(0, 20) for _ in range(24)]},
+    }
+    return {'package (full lists)': full_package, 'package (first pages)': paged_package, 'dashboard main-data': dashboard}
+
+
+def _time_response(provider, payload, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = provider.response(payload).get_data()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    orjson_provider = OrjsonProvider(app)
+    print(f"orjson available: {ORJSON_AVAILABLE}, brotli available: {BROTLI_AVAILABLE}, best of {args.repeat} runs\n")
+    header = f"{'payload':<24}{'default ms':>12}{'orjson ms':>12}{'speedup':>9}{'raw KB':>10}{'gzip KB':>10}{'br KB':>9}{'gzip ms':>9}{'br ms':>8}"
+    print(header)
+    print('-' * len(header))
+
+    with app.app_context():
+        for name, payload in build_payloads().items():
+            default_ms, default_body = _time_response(default_provider, payload, args.repeat)
+            orjson_ms, body = _time_response(orjson_provider, payload, args.repeat)
+            start = time.perf_counter()
+            gzipped = compress_body(body, 'gzip')
+            gzip_ms = (time.perf_counter() - start) * 1000
+            brotli_kb = brotli_ms = float('nan')
+            if BROTLI_AVAILABLE:
+                start = time.perf_counter()
+                brotli_kb = len(compress_body(body, 'br')) / 1024
+                brotli_ms = (time.perf_counter() - start) * 1000
+            print(f"{name:<24}{default_ms:>12.2f}{orjson_ms:>12.2f}{default_ms / orjson_ms:>8.1f}x"
+                  f"{len(default_body) / 1024:>10.1f}{len(gzipped) / 1024:>10.1f}{brotli_kb:>9.1f}{gzip_ms:>9.2f}{brotli_ms:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
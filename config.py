@@ -19,6 +19,11 @@ class Config:
     if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or 'sqlite:///local_dev.db'
+    # Optional read replica for read-only routes and Celery read phases (see tubealgo/db_router.py)
+    DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+    if DATABASE_REPLICA_URL and DATABASE_REPLICA_URL.startswith("postgres://"):
+        DATABASE_REPLICA_URL = DATABASE_REPLICA_URL.replace("postgres://", "postgresql://", 1)
+    SQLALCHEMY_REPLICA_URI = DATABASE_REPLICA_URL
 
     # Cashfree
     CASHFREE_APP_ID = os.environ.get('CASHFREE_APP_ID')
@@ -36,3 +41,14 @@ class Config:
     CELERY_BROKER_CONNECTION_RETRY = True
     CELERY_BROKER_CONNECTION_MAX_RETRIES = 10
     CELERY_TASK_IGNORE_RESULT = True
+
+    # Worker profile (interactive, batch, notifications or all); unset means consume every queue
+    CELERY_WORKER_PROFILE = os.environ.get('CELERY_WORKER_PROFILE')
+
+    # SystemLog rows older than this are moved into gzipped SystemLogArchive batches
+    SYSTEM_LOG_RETENTION_DAYS = int(os.environ.get('SYSTEM_LOG_RETENTION_DAYS', 30))
+
+    # JSON and HTML responses at least this large are gzip/brotli compressed (see tubealgo/compression.py).
+    # Turn off when a reverse proxy in front of the app already compresses.
+    RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'true').lower() != 'false'
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', 1024))
@@ -38,10 +38,14 @@ def create_all_tables():
                 Competitor, 
                 ChannelSnapshot, 
                 VideoSnapshot, 
+                VideoSnapshotHourly,
+                VideoSnapshotDaily,
+                ChannelVideo,
                 ContentIdea, 
                 SubscriptionPlan,
                 Payment,
                 SystemLog, 
+                SystemLogArchive,
                 DashboardCache,
                 Goal, 
                 ThumbnailTest,
@@ -49,7 +53,12 @@ def create_all_tables():
                 Coupon,
                 ApiCache,
                 APIKeyStatus,
-                SiteSetting
+                SiteSetting,
+                JobRun,
+                JobLease,
+                JobIdempotencyKey,
+                ReportArtifact,
+                ReportFile
             )
             print("   ✓ All models imported successfully")
             
@@ -82,6 +91,13 @@ def create_all_tables():
             seed_plans()
             print("   ✓ Initial data seeded")
             
+            print("\n6. Upgrading cache tables and indexes...")
+            # Runs here, once per deploy, not in every process's create_app
+            from tubealgo import upgrade_dashboard_cache_table, upgrade_table_indexes
+            upgrade_dashboard_cache_table()
+            upgrade_table_indexes()
+            print("   ✓ Cache tables and indexes up to date")
+            
             print("\n" + "=" * 60)
             print("DATABASE INITIALIZATION COMPLETE!")
             print("=" * 60)
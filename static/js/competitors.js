@@ -31,6 +31,8 @@ function competitorPage() {
         activeIndex: -1,
         selectedChannelTitle: '',
         isAdding: false,
+        onboarding: [], // Competitors still being resolved and prewarmed in the background
+        onboardingPoll: null,
         limit: -1,
         formError: '', // Shows error messages
         showIdeaModal: false,
@@ -60,7 +62,7 @@ function competitorPage() {
             this.$el.addEventListener('analyze-transcript', (event) => this.analyzeTranscript(event.detail.video)); //
         },
 
-        get currentCount() { return this.competitors.length; },
+        get currentCount() { return this.competitors.length + this.onboarding.length; },
         get limitReached() { return this.limit !== -1 && this.currentCount >= this.limit; },
 
         async handleAddCompetitor() {
@@ -95,8 +97,13 @@ function competitorPage() {
                 if (!response.ok) { //
                     throw new Error(data.error || 'An unknown error occurred.'); //
                 }
-                if (data.success && data.competitor) { //
+                if (data.success && data.job_id) { //
+                    this.onboarding.unshift({ job_id: data.job_id, title: this.selectedChannelTitle || data.query, stage: 'queued', done: 0, total: 0, status_url: data.status_url }); //
+                    this.watchOnboarding(); //
+                } else if (data.success && data.competitor) { //
                     this.competitors.unshift(data.competitor); //
+                }
+                if (data.success) { //
                     this.query = ''; //
                     if (this.$refs.hiddenIdInput) this.$refs.hiddenIdInput.value = ''; //
                     this.suggestions = []; //
@@ -109,6 +116,42 @@ function competitorPage() {
             }
         },
 
+        // Onboarding progress is polled: a long-lived stream would hold one of the few sync web workers.
+        watchOnboarding() {
+            if (!this.onboardingPoll) { //
+                this.onboardingPoll = setInterval(() => this.pollOnboarding(), 2500); //
+            }
+        },
+        pollOnboarding() {
+            this.onboarding.forEach(entry => { //
+                fetch(entry.status_url).then(res => res.json()).then(status => this.applyOnboardingStatus(status)).catch(() => {}); //
+            });
+        },
+        applyOnboardingStatus(status) {
+            const entry = this.onboarding.find(item => item.job_id === status.job_id); //
+            if (!entry) return; //
+            if (status.stage === 'ready' || status.stage === 'error') { //
+                this.onboarding = this.onboarding.filter(item => item.job_id !== status.job_id); //
+                if (status.stage === 'ready' && !this.competitors.some(c => c.id === status.competitor.id)) { //
+                    this.competitors.unshift(status.competitor); //
+                }
+                if (status.stage === 'error') this.formError = status.error; //
+                if (!this.onboarding.length) this.stopOnboardingWatch(); //
+                return;
+            }
+            entry.stage = status.stage; //
+            if (status.competitor) entry.title = status.competitor.channel_title; //
+            if (status.total) { entry.done = status.done; entry.total = status.total; } //
+        },
+        stopOnboardingWatch() {
+            if (this.onboardingPoll) { clearInterval(this.onboardingPoll); this.onboardingPoll = null; } //
+        },
+        onboardingLabel(entry) {
+            if (entry.stage === 'queued') return 'Waiting to start...'; //
+            if (entry.stage === 'resolving') return 'Finding channel...'; //
+            if (entry.stage === 'resolved') return 'Channel found, fetching videos...'; //
+            return `Preparing analysis (${entry.done}/${entry.total})...`; //
+        },
         fetchSuggestions() {
             if (this.query.length < 2) { this.suggestions = []; this.showSuggestions = false; return; } //
             this.loading = true; //
@@ -221,10 +264,13 @@ function competitorCard(competitor) {
         activeSort: 'date',
         activeFilter: 'all',
         allVideos: [],
+        videoPages: {},
         retryTimeout: null,
         ideaGenerationStatus: {}, //
 
         init() {
+            this.$watch('activeSort', () => this.loadVideoPage()); //
+            this.$watch('activeFilter', () => this.loadVideoPage()); //
             // Preload data if available in session storage
             const preloadData = sessionStorage.getItem('deepAnalysisPreload');
             if (preloadData) {
@@ -252,7 +298,8 @@ function competitorCard(competitor) {
         fetchData(retriesLeft = 0) {
             if (this.retryTimeout) clearTimeout(this.retryTimeout); //
             this.isLoading = true; //
-            fetch(`/api/competitor/${competitor.id}/data`) //
+            // Revalidates the browser's copy with its ETag; an unchanged package comes back as a 304.
+            fetch(`/api/competitor/${competitor.id}/data`, { cache: 'no-cache' }) //
                 .then(res => res.json()) //
                 .then(apiData => {
                     if ((apiData.error || !apiData.details) && retriesLeft > 0) { //
@@ -288,7 +335,7 @@ function competitorCard(competitor) {
                 .then(res => res.json())
                 .then(apiData => { //
                     if (apiData.error) { this.error = apiData.error; }
-                    else { this.data = apiData; this.processVideoSets(); this.isRefreshed = true; } //
+                    else { this.data = apiData; this.videoPages = {}; this.processVideoSets(); this.isRefreshed = true; } //
                 })
                 .catch(() => this.error = 'Failed to refresh data.') //
                 .finally(() => this.isRefreshing = false); //
@@ -304,7 +351,28 @@ function competitorCard(competitor) {
             this.allVideos = Object.values(allVideosDict).filter(Boolean); // Convert back to array
         },
 
+        videoPageKey() {
+            return `${this.activeSort}:${this.activeFilter}`; //
+        },
+
+        // Any sort/filter other than the embedded default is one 5-video page from the stored index.
+        loadVideoPage() {
+            const key = this.videoPageKey(); //
+            if (key === 'date:all' || this.videoPages[key]) return; //
+            const sortParams = { date: 'date', viewCount: 'views', most_comments: 'comments' }; //
+            const typeParams = { all: 'all', videos: 'long', shorts: 'shorts' }; //
+            const params = new URLSearchParams({ sort: sortParams[this.activeSort], type: typeParams[this.activeFilter], limit: 5 }); //
+            fetch(`/api/channel/${competitor.channel_id_youtube}/videos?${params}`) //
+                .then(res => res.ok ? res.json() : Promise.reject()) //
+                .then(page => { this.videoPages[key] = page.videos; }) //
+                .catch(() => {}); // Keep showing the locally sorted fallback
+        },
+
         get displayedVideos() {
+            const page = this.videoPages[this.videoPageKey()]; //
+            if (page) return page; //
+
+            // Until the page arrives, sort and filter the embedded first pages.
             let processed = [...this.allVideos]; //
 
             // Apply filter
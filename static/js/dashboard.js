@@ -14,6 +14,7 @@ function dashboard() {
             layout: null
         },
         chart: null,
+        pendingWidgets: [],
         activeChartMetric: 'subscribers',
         showGoalModal: false,
         goalError: '',
@@ -35,25 +36,47 @@ function dashboard() {
             this.fetchData();
         },
 
+        // Each widget has its own endpoint and cache, so cards fill in as
+        // their data arrives instead of waiting for the slowest one.
         fetchData() {
-            this.isLoading = true;
-            fetch(`/api/dashboard/main-data?t=${new Date().getTime()}`)
-                .then(res => res.json())
-                .then(apiData => {
-                    this.data = apiData;
-                    this.error = null;
-                    this.$nextTick(() => {
-                        this.applyLayout();
-                        this.renderChart();
-                        this.initSortable();
+            const pageData = typeof DASHBOARD_PAGE_DATA !== 'undefined' ? DASHBOARD_PAGE_DATA : {};
+            const widgets = pageData.widgets || [];
+            this.data.layout = pageData.layout || this.data.layout;
+            this.pendingWidgets = widgets.slice();
+            this.error = null;
+            this.isLoading = false;
+            this.$nextTick(() => {
+                this.applyLayout();
+                this.initSortable();
+            });
+
+            let failed = 0;
+            widgets.forEach(name => {
+                // Revalidated against the widget's ETag, so an unchanged widget costs a 304.
+                fetch(`/api/dashboard/widget/${name}`, { cache: 'no-cache' })
+                    .then(res => res.json().then(body => {
+                        if (!res.ok) throw new Error(body.error || 'Failed to load widget.');
+                        return body;
+                    }))
+                    .then(body => {
+                        this.data[name] = body.data;
+                        if (name === 'growth_chart') {
+                            this.$nextTick(() => this.renderChart());
+                        }
+                    })
+                    .catch(err => {
+                        console.error(`Failed to load dashboard widget '${name}':`, err);
+                        failed += 1;
+                        if (failed === widgets.length) this.error = err.message;
+                    })
+                    .finally(() => {
+                        this.pendingWidgets = this.pendingWidgets.filter(pending => pending !== name);
                     });
-                })
-                .catch(err => {
-                    this.error = err.message;
-                })
-                .finally(() => {
-                    this.isLoading = false;
-                });
+            });
+        },
+
+        isWidgetPending(name) {
+            return this.pendingWidgets.includes(name);
         },
 
         initSortable() {
@@ -0,0 +1,68 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from tubealgo import db
+from tubealgo.models import Competitor, Goal, User, YouTubeChannel
+from tubealgo.services import dashboard_service
+from tubealgo.services.dashboard_service import WIDGETS, get_widget
+
+
+class FakeSeries:
+    @classmethod
+    def fetch(cls, channel_ids, days):
+        return cls()
+
+    def chart_data(self, channel_id):
+        return {'labels': [], 'subscribers': [], 'views': []}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'dashboard.db'}"
+    app.config['SECRET_KEY'] = 'test'
+    db.init_app(app)
+
+    recent = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+    monkeypatch.setattr(dashboard_service, 'analyze_channel', lambda channel_id: {
+        'Subscribers': 1200, 'Total Views': 50000, 'Video Count': 40,
+    })
+    monkeypatch.setattr(dashboard_service, 'get_latest_videos', lambda channel_id, max_results: {
+        'videos': [{'id': f'{channel_id}-1', 'title': 'A recent video', 'upload_date': recent, 'view_count': 900}],
+    })
+    monkeypatch.setattr(dashboard_service, 'get_upload_schedule_analysis', lambda channel_id: {
+        'by_day': [1] * 7, 'by_hour': [1] * 24,
+    })
+    monkeypatch.setattr(dashboard_service, 'SnapshotSeries', FakeSeries)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(email='owner@example.com', password_hash='x', referral_code='REF1')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(YouTubeChannel(user_id=user.id, channel_id_youtube='UCowner', channel_title='Owner'))
+    db.session.add(Competitor(user_id=user.id, channel_id_youtube='UCcomp', channel_title='Rival', position=0))
+    db.session.add(Goal(user_id=user.id, goal_type='subscribers', target_value=2000, start_value=1000, is_active=True))
+    db.session.commit()
+    return user
+
+
+@pytest.mark.parametrize('name', list(WIDGETS))
+def test_every_widget_builds(app, user, name):
+    data = get_widget(app, user, name)
+
+    assert data is not None
+    assert dashboard_service.get_widget_etag(user.id, name) is not None
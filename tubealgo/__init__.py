@@ -1,7 +1,7 @@
 # tubealgo/__init__.py
 
 import os
-from flask import Flask, url_for, session, g, render_template, request
+from flask import Flask, url_for, session, g, render_template, request, abort
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user
 from dotenv import load_dotenv
@@ -16,10 +16,13 @@ from sqlalchemy.exc import OperationalError
 import pytz
 from flask_wtf.csrf import CSRFProtect, generate_csrf
 from flask_sse import sse
+from .db_router import RoutingSession, REPLICA_BIND_KEY
+from .json_provider import OrjsonProvider
+from .compression import compress_response
 
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 csrf = CSRFProtect()
 
@@ -105,6 +108,16 @@ def create_app():
     # Load configuration from config.py and .env file
     app.config.from_object(config.Config)
 
+    # orjson-backed jsonify (falls back to the stdlib encoder when needed)
+    app.json = OrjsonProvider(app)
+
+    # Optional read replica, used only by code wrapped in db_router.read_replica()
+    if app.config.get("SQLALCHEMY_REPLICA_URI"):
+        app.config["SQLALCHEMY_BINDS"] = {
+            **(app.config.get("SQLALCHEMY_BINDS") or {}),
+            REPLICA_BIND_KEY: app.config["SQLALCHEMY_REPLICA_URI"],
+        }
+
     # Create instance folder if it doesn't exist
     try:
         os.makedirs(app.instance_path, exist_ok=True)
@@ -129,6 +142,13 @@ def create_app():
         timezone='UTC',
         enable_utc=True,
     )
+
+    # Route user-triggered, batch and notification tasks to separate queues
+    from .services.task_queues import celery_queue_config, worker_profile_config, activate_worker_profile
+    celery.conf.update(**celery_queue_config())
+    worker_profile = app.config.get("CELERY_WORKER_PROFILE")
+    celery.conf.update(**worker_profile_config(worker_profile))
+    activate_worker_profile(worker_profile)
     
     # Define Celery beat schedule for periodic tasks
     celery.conf.beat_schedule = {
@@ -148,10 +168,22 @@ def create_app():
             'task': 'tubealgo.jobs.take_video_snapshots',
             'schedule': crontab(minute=30, hour='*/3'), # Run every 3 hours at xx:30
         },
+        'rollup-video-snapshots-hourly': {
+            'task': 'tubealgo.jobs.rollup_video_snapshots',
+            'schedule': crontab(minute=50, hour='*'), # Run every hour at xx:50
+        },
         'cleanup-old-snapshots-daily': {
             'task': 'tubealgo.jobs.cleanup_old_snapshots',
             'schedule': crontab(hour=1, minute=0, day_of_week='*'), # Run daily at 01:00 UTC
         },
+        'archive-system-logs-daily': {
+            'task': 'tubealgo.jobs.archive_system_logs',
+            'schedule': crontab(hour=1, minute=30), # Run daily at 01:30 UTC
+        },
+        'prune-old-reports-daily': {
+            'task': 'tubealgo.jobs.prune_old_reports',
+            'schedule': crontab(hour=1, minute=45), # Run daily at 01:45 UTC
+        },
     }
 
     # Configure Celery Task context to work within Flask app context
@@ -174,9 +206,23 @@ def create_app():
     limiter.init_app(app)
 
     # --- Request Hooks ---
+    from .services.last_seen_buffer import last_seen_buffer
+    from .services.notification_service import USER_CHANNEL_PREFIX, user_event_channel
+
+    @app.before_request
+    def authorize_user_stream():
+        """Only the owner may subscribe to a per-user SSE channel."""
+        if request.blueprint != 'sse':
+            return None
+        channel = request.args.get('channel', '')
+        if channel.startswith(USER_CHANNEL_PREFIX):
+            if not current_user.is_authenticated or channel != user_event_channel(current_user.id):
+                abort(403)
+        return None
+
     @app.before_request
     def before_request_handler():
-        """Update user's last_seen timestamp."""
+        """Record the user's last_seen timestamp."""
         if current_user.is_authenticated:
             # Update only periodically (e.g., every 5 minutes) to reduce DB writes
             five_minutes_ago = datetime.utcnow() - timedelta(minutes=5)
@@ -184,14 +230,11 @@ def create_app():
             last_seen_time = current_user.last_seen or datetime.utcnow() - timedelta(days=1)
 
             if last_seen_time < five_minutes_ago:
-                current_user.last_seen = datetime.utcnow()
-                try:
-                    # Attempt to commit without adding, as user object is already managed
-                    db.session.commit()
-                except Exception as e:
-                    db.session.rollback()
-                    # Log error more quietly in production
-                    app.logger.error(f"Error updating last_seen for user {current_user.id}: {e}")
+                # Buffered in memory and written in bulk by a background thread
+                last_seen_buffer.touch(current_user.id)
+
+    # Registered first so it runs after every other after_request hook
+    app.after_request(compress_response)
 
     @app.after_request
     def add_security_headers(response):
@@ -256,6 +299,7 @@ def create_app():
 
             # Seed plans only if the table exists (created by create_tables.py)
             seed_plans()
+            upgrade_api_cache_table()
 
         except Exception as e:
             # Log a warning, but allow the app to continue starting
@@ -376,7 +420,7 @@ def format_relative_time(dt_input):
 
 def seed_plans():
     """Seeds the database with default subscription plans if table exists and is empty."""
-    from .models import SubscriptionPlan
+    from .models import SubscriptionPlan, bump_plans_version
     from sqlalchemy import inspect
     try:
         inspector = inspect(db.engine)
@@ -400,6 +444,7 @@ def seed_plans():
                     has_comment_reply=True
                 )
                 db.session.add_all([free_plan, creator_plan, pro_plan])
+                bump_plans_version()
                 db.session.commit()
                 print("Plans seeded successfully.")
     except OperationalError as e:
@@ -408,3 +453,90 @@ def seed_plans():
     except Exception as e:
         print(f"Error seeding plans: {e}")
         db.session.rollback()
+
+def upgrade_dashboard_cache_table():
+    """
+    Recreates dashboard_cache if it predates per-widget rows or pre-serialized
+    payloads. It only holds cache data. Dropping a table is not safe while
+    other processes start up, so this runs once per deploy from create_tables.py
+    rather than in create_app.
+    """
+    from .models import DashboardCache
+    try:
+        inspector = inspect(db.engine)
+        table_name = DashboardCache.__tablename__
+        if not inspector.has_table(table_name):
+            return
+        existing = {column['name'] for column in inspector.get_columns(table_name)}
+        if {column.name for column in DashboardCache.__table__.columns} <= existing:
+            return
+        print("Recreating dashboard_cache table with the current columns...")
+        DashboardCache.__table__.drop(db.engine)
+        DashboardCache.__table__.create(db.engine)
+    except Exception as e:
+        print(f"Error upgrading dashboard_cache table: {e}")
+        db.session.rollback()
+
+def upgrade_api_cache_table():
+    """Adds api_cache's nullable pre-serialization columns in place, keeping cached API data."""
+    from .models import ApiCache
+    try:
+        inspector = inspect(db.engine)
+        table_name = ApiCache.__tablename__
+        if not inspector.has_table(table_name):
+            return
+        existing = {column['name'] for column in inspector.get_columns(table_name)}
+        for column in ApiCache.__table__.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            print(f"Adding api_cache.{column.name} column...")
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}'))
+    except Exception as e:
+        print(f"Error upgrading api_cache table: {e}")
+        db.session.rollback()
+
+def upgrade_table_indexes():
+    """
+    Creates indexes added to existing models after their tables were created;
+    db.create_all() skips tables that already exist, so it never adds them.
+    Building an index on a large table takes a while, so this runs once per
+    deploy from create_tables.py, and on PostgreSQL with CREATE INDEX
+    CONCURRENTLY so writes to the table are not blocked meanwhile.
+    """
+    from .models import VideoSnapshot, SystemLog
+    concurrently = db.engine.dialect.name == 'postgresql'
+    for model in (VideoSnapshot, SystemLog):
+        table = model.__table__
+        try:
+            inspector = inspect(db.engine)
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                print(f"Creating index {index.name} on {table.name}...")
+                _create_index(index, concurrently)
+        except Exception as e:
+            print(f"Error upgrading indexes on {table.name}: {e}")
+            db.session.rollback()
+
+def _create_index(index, concurrently):
+    from sqlalchemy.schema import CreateIndex
+    # CONCURRENTLY cannot run inside a transaction block.
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if not concurrently:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+            return
+        index.dialect_options['postgresql']['concurrently'] = True
+        try:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        except Exception:
+            # A failed concurrent build leaves an INVALID index behind, which
+            # IF NOT EXISTS would skip on the next deploy.
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {index.name}'))
+            raise
+        finally:
+            index.dialect_options['postgresql']['concurrently'] = False
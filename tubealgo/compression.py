@@ -0,0 +1,78 @@
+# tubealgo/compression.py
+"""
+Content-negotiated compression for JSON and HTML responses.
+
+Competitor packages and dashboard payloads run to hundreds of KB, so
+`compress_response` (an after_request hook) encodes any JSON or HTML body of
+at least RESPONSE_COMPRESSION_MIN_BYTES with brotli when the client accepts
+it and the module is installed, and with gzip otherwise. Smaller bodies,
+streamed responses (exports, SSE) and anything already encoded are left
+alone.
+
+A strong ETag describes one exact byte sequence, so a compressed response's
+ETag is turned into a weak one; If-None-Match uses weak comparison, so 304s
+keep working across encodings.
+"""
+
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html')
+DEFAULT_MIN_BYTES = 1024
+# Mid-range levels: most of the size win at a fraction of the CPU of the maximum.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _is_compressible(response):
+    return (
+        200 <= response.status_code < 300
+        and response.status_code != 204
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and 'Content-Encoding' not in response.headers
+    )
+
+
+def choose_encoding(accept_encodings):
+    """The best encoding we support from an Accept-Encoding header, or None."""
+    if BROTLI_AVAILABLE and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response):
+    if not current_app.config.get('RESPONSE_COMPRESSION_ENABLED', True) or not _is_compressible(response):
+        return response
+
+    # The body now depends on Accept-Encoding, even when this one stays plain.
+    response.vary.add('Accept-Encoding')
+    min_bytes = current_app.config.get('RESPONSE_COMPRESSION_MIN_BYTES', DEFAULT_MIN_BYTES)
+    if (response.content_length or 0) < min_bytes:
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    response.set_data(compress_body(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
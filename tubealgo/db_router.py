@@ -0,0 +1,100 @@
+# tubealgo/db_router.py
+"""
+Read-replica routing for the shared `db.session`.
+
+When DATABASE_REPLICA_URL is set, `create_app` registers it as the `replica`
+bind. Code that only reads can opt in with `read_replica()`, used either as a
+decorator on a view or as a `with` block around a Celery task's read phase:
+SELECTs issued inside it go to the replica, everything else to the primary.
+Lookups that decide between INSERT and UPDATE must see the latest committed
+rows, so write helpers wrap them in `primary()`, which overrides an enclosing
+`read_replica()`.
+
+Read-your-writes: once the session has flushed anything in the current
+transaction it stays on the primary, and after a committed write in a request
+the user's following requests read from the primary for
+READ_YOUR_WRITES_SECONDS, so they never see a replica that is still catching
+up on their own change. Without a replica configured every query uses the
+primary exactly as before.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND_KEY = 'replica'
+READ_YOUR_WRITES_SECONDS = 15
+_PRIMARY_PIN_SESSION_KEY = '_db_primary_until'
+
+_use_replica = ContextVar('use_read_replica', default=False)
+
+
+@contextmanager
+def read_replica():
+    """Route read-only queries made inside this block (or decorated view) to the replica."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def primary():
+    """Send every query made inside this block to the primary, even within read_replica()."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _primary_pinned():
+    if not has_request_context():
+        return False
+    return flask_session.get(_PRIMARY_PIN_SESSION_KEY, 0) > time.time()
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends reads to the replica bind when asked to."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not _use_replica.get():
+            return primary
+
+        replica = self._db.engines.get(REPLICA_BIND_KEY)
+        if replica is None or primary is not self._db.engines.get(None):
+            # No replica configured, or the table lives on another named bind.
+            return primary
+        if self._flushing or self.info.get('has_writes') or _primary_pinned():
+            return primary
+        if clause is None or not getattr(clause, 'is_select', False):
+            return primary
+        return replica
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_writes(session, flush_context):
+    session.info['has_writes'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['has_writes'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _pin_user_to_primary(session):
+    if session.info.pop('has_writes', False) and has_request_context():
+        flask_session[_PRIMARY_PIN_SESSION_KEY] = time.time() + READ_YOUR_WRITES_SECONDS
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _clear_session_writes(session):
+    session.info.pop('has_writes', None)
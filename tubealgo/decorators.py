@@ -4,8 +4,9 @@ from functools import wraps
 from flask import flash, redirect, url_for, abort, request, jsonify
 from flask_login import current_user
 from tubealgo import db
-from tubealgo.models import SubscriptionPlan
+from tubealgo.models import User, get_plan
 from datetime import date
+from sqlalchemy import case, func, update
 from .services.youtube_manager import get_user_videos, update_video_details, get_single_video
 
 # --- यहाँ बदलाव शुरू ---
@@ -14,6 +15,43 @@ from .services.youtube_manager import get_user_videos, update_video_details, get
 class RateLimitExceeded(Exception):
     pass
 
+# Daily counters that check_limits enforces, keyed by feature.
+DAILY_USAGE_FEATURES = {
+    'keyword_search': ('daily_keyword_searches', 'keyword_searches_limit', 'keyword searches'),
+    'ai_generation': ('daily_ai_generations', 'ai_generations_limit', 'AI generations'),
+}
+
+def consume_daily_usage(user_id, counter_name, limit):
+    """
+    Atomically counts one use of a daily feature. A single conditional UPDATE
+    resets the counters on a new day, increments this one and only matches
+    while it is below the limit (-1 means unlimited), so parallel requests
+    cannot overshoot. Returns the new count, or None if the limit is reached.
+    """
+    if limit == 0:
+        return None
+
+    users = User.__table__
+    today = date.today()
+    is_today = users.c.last_usage_date == today
+    current = func.coalesce(users.c[counter_name], 0)
+
+    values = {'last_usage_date': today, counter_name: case((is_today, current + 1), else_=1)}
+    for name, _, _ in DAILY_USAGE_FEATURES.values():
+        if name != counter_name:
+            values[name] = case((is_today, users.c[name]), else_=0)
+
+    stmt = update(users).where(users.c.id == user_id).values(**values)
+    if limit != -1:
+        stmt = stmt.where(db.or_(users.c.last_usage_date.is_(None), ~is_today, current < limit))
+
+    with db.engine.begin() as conn:
+        if conn.dialect.update_returning:
+            new_count = conn.execute(stmt.returning(users.c[counter_name])).scalar()
+        else:
+            new_count = 1 if conn.execute(stmt).rowcount else None
+    return new_count
+
 def check_limits(feature):
     def decorator(f):
         @wraps(f)
@@ -25,33 +63,23 @@ def check_limits(feature):
                 flash("Please log in to access this feature.", "error")
                 return redirect(url_for('auth.login'))
 
-            plan = SubscriptionPlan.query.filter_by(plan_id=current_user.subscription_plan).first()
-            if not plan:
-                plan = SubscriptionPlan.query.filter_by(plan_id='free').first()
-
-            if current_user.last_usage_date != date.today():
-                current_user.last_usage_date = date.today()
-                current_user.daily_keyword_searches = 0
-                current_user.daily_ai_generations = 0
+            plan = get_plan(current_user.subscription_plan)
 
             # 2. handle_limit_error को हटाकर RateLimitExceeded एरर को raise करें
             if feature == 'add_competitor' and (plan.competitors_limit != -1 and current_user.competitors.count() >= plan.competitors_limit):
                 raise RateLimitExceeded(f"You've reached the maximum of {plan.competitors_limit} competitors for your plan. Please upgrade.")
-            
-            elif feature == 'keyword_search':
-                if plan.keyword_searches_limit != -1 and current_user.daily_keyword_searches >= plan.keyword_searches_limit:
-                    raise RateLimitExceeded(f"You've reached your daily limit of {plan.keyword_searches_limit} keyword searches. Please upgrade.")
-                current_user.daily_keyword_searches += 1
-            
-            elif feature == 'ai_generation':
-                if plan.ai_generations_limit != -1 and current_user.daily_ai_generations >= plan.ai_generations_limit:
-                    raise RateLimitExceeded(f"You've reached your daily limit of {plan.ai_generations_limit} AI generations. Please upgrade.")
-                current_user.daily_ai_generations += 1
+
+            elif feature in DAILY_USAGE_FEATURES:
+                counter_name, limit_name, label = DAILY_USAGE_FEATURES[feature]
+                limit = getattr(plan, limit_name)
+                if consume_daily_usage(current_user.id, counter_name, limit) is None:
+                    raise RateLimitExceeded(f"You've reached your daily limit of {limit} {label}. Please upgrade.")
+                # The row was changed outside the session; reload the counters on next access.
+                db.session.expire(current_user._get_current_object(), ['last_usage_date'] + [name for name, _, _ in DAILY_USAGE_FEATURES.values()])
 
             elif feature == 'discover_tools' and not plan.has_discover_tools:
                 raise RateLimitExceeded("The Discover tool is a premium feature. Please upgrade to access it.")
 
-            db.session.commit()
             return f(*args, **kwargs)
         return decorated_function
     return decorator
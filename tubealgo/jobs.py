@@ -3,31 +3,52 @@
 
 import traceback
 import os
-from datetime import date, timedelta, datetime
+from datetime import date, datetime
 from flask import current_app
 import time
 import random
+import heapq
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from . import db, celery
+from .db_router import read_replica
 # --- बदलाव यहाँ: ChannelSnapshot और VideoSnapshot को इम्पोर्ट किया गया ---
-from .models import User, Competitor, ChannelSnapshot, DashboardCache, log_system_event, ThumbnailTest, VideoSnapshot #
+from .models import User, Competitor, ChannelSnapshot, log_system_event, ThumbnailTest, VideoSnapshot, ReportArtifact #
 from .services.video_fetcher import get_latest_videos
 from .services.channel_fetcher import analyze_channel
-from .services.notification_service import send_telegram_message
-from .services.ai_service import get_ai_video_suggestions, generate_motivational_suggestion
+from .services.notification_service import send_telegram_message, publish_user_event
+from .services.ai_service import generate_motivational_suggestion
 from .routes.utils import get_credentials
-from .services.youtube_manager import set_video_thumbnail, get_single_video, update_video_details
+from .services.youtube_manager import set_video_thumbnail, get_videos_for_edit, update_video_resource
+from .services.cache_manager import delete_from_cache
 from .services.analytics_service import get_video_ctr
+from .services.job_ledger import track_job_run, job_item_processed, job_item_failed
+from .services.job_lease import with_job_lease, check_lease, window_key, is_item_done, mark_item_done, purge_expired_idempotency_keys
+from .services.log_archive import archive_old_system_logs
+from .services.snapshot_service import rollup_hourly, rollup_daily, prune_rolled_up_snapshots, SnapshotSeries
+from .services.dashboard_service import build_kpis, store_widgets, invalidate_dashboard
+from .services.deep_analysis_service import compute_deep_analysis
+from .services.report_service import generate_report_artifact, prune_report_artifacts
+from .services.competitor_onboarding import onboard_competitor as run_competitor_onboarding
 from celery.schedules import crontab # crontab को इम्पोर्ट किया गया
 
 
 @celery.task
+@with_job_lease()
+@track_job_run
 def take_daily_snapshots():
     """हर दिन सभी उपयोगकर्ताओं के चैनलों के आँकड़ों का स्नैपशॉट लेता है।"""
     print("Celery Task: Running job to take daily channel snapshots...")
     users_with_channels = User.query.join(User.channel).all() #
+    window = window_key(24) #
 
     for user in users_with_channels: #
+        item_key = f"channel_snapshot:{user.id}:{window}" #
+        check_lease() #
+        if is_item_done(item_key): #
+            continue #
         try: #
             channel_data = analyze_channel(user.channel.channel_id_youtube) #
             if 'error' in channel_data: #
@@ -36,6 +57,7 @@ def take_daily_snapshots():
                     log_type='WARNING', #
                     details={'error': channel_data['error']} #
                 ) #
+                job_item_failed() #
                 continue #
 
             today_snapshot = ChannelSnapshot.query.filter_by( #
@@ -57,12 +79,16 @@ def take_daily_snapshots():
                 ) #
                 db.session.add(new_snapshot) #
 
+            invalidate_dashboard(user.id, 'channel_snapshot') #
             db.session.commit() #
+            mark_item_done(item_key) #
+            job_item_processed() #
             print(f"Successfully took snapshot for user: {user.email}") #
 
         except Exception as e: #
             db.session.rollback() #
             tb_str = traceback.format_exc() #
+            job_item_failed() #
             log_system_event( #
                  message=f"Error taking snapshot for user {user.email}", #
                 log_type='ERROR', #
@@ -73,20 +99,29 @@ def take_daily_snapshots():
 
 
 @celery.task
+@with_job_lease()
+@track_job_run
 def check_for_new_videos():
     """प्रतियोगियों के नए वीडियो की जांच करता है और टेलीग्राम पर सूचित करता है।"""
     print("Celery Task: Running job to check for new videos...") #
     users_with_telegram = User.query.filter(User.telegram_chat_id.isnot(None), User.telegram_notify_new_video == True).all() #
+    window = window_key(1) #
 
     for user in users_with_telegram: #
         print(f"Checking competitors for user: {user.email}") #
         competitors = user.competitors.all() #
 
         for comp in competitors: #
+            item_key = f"new_video_check:{comp.id}:{window}" #
+            check_lease() #
+            if is_item_done(item_key): #
+                continue #
             try: #
                 latest_videos_data = get_latest_videos(comp.channel_id_youtube, max_results=1) #
 
                 if not latest_videos_data or not latest_videos_data.get('videos'): #
+                    mark_item_done(item_key) #
+                    job_item_processed() #
                     continue #
 
                 latest_video = latest_videos_data['videos'][0] #
@@ -96,12 +131,11 @@ def check_for_new_videos():
                 if not comp.last_known_video_id: #
                     comp.last_known_video_id = video_id #
                     db.session.commit() #
-                    continue #
-
-                if comp.last_known_video_id != video_id: #
+                elif comp.last_known_video_id != video_id: #
                     print(f"Found new video for {comp.channel_title}: {video_title}") #
 
                     comp.last_known_video_id = video_id #
+                    invalidate_dashboard(user.id, 'new_competitor_video') #
                     db.session.commit() #
 
                     message = ( #
@@ -115,11 +149,16 @@ def check_for_new_videos():
                         ai_suggestion = generate_motivational_suggestion(video_title) #
                         message += f"\n\n---\n💡 *Your Motivational AI Assistant:*\n\n{ai_suggestion}" #
 
-                    send_telegram_message(user.telegram_chat_id, message) #
+                    send_telegram_notification.delay(user.telegram_chat_id, message) #
+
+                # Only once the new last_known_video_id is committed and the alert queued.
+                mark_item_done(item_key) #
+                job_item_processed() #
 
             except Exception as e: #
                 db.session.rollback() #
                 tb_str = traceback.format_exc() #
+                job_item_failed() #
                 log_system_event( #
                     message=f"Error checking new videos for competitor {comp.channel_title}", #
                     log_type='ERROR', #
@@ -130,76 +169,48 @@ def check_for_new_videos():
 
 
 @celery.task
+@with_job_lease()
+@track_job_run
 def update_all_dashboards():
     """सभी यूज़र्स के लिए डैशबोर्ड डेटा को बैकग्राउंड में रीफ्रेश और कैश करता है।"""
     print("Celery Task: Running job to update all user dashboards...") #
-    users_with_channels = User.query.join(User.channel).all() #
+    # The read phase can be served by the replica; writes below go to the primary.
+    with read_replica(): #
+        users_with_channels = User.query.join(User.channel).all() #
+        # Growth charts for every user come from a handful of batched queries.
+        growth_series = SnapshotSeries.fetch([user.channel.id for user in users_with_channels], days=30) #
+    window = window_key(4) #
 
     for user in users_with_channels: #
+        item_key = f"dashboard_refresh:{user.id}:{window}" #
+        check_lease() #
+        if is_item_done(item_key): #
+            continue #
         try: #
             print(f"Updating dashboard for user: {user.email}") #
             channel_id = user.channel.id #
 
             channel_data = analyze_channel(user.channel.channel_id_youtube) #
-            if 'error' in channel_data: continue #
-
-            kpis = {'subscribers': channel_data.get('Subscribers', 0), 'views': channel_data.get('Total Views', 0), 'videos': channel_data.get('Video Count', 0)} #
-
-            today = date.today() #
-            start_date = today - timedelta(days=29) #
-            snapshots = ChannelSnapshot.query.filter(ChannelSnapshot.channel_db_id == channel_id, ChannelSnapshot.date >= start_date).order_by(ChannelSnapshot.date.asc()).all() #
-            labels = [(start_date + timedelta(days=i)).strftime('%d %b') for i in range(30)] #
-            sub_data, view_data, last_subs, last_views = [], [], 0, 0 #
-            first_snapshot = ChannelSnapshot.query.filter(ChannelSnapshot.channel_db_id == channel_id, ChannelSnapshot.date < start_date).order_by(ChannelSnapshot.date.desc()).first() #
-            if first_snapshot: #
-                last_subs, last_views = first_snapshot.subscribers, first_snapshot.views #
-            elif snapshots: #
-                 last_subs, last_views = snapshots[0].subscribers, snapshots[0].views #
-            snapshot_dict = {s.date: s for s in snapshots} #
-            for i in range(30): #
-                current_date = start_date + timedelta(days=i) #
-                if current_date in snapshot_dict: #
-                    last_subs, last_views = snapshot_dict[current_date].subscribers, snapshot_dict[current_date].views #
-                sub_data.append(last_subs) #
-                view_data.append(last_views) #
-            growth_chart_data = {'labels': labels, 'subscribers': sub_data, 'views': view_data} #
-
-            videos_data = get_latest_videos(user.channel.channel_id_youtube, max_results=50) #
-            all_user_videos = videos_data.get('videos', []) #
-
-            latest_video = all_user_videos[0] if all_user_videos else None #
-            if latest_video and len(all_user_videos) > 1: #
-                other_videos = all_user_videos[1:10] #
-                avg_views = sum(v['view_count'] for v in other_videos) / len(other_videos) if other_videos else 0 #
-                performance = round(((latest_video['view_count'] - avg_views) / avg_views) * 100) if avg_views > 0 else 100 #
-                latest_video['performance_vs_avg'] = performance #
-            elif latest_video: #
-                 latest_video['performance_vs_avg'] = 100 #
-            top_videos = sorted([v for v in all_user_videos if 'view_count' in v], key=lambda x: x['view_count'], reverse=True)[:3] #
-
-            ai_suggestions = get_ai_video_suggestions(user, user_videos=all_user_videos) #
-
-            final_data_package = { #
-                'kpis': kpis, #
-                'growth_chart': growth_chart_data, #
-                'latest_video': latest_video, #
-                'top_videos': top_videos, #
-                'ai_suggestions': ai_suggestions #
-            } #
-
-            cache_entry = DashboardCache.query.filter_by(user_id=user.id).first() #
-            if not cache_entry: #
-                cache_entry = DashboardCache(user_id=user.id) #
-                db.session.add(cache_entry) #
-
-            cache_entry.data = final_data_package #
-            cache_entry.updated_at = datetime.utcnow() #
+            if 'error' in channel_data: #
+                job_item_failed() #
+                continue #
+
+            # Warm the channel widgets; goal progress and the combined payload
+            # depend on the KPIs and are rebuilt on the next dashboard load.
+            invalidate_dashboard(user.id, 'channel_snapshot') #
+            store_widgets(user.id, { #
+                'kpis': build_kpis(channel_data), #
+                'growth_chart': growth_series.chart_data(channel_id), #
+            }, commit=False) #
             db.session.commit() #
+            mark_item_done(item_key) #
+            job_item_processed() #
             print(f"Successfully updated dashboard for user: {user.email}") #
 
         except Exception as e: #
             db.session.rollback() #
             tb_str = traceback.format_exc() #
+            job_item_failed() #
             log_system_event( #
                 message=f"Error updating dashboard for user {user.email}", #
                 log_type='ERROR', #
@@ -210,15 +221,23 @@ def update_all_dashboards():
 
 
 @celery.task
+@track_job_run
 def perform_full_analysis(competitor_id):
-    """एक प्रतियोगी के लिए बैकग्राउंड में पूरा डेटा पैकेज लाता है और कैश करता है।"""
-    from .routes.api_routes import get_full_competitor_package #
+    """एक प्रतियोगी के लिए बैकग्राउंड में पूरा डेटा पैकेज लाता है और डीप-एनालिसिस व्यू मॉडल कैश करता है।"""
     print(f"Celery Task: Starting full analysis for competitor_id: {competitor_id}") #
     try: #
-        get_full_competitor_package(competitor_id, force_refresh=True) #
+        competitor = db.session.get(Competitor, competitor_id) #
+        if not competitor: #
+            print(f"Celery Task: Competitor {competitor_id} no longer exists, skipping analysis.") #
+            return #
+        result = compute_deep_analysis(competitor, force_refresh=True) #
+        if 'error' in result: #
+            raise Exception(result['error']) #
+        job_item_processed() #
         print(f"Celery Task: Successfully completed analysis for competitor_id: {competitor_id}") #
     except Exception as e: #
         tb_str = traceback.format_exc() #
+        job_item_failed() #
         log_system_event( #
             message=f"Celery task failed: Full analysis for competitor_id: {competitor_id}", #
             log_type='ERROR', #
@@ -226,11 +245,75 @@ def perform_full_analysis(competitor_id):
         ) #
 
 
+@celery.task
+@track_job_run
+def onboard_competitor(user_id, search_input, job_id):
+    """Resolves and adds a competitor, then prewarms its caches, reporting progress over SSE."""
+    status = run_competitor_onboarding(user_id, search_input, job_id) #
+    if status.get('stage') == 'ready': #
+        job_item_processed() #
+    else: #
+        job_item_failed() #
+
+
+@celery.task
+@track_job_run
+def generate_monthly_report(report_id):
+    """Renders a user's monthly PDF report, stores it and tells the user it is ready."""
+    artifact = db.session.get(ReportArtifact, report_id) #
+    if not artifact or artifact.status == 'ready': #
+        return #
+    user = db.session.get(User, artifact.user_id) #
+    if not user or not user.channel: #
+        artifact.status = 'failed' #
+        artifact.error = 'Channel not connected' #
+        db.session.commit() #
+        return #
+
+    try: #
+        generate_report_artifact(artifact, user, get_credentials(user)) #
+        job_item_processed() #
+        print(f"Celery Task: Monthly report {report_id} ready for user {user.id}") #
+    except Exception as e: #
+        db.session.rollback() #
+        job_item_failed() #
+        artifact.status = 'failed' #
+        artifact.error = str(e) #
+        artifact.completed_at = datetime.utcnow() #
+        db.session.commit() #
+        log_system_event( #
+            message=f"Monthly report generation failed for user {user.id}", #
+            log_type='ERROR', #
+            details={'report_id': report_id, 'error': str(e), 'traceback': traceback.format_exc()} #
+        ) #
+
+    publish_user_event(user.id, 'report', {'report_id': artifact.id, 'status': artifact.status, 'error': artifact.error}) #
+    if artifact.status == 'ready' and user.telegram_chat_id: #
+        send_telegram_notification.delay( #
+            user.telegram_chat_id, #
+            "📄 *Your monthly report is ready!*\n\nDownload it from the dashboard with the Monthly Report button." #
+        ) #
+
+
+
+@celery.task
+@track_job_run
+def send_telegram_notification(chat_id, message):
+    """Sends a Telegram message from the notifications queue so sweeps never wait on Telegram."""
+    result = send_telegram_message(chat_id, message) #
+    if result and result.get('ok'): #
+        job_item_processed() #
+    else: #
+        job_item_failed() #
+        print(f"Celery Task: Telegram notification to {chat_id} failed: {result}") #
+
+
 # --- Thumbnail A/B Testing Celery Jobs ---
 
 TEST_DURATION_HOURS = 24 #
 
 @celery.task(bind=True)
+@track_job_run
 def start_thumbnail_test(self, test_id):
     """A/B टेस्ट शुरू करता है: थंबनेल 'A' सेट करता है और अगले चरण को शेड्यूल करता है।"""
     with current_app.app_context(): #
@@ -257,13 +340,16 @@ def start_thumbnail_test(self, test_id):
 
             duration_seconds = TEST_DURATION_HOURS * 3600 #
             advance_thumbnail_test.apply_async(args=[test_id], countdown=duration_seconds) #
+            job_item_processed() #
             print(f"Test {test_id} advanced to 'running_a'. Next check scheduled in {TEST_DURATION_HOURS} hours.") #
         except Exception as e: #
             test.status = 'error_start' #
+            job_item_failed() #
             db.session.commit() #
             log_system_event(f"Error starting thumbnail test {test_id}", "ERROR", {'error': str(e), 'traceback': traceback.format_exc()}) #
 
 @celery.task(bind=True)
+@track_job_run
 def advance_thumbnail_test(self, test_id):
     """थंबनेल 'A' का परिणाम रिकॉर्ड करता है, थंबनेल 'B' सेट करता है, और अंतिम चरण शेड्यूल करता है।"""
     with current_app.app_context(): #
@@ -298,13 +384,16 @@ def advance_thumbnail_test(self, test_id):
 
             duration_seconds = TEST_DURATION_HOURS * 3600 #
             finalize_thumbnail_test.apply_async(args=[test_id], countdown=duration_seconds) #
+            job_item_processed() #
             print(f"Test {test_id} advanced to 'running_b'. Final check in {TEST_DURATION_HOURS} hours.") #
         except Exception as e: #
             test.status = 'error_advance' #
+            job_item_failed() #
             db.session.commit() #
             log_system_event(f"Error advancing thumbnail test {test_id}", "ERROR", {'error': str(e), 'traceback': traceback.format_exc()}) #
 
 @celery.task(bind=True)
+@track_job_run
 def finalize_thumbnail_test(self, test_id):
     """थंबनेल 'B' का परिणाम रिकॉर्ड करता है, विजेता की घोषणा करता है, और टेस्ट समाप्त करता है।"""
     with current_app.app_context(): #
@@ -343,18 +432,22 @@ def finalize_thumbnail_test(self, test_id):
             test.test_end_time = datetime.utcnow() #
             db.session.commit() #
 
+            job_item_processed() #
             print(f"Test {test_id} finalized. Winner: {test.winner.upper()}") #
 
             if user.telegram_chat_id: #
                 message = f"✅ आपका थंबनेल A/B टेस्ट वीडियो ID `{test.video_id}` के लिए पूरा हो गया है!\n\nविजेता: **थंबनेल {test.winner.upper()}**\n\nCTR A: `{test.result_a_ctr}%`\nCTR B: `{test.result_b_ctr}%`" #
-                send_telegram_message(user.telegram_chat_id, message) #
+                send_telegram_notification.delay(user.telegram_chat_id, message) #
 
         except Exception as e: #
             test.status = 'error_finalize' #
+            job_item_failed() #
             db.session.commit() #
             log_system_event(f"Error finalizing thumbnail test {test_id}", "ERROR", {'error': str(e), 'traceback': traceback.format_exc()}) #
 
 @celery.task
+@with_job_lease()
+@track_job_run
 def take_video_snapshots():
     """
     सभी प्रतियोगियों के हालिया वीडियो के व्यू काउंट्स को ट्रैक करता है
@@ -362,56 +455,137 @@ def take_video_snapshots():
     """
     print("Celery Task: Running job to take video snapshots for trend analysis...") #
 
-    all_competitors = Competitor.query.all() #
+    with read_replica(): #
+        all_competitors = Competitor.query.all() #
     if not all_competitors: #
         print("Celery Task: No competitors to track. Skipping.") #
         return #
 
     channel_ids_to_check = {comp.channel_id_youtube for comp in all_competitors} #
+    window = window_key(3) #
 
-    new_snapshots = [] #
+    # Each channel is committed and marked done on its own, so a retried or
+    # overlapping run skips channels that were already snapshotted this window.
+    saved_count = 0 #
     for channel_id in channel_ids_to_check: #
+        item_key = f"video_snapshots:{channel_id}:{window}" #
+        check_lease() #
+        if is_item_done(item_key): #
+            continue #
         try: #
             videos_data = get_latest_videos(channel_id, max_results=20) #
-            if 'error' in videos_data or not videos_data.get('videos'): #
+            if 'error' in videos_data: #
+                job_item_failed() #
+                continue #
+            if not videos_data.get('videos'): #
                 continue #
 
-            for video in videos_data['videos']: #
-                snapshot = VideoSnapshot( #
-                    video_id=video['id'], #
-                    view_count=video['view_count'] #
-                ) #
-                new_snapshots.append(snapshot) #
-        except Exception as e: #
-            log_system_event( #
-                message=f"Error fetching videos for snapshot, channel_id: {channel_id}", #
-                log_type='ERROR', #
-                details={'error': str(e)} #
-            ) #
-            continue #
-
-    if new_snapshots: #
-        try: #
+            new_snapshots = [VideoSnapshot(video_id=video['id'], view_count=video['view_count']) for video in videos_data['videos']] #
             db.session.bulk_save_objects(new_snapshots) #
             db.session.commit() #
-            print(f"Celery Task: Successfully saved {len(new_snapshots)} new video snapshots.") #
+            mark_item_done(item_key) #
+            saved_count += len(new_snapshots) #
+            job_item_processed() #
         except Exception as e: #
             db.session.rollback() #
+            job_item_failed() #
             log_system_event( #
-                message="Error saving bulk video snapshots to DB", #
+                message=f"Error taking video snapshots for channel_id: {channel_id}", #
                 log_type='ERROR', #
                 details={'error': str(e), 'traceback': traceback.format_exc()} #
             ) #
+            continue #
+
+    if saved_count: #
+        print(f"Celery Task: Successfully saved {saved_count} new video snapshots.") #
 
     print("Celery Task: Finished taking video snapshots.") #
 
 
+BULK_EDIT_CONCURRENCY = 4 #
+BULK_EDIT_MAX_RETRIES = 4 #
+BULK_EDIT_BACKOFF_FACTOR = 2 #
+
+
+def _parse_bulk_operations(operations):
+    """Normalizes the raw bulk-edit form values once for the whole job."""
+    return { #
+        'tags_to_add': [tag.strip() for tag in operations.get('tags_to_add', '').split(',') if tag.strip()], #
+        'tags_to_remove': {tag.strip().lower() for tag in operations.get('tags_to_remove', '').split(',') if tag.strip()}, #
+        'description_append': operations.get('description_append', '').strip(), #
+        'privacy_status': operations.get('privacy_status', '') #
+    } #
+
+
+def _apply_bulk_operations(video, ops):
+    """
+    Applies the bulk operations to a fetched video resource.
+    Returns the edited resource, or None when the operations would change nothing.
+    """
+    snippet = dict(video['snippet']) #
+    status = dict(video['status']) #
+    changed = False #
+
+    current_tags = snippet.get('tags', []) #
+    final_tags = [tag for tag in current_tags if tag.lower() not in ops['tags_to_remove']] #
+    existing_lower = {tag.lower() for tag in final_tags} #
+    for tag in ops['tags_to_add']: #
+        if tag.lower() not in existing_lower and tag.lower() not in ops['tags_to_remove']: #
+            final_tags.append(tag) #
+            existing_lower.add(tag.lower()) #
+    if final_tags != current_tags: #
+        snippet['tags'] = final_tags #
+        changed = True #
+
+    # Skip the append if it is already there, so a retried update never duplicates it.
+    description = snippet.get('description', '') #
+    if ops['description_append'] and not description.rstrip().endswith(ops['description_append']): #
+        snippet['description'] = f"{description}\n\n{ops['description_append']}" if description else ops['description_append'] #
+        changed = True #
+
+    if ops['privacy_status'] and ops['privacy_status'] != status.get('privacyStatus'): #
+        status['privacyStatus'] = ops['privacy_status'] #
+        if ops['privacy_status'] != 'private': #
+            status.pop('publishAt', None) #
+        changed = True #
+
+    if not changed: #
+        return None #
+    return {'id': video['id'], 'snippet': snippet, 'status': status} #
+
+
+def _bulk_edit_single_video(app, creds, video_id, video, ops):
+    """Runs in a worker thread: diffs one video and updates it only if needed."""
+    with app.app_context(): #
+        if video is None: #
+            fetched = get_videos_for_edit(creds, [video_id]) #
+            if 'error' in fetched: #
+                raise Exception(f"Failed to fetch video data: {fetched['error']}") #
+            video = fetched.get(video_id) #
+            if video is None: #
+                raise Exception("Video not found or you do not have permission to edit it.") #
+
+        edited = _apply_bulk_operations(video, ops) #
+        if edited is None: #
+            return 'skipped' #
+
+        update_result = update_video_resource(creds, edited) #
+        if 'error' in update_result: #
+            raise Exception(f"API update error: {update_result['error']}") #
+        return 'updated' #
+
+
 @celery.task
-def bulk_edit_videos(user_id, operations, video_ids):
+@track_job_run
+def bulk_edit_videos(user_id, operations, video_ids, job_id=None):
     """
-    Performs bulk editing of YouTube videos in the background with exponential backoff.
+    Performs bulk editing of YouTube videos in the background.
+    Videos are fetched in batches, diffed against the requested operations so
+    no-op updates are skipped, and updated with bounded concurrency. Failed
+    videos are retried with exponential backoff without holding up the rest.
+    Progress is published to the user's SSE channel as 'bulk_edit' events.
     """
-    from .models import User #
+    from .models import User
     user = User.query.get(user_id) #
     if not user: #
         log_system_event("Bulk edit failed: User not found", "ERROR", {'user_id': user_id}) #
@@ -420,97 +594,140 @@ def bulk_edit_videos(user_id, operations, video_ids):
     creds = get_credentials(user) #
     if not creds: #
         log_system_event("Bulk edit failed: Could not get credentials", "ERROR", {'user_id': user_id}) #
+        publish_user_event(user_id, 'bulk_edit', {'job_id': job_id, 'state': 'error', 'error': 'Could not get credentials'}) #
         if user.telegram_chat_id: #
-            send_telegram_message(user.telegram_chat_id, "❌ Bulk edit failed. Please reconnect your Google account in the dashboard.") #
+            send_telegram_notification.delay(user.telegram_chat_id, "❌ Bulk edit failed. Please reconnect your Google account in the dashboard.") #
         return #
 
-    updated_count = 0 #
-    failed_count = 0 #
+    ops = _parse_bulk_operations(operations) #
+    video_ids = list(dict.fromkeys(video_ids)) #
+    total = len(video_ids) #
+    counts = {'updated': 0, 'skipped': 0, 'failed': 0} #
+    updated_ids, failures, retried = [], {}, {} #
+
+    def report(video_id, outcome):
+        counts[outcome] += 1 #
+        if outcome == 'failed': #
+            job_item_failed() #
+        else: #
+            job_item_processed() #
+        publish_user_event(user_id, 'bulk_edit', { #
+            'job_id': job_id, 'state': 'progress', 'video_id': video_id, 'outcome': outcome, #
+            'done': sum(counts.values()), 'total': total, **counts #
+        }) #
+
+    # One videos.list call per 50 videos instead of one per video.
+    # If the batch fetch fails, each worker falls back to fetching its own video.
+    prefetched = get_videos_for_edit(creds, video_ids) #
+    if 'error' in prefetched: #
+        prefetched = {} #
+
+    app = current_app._get_current_object() #
+    pending = deque((video_id, 0) for video_id in video_ids) #
+    retry_heap = [] #
+    in_flight = {} #
+
+    with ThreadPoolExecutor(max_workers=BULK_EDIT_CONCURRENCY) as executor: #
+        while pending or retry_heap or in_flight: #
+            now = time.monotonic() #
+            while retry_heap and retry_heap[0][0] <= now: #
+                _, video_id, attempt = heapq.heappop(retry_heap) #
+                pending.append((video_id, attempt)) #
+
+            while pending and len(in_flight) < BULK_EDIT_CONCURRENCY: #
+                video_id, attempt = pending.popleft() #
+                # Retries always re-read the video so they diff against its latest state.
+                video = prefetched.get(video_id) if attempt == 0 else None #
+                future = executor.submit(contextvars.copy_context().run, _bulk_edit_single_video, app, creds, video_id, video, ops) #
+                in_flight[future] = (video_id, attempt) #
+
+            timeout = max(0, retry_heap[0][0] - time.monotonic()) if retry_heap else None #
+            if not in_flight: #
+                time.sleep(timeout or 0) #
+                continue #
 
-    # Exponential Backoff Parameters #
-    MAX_RETRIES = 4 #
-    BACKOFF_FACTOR = 2 #
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED) #
+            for future in done: #
+                video_id, attempt = in_flight.pop(future) #
+                try: #
+                    outcome = future.result() #
+                except Exception as e: #
+                    attempt += 1 #
+                    if attempt >= BULK_EDIT_MAX_RETRIES: #
+                        failures[video_id] = str(e) #
+                        report(video_id, 'failed') #
+                    else: #
+                        retried[video_id] = attempt #
+                        wait_time = BULK_EDIT_BACKOFF_FACTOR * (2 ** (attempt - 1)) + random.uniform(0, 1) #
+                        heapq.heappush(retry_heap, (time.monotonic() + wait_time, video_id, attempt)) #
+                    continue #
 
-    tags_to_add = [tag.strip() for tag in operations.get('tags_to_add', '').split(',') if tag.strip()] #
-    tags_to_remove = {tag.strip().lower() for tag in operations.get('tags_to_remove', '').split(',') if tag.strip()} #
-    desc_append = operations.get('description_append', '') #
-    new_privacy = operations.get('privacy_status', '') #
+                if outcome == 'updated': #
+                    updated_ids.append(video_id) #
+                report(video_id, outcome) #
 
-    for video_id in video_ids: #
-        retries = 0 #
-        while retries < MAX_RETRIES: #
-            try: #
-                # Step 1: Get the latest video data #
-                video_data = get_single_video(creds, video_id) #
-                if 'error' in video_data: #
-                    raise Exception(f"Failed to fetch video data: {video_data['error']}") #
-
-                snippet = video_data['snippet'] #
-                status = video_data['status'] #
-
-                # Step 2: Apply the operations #
-                current_tags = set(snippet.get('tags', [])) #
-                current_tags.update(tags_to_add) #
-                final_tags = [tag for tag in current_tags if tag.lower() not in tags_to_remove] #
-
-                new_description = snippet.get('description', '') #
-                if desc_append: #
-                    new_description += "\n\n" + desc_append #
-
-                final_privacy = new_privacy if new_privacy else status.get('privacyStatus') #
-
-                # Step 3: Update the video #
-                update_result = update_video_details( #
-                    credentials=creds, #
-                    video_id=video_id, #
-                    title=snippet.get('title'), #
-                    description=new_description, #
-                    tags=final_tags, #
-                    privacy_status=final_privacy #
-                ) #
+    if updated_ids: #
+        delete_from_cache(f"user_videos_list_v2:{user_id}", *[f"single_video_details:{vid}" for vid in updated_ids]) #
 
-                if 'error' in update_result: #
-                    raise Exception(f"API update error: {update_result['error']}") #
-                else: #
-                    updated_count += 1 #
-                    break #
+    if retried: #
+        log_system_event("Bulk edit: Some video updates needed retries", "WARNING", {'user_id': user_id, 'retries': retried}) #
+    if failures: #
+        log_system_event("Bulk edit: Video updates failed after max retries", "ERROR", {'user_id': user_id, 'failures': failures}) #
 
-            except Exception as e: #
-                retries += 1 #
-                if retries >= MAX_RETRIES: #
-                    failed_count += 1 #
-                    log_system_event("Bulk edit: Single video update failed after max retries", "ERROR", {'video_id': video_id, 'exception': str(e)}) #
-                    break #
-                else: #
-                    wait_time = BACKOFF_FACTOR * (2 ** (retries - 1)) + random.uniform(0, 1) #
-                    log_system_event(f"Bulk edit for video {video_id} failed. Retrying in {wait_time:.2f}s...", "WARNING", {'retry': retries, 'error': str(e)}) #
-                    time.sleep(wait_time) #
+    publish_user_event(user_id, 'bulk_edit', {'job_id': job_id, 'state': 'complete', 'done': total, 'total': total, **counts}) #
 
     if user.telegram_chat_id: #
         message = ( #
             f"✅ *Bulk Edit Complete!*\n\n" #
-            f"Successfully updated: *{updated_count} videos*\n" #
-            f"Failed to update: *{failed_count} videos*\n\n" #
+            f"Successfully updated: *{counts['updated']} videos*\n" #
+            f"Already up to date: *{counts['skipped']} videos*\n" #
+            f"Failed to update: *{counts['failed']} videos*\n\n" #
             f"Please check your YT Manager to see the changes." #
         ) #
-        send_telegram_message(user.telegram_chat_id, message) #
+        send_telegram_notification.delay(user.telegram_chat_id, message) #
 
 # --- बदलाव यहाँ: नया Celery Task जोड़ा गया ---
 @celery.task
+@with_job_lease()
+@track_job_run
+def rollup_video_snapshots():
+    """Compacts raw video snapshots into hourly and daily rollup tables."""
+    print("Celery Task: Running job to roll up video snapshots...") #
+    try: #
+        hourly_count = rollup_hourly() #
+        daily_count = rollup_daily() #
+        job_item_processed(hourly_count + daily_count) #
+        print(f"Celery Task: Rolled up {hourly_count} hourly and {daily_count} daily video snapshot buckets.") #
+    except Exception as e: #
+        db.session.rollback() #
+        log_system_event( #
+            message="Error during video snapshot rollup", #
+            log_type='ERROR', #
+            details={'error': str(e), 'traceback': traceback.format_exc()} #
+        ) #
+
+
+@celery.task
+@with_job_lease()
+@track_job_run
 def cleanup_old_snapshots():
-    """Removes API data snapshots older than 30 days."""
+    """
+    Rolls up raw video snapshots, then prunes raw and hourly rows past retention.
+    Daily rollups and ChannelSnapshot rows (already one per channel per day) are kept.
+    """
     print("Celery Task: Running job to clean up old snapshots...") #
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30) #
 
     try: #
-        # Purane Channel Snapshots delete karein #
-        deleted_channel_count = ChannelSnapshot.query.filter(ChannelSnapshot.date < thirty_days_ago.date()).delete() #
-
-        # Purane Video Snapshots delete karein #
-        deleted_video_count = VideoSnapshot.query.filter(VideoSnapshot.timestamp < thirty_days_ago).delete() #
-
-        db.session.commit() #
-        print(f"Celery Task: Cleaned up {deleted_channel_count} old channel snapshots and {deleted_video_count} old video snapshots.") #
+        # The rollup functions directly, not the task: calling the task would
+        # record a nested JobRun and take a second lease inside this one.
+        hourly_count = rollup_hourly() #
+        daily_count = rollup_daily() #
+        print(f"Celery Task: Rolled up {hourly_count} hourly and {daily_count} daily video snapshot buckets.") #
+        deleted_raw_count, deleted_hourly_count = prune_rolled_up_snapshots() #
+        job_item_processed(deleted_raw_count + deleted_hourly_count) #
+        print(f"Celery Task: Cleaned up {deleted_raw_count} raw video snapshots and {deleted_hourly_count} hourly rollups.") #
+        deleted_keys_count = purge_expired_idempotency_keys() #
+        print(f"Celery Task: Purged {deleted_keys_count} expired job idempotency keys.") #
 
     except Exception as e: #
         db.session.rollback() #
@@ -521,3 +738,41 @@ def cleanup_old_snapshots():
         ) #
     print("Celery Task: Finished cleaning up old snapshots.") #
 # --- बदलाव खत्म ---
+
+
+@celery.task
+@with_job_lease()
+@track_job_run
+def prune_old_reports():
+    """Deletes report artifacts past retention and the stored PDFs no longer referenced."""
+    print("Celery Task: Running job to prune old reports...") #
+    try: #
+        deleted_artifacts, deleted_files = prune_report_artifacts() #
+        job_item_processed(deleted_artifacts) #
+        print(f"Celery Task: Pruned {deleted_artifacts} report artifacts and {deleted_files} stored files.") #
+    except Exception as e: #
+        db.session.rollback() #
+        log_system_event( #
+            message="Error pruning old reports", #
+            log_type='ERROR', #
+            details={'error': str(e), 'traceback': traceback.format_exc()} #
+        ) #
+
+
+@celery.task
+@with_job_lease()
+@track_job_run
+def archive_system_logs():
+    """Moves SystemLog rows past retention into compressed SystemLogArchive batches."""
+    print("Celery Task: Running job to archive old system logs...") #
+    try: #
+        archived_count = archive_old_system_logs() #
+        job_item_processed(archived_count) #
+        print(f"Celery Task: Archived {archived_count} system log rows.") #
+    except Exception as e: #
+        db.session.rollback() #
+        log_system_event( #
+            message="Error archiving old system logs", #
+            log_type='ERROR', #
+            details={'error': str(e), 'traceback': traceback.format_exc()} #
+        ) #
@@ -0,0 +1,59 @@
+# tubealgo/json_provider.py
+"""
+orjson-backed JSON provider for `jsonify` and `app.json`.
+
+Output is equivalent to Flask's DefaultJSONProvider: keys are sorted when
+`sort_keys` is set, and dates, decimals and dataclasses still go through
+Flask's own `default` hook, so they keep the HTTP-date and string forms the
+frontend already parses. The one visible difference is that non-ASCII text
+is written as UTF-8 rather than \\u escapes.
+
+Anything orjson refuses (integers beyond 64 bits, a `default` that fails) is
+retried with the stdlib encoder, and calls that pass encoder keyword
+arguments go straight to it. Without orjson installed the provider behaves
+exactly like the default one.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+
+    def _orjson_options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, pretty=False):
+        """Serializes straight to UTF-8 bytes, the form a response body needs."""
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(pretty))
+            except TypeError:
+                pass
+        kwargs = {'indent': 2} if pretty else {}
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not ORJSON_AVAILABLE:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs or not ORJSON_AVAILABLE:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, pretty=pretty), mimetype=self.mimetype)
@@ -2,6 +2,10 @@
 
 from .. import db
 from datetime import datetime
+from types import SimpleNamespace
+import threading
+import time
+import uuid
 
 class Coupon(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -40,4 +44,60 @@ class SubscriptionPlan(db.Model):
     
     # === बदलाव यहाँ है: नया कॉलम जोड़ा गया ===
     has_comment_reply = db.Column(db.Boolean, nullable=False, default=False)
-    # === बदलाव यहाँ खत्म है ===
\ No newline at end of file
+    # === बदलाव यहाँ खत्म है ===
+
+
+# --- Process-local plan snapshot ---
+# Plans change only from the admin monetization pages, so every plan is held
+# in memory as a read-only namespace and reloaded when the version row changes,
+# the same way SiteSetting values are cached.
+PLANS_VERSION_KEY = '_plans_version'
+PLANS_VERSION_CHECK_SECONDS = 5
+
+_plans_lock = threading.Lock()
+_plans_snapshot = {'plans': None, 'version': None, 'checked_at': 0.0}
+
+def _current_plans():
+    from .system_models import SiteSetting
+    now = time.monotonic()
+    if _plans_snapshot['plans'] is not None and now - _plans_snapshot['checked_at'] < PLANS_VERSION_CHECK_SECONDS:
+        return _plans_snapshot['plans']
+
+    with _plans_lock:
+        if _plans_snapshot['plans'] is not None and now - _plans_snapshot['checked_at'] < PLANS_VERSION_CHECK_SECONDS:
+            return _plans_snapshot['plans']
+        version_row = db.session.get(SiteSetting, PLANS_VERSION_KEY)
+        version = version_row.value if version_row else None
+        if _plans_snapshot['plans'] is None or version != _plans_snapshot['version']:
+            columns = [c.name for c in SubscriptionPlan.__table__.columns]
+            _plans_snapshot['plans'] = {
+                plan.plan_id: SimpleNamespace(**{name: getattr(plan, name) for name in columns})
+                for plan in SubscriptionPlan.query.all()
+            }
+            _plans_snapshot['version'] = version
+        _plans_snapshot['checked_at'] = now
+        return _plans_snapshot['plans']
+
+def bump_plans_version():
+    """
+    Marks the subscription plans as changed. Call it before committing plan edits;
+    this process reloads on its next read and other processes within a few seconds.
+    """
+    from .system_models import SiteSetting
+    version = uuid.uuid4().hex
+    version_row = db.session.get(SiteSetting, PLANS_VERSION_KEY)
+    if version_row:
+        version_row.value = version
+    else:
+        db.session.add(SiteSetting(key=PLANS_VERSION_KEY, value=version))
+    with _plans_lock:
+        _plans_snapshot['plans'] = None
+        _plans_snapshot['checked_at'] = 0.0
+
+def get_plan(plan_id):
+    """
+    Returns a read-only snapshot of the plan, falling back to the 'free' plan
+    (or None if no plans exist). Use SubscriptionPlan directly to edit plans.
+    """
+    plans = _current_plans()
+    return plans.get(plan_id) or plans.get('free')
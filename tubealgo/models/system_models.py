@@ -2,6 +2,9 @@
 
 import os
 import json
+import threading
+import time
+import uuid
 from datetime import datetime
 from .. import db
 from sqlalchemy.exc import OperationalError, ProgrammingError
@@ -10,15 +13,38 @@ import traceback
 # --- SystemLog, log_system_event, is_admin_telegram_user ---
 class SystemLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     log_type = db.Column(db.String(50), nullable=False, index=True)
     message = db.Column(db.Text, nullable=False)
     details = db.Column(db.Text, nullable=True)
 
+    __table_args__ = (db.Index('ix_system_log_type_timestamp', 'log_type', 'timestamp'),)
+
+class SystemLogArchive(db.Model):
+    """
+    A gzipped JSON Lines batch of SystemLog rows from one day that aged out of
+    retention. Kept in the database so archives written by the Celery worker
+    survive redeploys.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    first_log_id = db.Column(db.Integer, nullable=False)
+    last_log_id = db.Column(db.Integer, nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    content = db.Column(db.LargeBinary, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+SYSTEM_LOG_TYPES = ['INFO', 'USER_ACTION', 'WARNING', 'ERROR', 'CRITICAL', 'QUOTA_EXCEEDED', 'PROJECT_QUOTA_EXCEEDED']
+
 def log_system_event(message, log_type='INFO', details=None, traceback_info=None):
-    """Logs an event to the database and sends a notification for critical errors."""
+    """
+    Queues an event for the buffered SystemLog writer, which stores it and sends
+    throttled Telegram alerts for critical types in the background.
+    Never blocks the caller on the database or on Telegram.
+    """
     try:
-        from ..services.notification_service import send_telegram_message
+        from ..services.log_writer import system_log_writer
 
         details_str = ""
         if details:
@@ -33,34 +59,15 @@ def log_system_event(message, log_type='INFO', details=None, traceback_info=None
         elif traceback_info:
              details_str = f"Traceback:\n{traceback_info}"
 
-        log_entry = SystemLog(
-            log_type=log_type,
-            message=message,
-            details=details_str
-        )
-        db.session.add(log_entry)
-        db.session.commit()
-
-        CRITICAL_LOG_TYPES = ['QUOTA_EXCEEDED', 'ERROR', 'PROJECT_QUOTA_EXCEEDED']
-        if log_type in CRITICAL_LOG_TYPES:
-            admin_chat_id = get_setting('ADMIN_TELEGRAM_CHAT_ID')
-            if admin_chat_id:
-                alert_title = "Critical Alert" if log_type == 'ERROR' else "Quota Alert"
-                icon = "🚨" if log_type == 'ERROR' else "⚠️"
-
-                telegram_message = (
-                    f"{icon} *{alert_title}: {log_type}*\n\n"
-                    f"*Message:* {message}\n\n"
-                )
-                if details_str:
-                    truncated_details = details_str[:1000] + ('...' if len(details_str) > 1000 else '')
-                    telegram_message += f"*Details:* ```\n{truncated_details}\n```"
-
-                send_telegram_message(admin_chat_id, telegram_message)
+        system_log_writer.enqueue({
+            'timestamp': datetime.utcnow(),
+            'log_type': log_type,
+            'message': message,
+            'details': details_str
+        })
 
     except Exception as e:
         print(f"!!! FAILED TO LOG SYSTEM EVENT (Original message: {message}): {e}\n{traceback.format_exc()}")
-        db.session.rollback()
 
 
 def is_admin_telegram_user(chat_id):
@@ -74,18 +81,59 @@ class SiteSetting(db.Model):
     key = db.Column(db.String(100), primary_key=True, unique=True, nullable=False)
     value = db.Column(db.Text, nullable=True)
 
+# --- Process-local settings snapshot ---
+# All SiteSetting rows are held in memory and reloaded only when the version
+# row changes. Admin saves bump the version; other processes notice within
+# SETTINGS_VERSION_CHECK_SECONDS at the cost of one primary-key lookup.
+SETTINGS_VERSION_KEY = '_settings_version'
+SETTINGS_VERSION_CHECK_SECONDS = 5
+
+_settings_lock = threading.Lock()
+_settings_snapshot = {'values': None, 'version': None, 'checked_at': 0.0}
+
+def _current_settings():
+    now = time.monotonic()
+    if _settings_snapshot['values'] is not None and now - _settings_snapshot['checked_at'] < SETTINGS_VERSION_CHECK_SECONDS:
+        return _settings_snapshot['values']
+
+    with _settings_lock:
+        if _settings_snapshot['values'] is not None and now - _settings_snapshot['checked_at'] < SETTINGS_VERSION_CHECK_SECONDS:
+            return _settings_snapshot['values']
+        version_row = db.session.get(SiteSetting, SETTINGS_VERSION_KEY)
+        version = version_row.value if version_row else None
+        if _settings_snapshot['values'] is None or version != _settings_snapshot['version']:
+            _settings_snapshot['values'] = {s.key: s.value for s in SiteSetting.query.all()}
+            _settings_snapshot['version'] = version
+        _settings_snapshot['checked_at'] = now
+        return _settings_snapshot['values']
+
+def bump_settings_version():
+    """
+    Marks the settings as changed. Call it before committing SiteSetting changes;
+    this process reloads on its next read and other processes within a few seconds.
+    """
+    version = uuid.uuid4().hex
+    version_row = db.session.get(SiteSetting, SETTINGS_VERSION_KEY)
+    if version_row:
+        version_row.value = version
+    else:
+        db.session.add(SiteSetting(key=SETTINGS_VERSION_KEY, value=version))
+    with _settings_lock:
+        _settings_snapshot['values'] = None
+        _settings_snapshot['checked_at'] = 0.0
+
 def get_setting(key, default=None):
     """
-    Safely gets a setting from the database.
+    Safely gets a setting from the in-memory settings snapshot.
     Returns default if the table doesn't exist or another DB error occurs.
     """
     try:
-        setting = SiteSetting.query.get(key)
-        if setting and setting.value is not None:
-            val_lower = setting.value.lower()
+        value = _current_settings().get(key)
+        if value is not None:
+            val_lower = value.lower()
             if val_lower == 'true': return True
             if val_lower == 'false': return False
-            return setting.value
+            return value
         return default
     except (OperationalError, ProgrammingError) as db_err:
         db.session.rollback()
@@ -111,6 +159,10 @@ class ApiCache(db.Model):
     cache_key = db.Column(db.String(255), unique=True, nullable=False, index=True)
     cache_value = db.Column(db.JSON, nullable=False)
     expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    # Set only for values served verbatim over HTTP: the JSON body exactly as
+    # the response sends it, and its ETag, both computed when it is written.
+    cache_bytes = db.Column(db.LargeBinary, nullable=True)
+    etag = db.Column(db.String(64), nullable=True)
 
 class APIKeyStatus(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -119,11 +171,18 @@ class APIKeyStatus(db.Model):
     last_failure_at = db.Column(db.DateTime, nullable=True, index=True)
 
 class DashboardCache(db.Model):
+    """One cached dashboard widget per user (see services/dashboard_service.WIDGETS)."""
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    widget = db.Column(db.String(50), nullable=False, default='main')
     data = db.Column(db.JSON, nullable=True)
+    # `data` pre-serialized for the API response, with its ETag, computed at write time.
+    payload = db.Column(db.LargeBinary, nullable=True)
+    etag = db.Column(db.String(64), nullable=True)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (db.UniqueConstraint('user_id', 'widget', name='_dashboard_user_widget_uc'),)
+
 # === नया मॉडल जोड़ा गया ===
 class CompetitorAnalysisCache(db.Model):
     """Stores cached analysis data for competitors"""
@@ -136,3 +195,62 @@ class CompetitorAnalysisCache(db.Model):
     )
     data = db.Column(db.JSON, nullable=True)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class JobRun(db.Model):
+    """One row per Celery task execution, used to track job duration and throughput."""
+    id = db.Column(db.Integer, primary_key=True)
+    task_name = db.Column(db.String(150), nullable=False)
+    celery_task_id = db.Column(db.String(155), nullable=True)
+    queue = db.Column(db.String(50), nullable=True)
+    wait_seconds = db.Column(db.Float, nullable=True) # time spent in the broker queue before starting
+    status = db.Column(db.String(20), nullable=False, default='running') # running, success, failed
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
+    items_processed = db.Column(db.Integer, nullable=False, default=0)
+    items_failed = db.Column(db.Integer, nullable=False, default=0)
+    api_units = db.Column(db.Integer, nullable=False, default=0)
+    peak_memory_kb = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (db.Index('ix_job_run_task_started', 'task_name', 'started_at'),)
+
+class JobLease(db.Model):
+    """A renewable lease that lets only one worker run a periodic task at a time."""
+    name = db.Column(db.String(150), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    heartbeat_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class JobIdempotencyKey(db.Model):
+    """Marks a unit of per-item task work as done so retries can skip it."""
+    key = db.Column(db.String(255), primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class ReportArtifact(db.Model):
+    """A generated report for one user and period. The file is a ReportFile keyed by its SHA-256 hash."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    report_type = db.Column(db.String(50), nullable=False, default='monthly')
+    period_key = db.Column(db.String(20), nullable=False) # e.g. the UTC date the report period ends on
+    status = db.Column(db.String(20), nullable=False, default='pending') # pending, ready, failed
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
+    filename = db.Column(db.String(255), nullable=True)
+    size_bytes = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    requested_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'report_type', 'period_key', name='_report_user_type_period_uc'),)
+
+class ReportFile(db.Model):
+    """
+    Generated report bytes, content-addressed by SHA-256. Kept in the database
+    so the web service can serve files the Celery worker rendered.
+    """
+    content_hash = db.Column(db.String(64), primary_key=True)
+    content = db.Column(db.LargeBinary, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
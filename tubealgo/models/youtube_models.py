@@ -62,4 +62,63 @@ class VideoSnapshot(db.Model):
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     view_count = db.Column(db.BigInteger, nullable=False)
 
-    __table_args__ = (db.UniqueConstraint('video_id', 'timestamp', name='_video_timestamp_uc'),)
\ No newline at end of file
+    __table_args__ = (
+        db.UniqueConstraint('video_id', 'timestamp', name='_video_timestamp_uc'),
+        # Serves "latest N snapshots per video" window queries straight from the index.
+        db.Index('ix_video_snapshot_latest', video_id, timestamp.desc(), view_count),
+    )
+
+class VideoSnapshotHourly(db.Model):
+    """Hourly rollup of raw VideoSnapshot rows for one video."""
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(50), nullable=False, index=True)
+    bucket_start = db.Column(db.DateTime, nullable=False, index=True)
+    min_views = db.Column(db.BigInteger, nullable=False)
+    max_views = db.Column(db.BigInteger, nullable=False)
+    last_views = db.Column(db.BigInteger, nullable=False)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=1)
+    vph = db.Column(db.Float, nullable=True)
+
+    __table_args__ = (db.UniqueConstraint('video_id', 'bucket_start', name='_video_hour_uc'),)
+
+class VideoSnapshotDaily(db.Model):
+    """Daily rollup of VideoSnapshotHourly rows, kept for long-term history."""
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(50), nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False, index=True)
+    min_views = db.Column(db.BigInteger, nullable=False)
+    max_views = db.Column(db.BigInteger, nullable=False)
+    last_views = db.Column(db.BigInteger, nullable=False)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=1)
+    vph = db.Column(db.Float, nullable=True)
+
+    __table_args__ = (db.UniqueConstraint('video_id', 'date', name='_video_date_uc'),)
+
+class ChannelVideo(db.Model):
+    """
+    Stored index of a channel's videos, refreshed from each competitor package
+    build and read by the cursor-paginated /api/channel/<id>/videos endpoint.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id_youtube = db.Column(db.String(100), nullable=False, index=True)
+    video_id = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(255), nullable=True)
+    thumbnail = db.Column(db.String(255), nullable=True)
+    upload_date = db.Column(db.DateTime, nullable=False)
+    view_count = db.Column(db.BigInteger, nullable=False, default=0)
+    like_count = db.Column(db.BigInteger, nullable=False, default=0)
+    comment_count = db.Column(db.BigInteger, nullable=False, default=0)
+    duration_seconds = db.Column(db.Integer, nullable=False, default=0)
+    is_short = db.Column(db.Boolean, nullable=False, default=False)
+    trending_status = db.Column(db.String(50), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('channel_id_youtube', 'video_id', name='_channel_video_uc'),
+        # One index per sort order, with video_id as the keyset tiebreaker.
+        db.Index('ix_channel_video_by_date', channel_id_youtube, upload_date, video_id),
+        db.Index('ix_channel_video_by_views', channel_id_youtube, view_count, video_id),
+        db.Index('ix_channel_video_by_comments', channel_id_youtube, comment_count, video_id),
+    )
@@ -5,6 +5,7 @@ from flask_login import login_required
 from . import admin_bp
 from ... import db
 from ...decorators import admin_required
+from ...db_router import read_replica
 from ...models import User, APIKeyStatus, get_config_value
 from sqlalchemy import func
 from datetime import date, datetime
@@ -13,6 +14,7 @@ import pytz
 @admin_bp.route('/')
 @login_required
 @admin_required
+@read_replica()
 def dashboard():
     total_users = User.query.count()
     subscribed_users = User.query.filter(User.subscription_plan != 'free').count()
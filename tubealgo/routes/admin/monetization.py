@@ -5,7 +5,7 @@ from flask_login import login_required
 from . import admin_bp
 from ... import db
 from ...decorators import admin_required
-from ...models import Payment, Coupon, SubscriptionPlan
+from ...models import Payment, Coupon, SubscriptionPlan, bump_plans_version
 # <<< बदलाव यहाँ है: PlanForm को SubscriptionPlanForm से बदला गया >>>
 from ...forms import CouponForm, SubscriptionPlanForm # Was PlanForm
 
@@ -116,6 +116,7 @@ def edit_plan(plan_id):
         try:
             # Update plan attributes from form
             form.populate_obj(plan) # Automatically update fields matching form names
+            bump_plans_version() # Invalidate cached plan limits in every process
             db.session.commit()
             flash(f"Plan '{plan.name}' updated successfully!", 'success')
             return redirect(url_for('admin.plans'))
@@ -7,9 +7,10 @@ from flask_wtf.csrf import generate_csrf, validate_csrf, ValidationError
 from . import admin_bp
 from ... import db
 from ...decorators import admin_required
+from ...db_router import read_replica
 from sqlalchemy import func, cast, Date, exc, text
 from datetime import date, timedelta, datetime
-from ...models import SystemLog, ApiCache, SiteSetting, get_config_value, User, get_setting, log_system_event, APIKeyStatus
+from ...models import SystemLog, ApiCache, SiteSetting, get_config_value, User, get_setting, log_system_event, APIKeyStatus, JobRun, bump_settings_version, SYSTEM_LOG_TYPES
 import json
 import google.generativeai as genai
 import pytz
@@ -58,18 +59,104 @@ def mask_api_key(key_name):
 @admin_bp.route('/logs')
 @login_required
 @admin_required
+@read_replica()
 def system_logs():
-    page = request.args.get('page', 1, type=int)
-    logs_pagination = None
+    # Keyset pagination over (timestamp, id) with no COUNT, so the page cost
+    # stays flat however many rows the table holds; the type filter is served
+    # by ix_system_log_type_timestamp (created on existing databases by
+    # upgrade_table_indexes at startup) and the message filter is prefix-only.
+    filters = {
+        'type': request.args.get('type', '').strip(),
+        'from': request.args.get('from', '').strip(),
+        'to': request.args.get('to', '').strip(),
+        'q': request.args.get('q', '').strip(),
+    }
+    before = request.args.get('before', '').strip()
+    per_page = 50
+    logs, next_cursor = [], None
     try:
-        logs_pagination = SystemLog.query.order_by(SystemLog.timestamp.desc()).paginate(page=page, per_page=25, error_out=False)
+        query = SystemLog.query
+        if filters['type'] in SYSTEM_LOG_TYPES:
+            query = query.filter(SystemLog.log_type == filters['type'])
+        if filters['from']:
+            query = query.filter(SystemLog.timestamp >= datetime.strptime(filters['from'], '%Y-%m-%d'))
+        if filters['to']:
+            query = query.filter(SystemLog.timestamp < datetime.strptime(filters['to'], '%Y-%m-%d') + timedelta(days=1))
+        if filters['q']:
+            prefix = filters['q'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(SystemLog.message.like(prefix + '%', escape='\\'))
+        if before:
+            before_ts, before_id = before.rsplit('|', 1)
+            before_ts = datetime.fromisoformat(before_ts)
+            query = query.filter(db.or_(
+                SystemLog.timestamp < before_ts,
+                db.and_(SystemLog.timestamp == before_ts, SystemLog.id < int(before_id))
+            ))
+
+        logs = query.order_by(SystemLog.timestamp.desc(), SystemLog.id.desc()).limit(per_page + 1).all()
+        if len(logs) > per_page:
+            logs = logs[:per_page]
+            next_cursor = f"{logs[-1].timestamp.isoformat()}|{logs[-1].id}"
+    except ValueError:
+        flash("Invalid date or page cursor in log filters.", "error")
     except (exc.OperationalError, exc.ProgrammingError) as e:
         flash("Could not load system logs. Database table might be missing.", "error")
         log_system_event("Failed to query SystemLog table", "ERROR", details=str(e))
         db.session.rollback()
+    return render_template('admin/system_logs.html', logs=logs, next_cursor=next_cursor,
+                           filters=filters, is_first_page=not before, log_types=SYSTEM_LOG_TYPES)
+
+
+
+@admin_bp.route('/jobs')
+@login_required
+@admin_required
+def job_runs():
+    page = request.args.get('page', 1, type=int)
+    task_name = request.args.get('task', '').strip()
+    task_names = []
+    try:
+        query = JobRun.query
+        if task_name:
+            query = query.filter(JobRun.task_name == task_name)
+        runs_pagination = query.order_by(JobRun.started_at.desc()).paginate(page=page, per_page=25, error_out=False)
+        task_names = [name for (name,) in db.session.query(JobRun.task_name).distinct().order_by(JobRun.task_name).all()]
+    except (exc.OperationalError, exc.ProgrammingError) as e:
+        flash("Could not load job runs. Database table might be missing.", "error")
+        log_system_event("Failed to query JobRun table", "ERROR", details=str(e))
+        db.session.rollback()
         from flask_sqlalchemy.pagination import Pagination
-        logs_pagination = Pagination(None, page, 25, 0, [])
-    return render_template('admin/system_logs.html', logs=logs_pagination)
+        runs_pagination = Pagination(None, page, 25, 0, [])
+    return render_template(
+        'admin/job_runs.html', runs=runs_pagination, task_names=task_names, selected_task=task_name,
+        queue_stats=_collect_queue_stats()
+    )
+
+
+def _collect_queue_stats():
+    """Current broker depth and last-hour wait percentiles for each Celery queue."""
+    from ...services.task_queues import ALL_QUEUES, get_queue_depths, get_queue_wait_stats
+    depths, waits = {}, {}
+    try:
+        depths = get_queue_depths(current_app.config['CELERY_BROKER_URL'])
+    except Exception as e:
+        print(f"WARNING: Could not read Celery queue depths: {e}")
+    try:
+        waits = get_queue_wait_stats(hours=1)
+    except (exc.OperationalError, exc.ProgrammingError) as e:
+        db.session.rollback()
+        print(f"WARNING: Could not read Celery queue wait times: {e}")
+    return [
+        {'queue': queue, 'depth': depths.get(queue), **waits.get(queue, {'count': 0, 'p50': None, 'p95': None, 'max': None})}
+        for queue in ALL_QUEUES
+    ]
+
+
+@admin_bp.route('/data/queue_stats')
+@login_required
+@admin_required
+def queue_stats_data():
+    return jsonify({'queues': _collect_queue_stats(), 'generated_at': datetime.utcnow().isoformat() + 'Z'})
 
 
 @admin_bp.route('/cache')
@@ -161,6 +248,7 @@ def site_settings():
             if settings_to_add:
                 db.session.bulk_save_objects(settings_to_add)
 
+            bump_settings_version()
             db.session.commit()
             flash('Site settings updated successfully!', 'success')
         except Exception as e:
@@ -221,6 +309,7 @@ def reset_setting(key_name):
     if setting:
         try:
             db.session.delete(setting)
+            bump_settings_version()
             db.session.commit()
             flash(f"Setting '{key_name}' removed from database. Using default.", 'success')
         except Exception as e:
@@ -285,6 +374,7 @@ def ai_settings():
             if settings_to_add:
                 db.session.bulk_save_objects(settings_to_add)
 
+            bump_settings_version()
             db.session.commit()
             flash('AI Settings updated successfully!', 'success')
             from ...services.ai_service import initialize_ai_clients
@@ -413,6 +503,7 @@ def test_ai_config():
 @admin_bp.route('/data/user_growth')
 @login_required
 @admin_required
+@read_replica()
 def user_growth_data():
     thirty_days_ago_dt = datetime.utcnow().date() - timedelta(days=29)
     user_counts = {}
@@ -448,6 +539,7 @@ def user_growth_data():
 @admin_bp.route('/data/plan_distribution')
 @login_required
 @admin_required
+@read_replica()
 def plan_distribution_data():
     plan_data = {}
     try:
@@ -468,3 +560,36 @@ def plan_distribution_data():
     labels = ['Free', 'Creator', 'Pro']
     data = [plan_data.get('free', 0), plan_data.get('creator', 0), plan_data.get('pro', 0)]
     return jsonify({'labels': labels, 'data': data})
+
+@admin_bp.route('/data/job_durations')
+@login_required
+@admin_required
+@read_replica()
+def job_duration_data():
+    start_date = datetime.utcnow().date() - timedelta(days=13)
+    task_name = request.args.get('task', '').strip()
+    daily = {}
+    try:
+        query = db.session.query(
+            JobRun.task_name, func.date(JobRun.started_at), func.avg(JobRun.duration_seconds)
+        ).filter(
+            JobRun.started_at >= start_date, JobRun.duration_seconds.isnot(None)
+        )
+        if task_name:
+            query = query.filter(JobRun.task_name == task_name)
+        for name, day, avg_duration in query.group_by(JobRun.task_name, func.date(JobRun.started_at)).all():
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            daily.setdefault(name, {})[day] = round(float(avg_duration), 2)
+    except (exc.OperationalError, exc.ProgrammingError) as e:
+        log_system_event("Error fetching job duration data", "ERROR", details=str(e))
+        db.session.rollback()
+        daily = {}
+
+    days = [start_date + timedelta(days=i) for i in range(14)]
+    labels = [d.strftime('%d %b') for d in days]
+    datasets = [
+        {'label': name.rsplit('.', 1)[-1], 'data': [per_day.get(d) for d in days]}
+        for name, per_day in sorted(daily.items())
+    ]
+    return jsonify({'labels': labels, 'datasets': datasets})
@@ -1,17 +1,19 @@
 # tubealgo/routes/analysis_routes.py
 
-from flask import render_template, request, redirect, url_for, flash, Blueprint, Response
+from flask import render_template, request, redirect, url_for, flash, Blueprint, Response, stream_with_context
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
 from tubealgo.models import Competitor
+from tubealgo.db_router import read_replica
 from tubealgo.services.channel_fetcher import (
-    analyze_channel, get_most_used_tags, get_upload_schedule_analysis
+    analyze_channel, get_most_used_tags
 )
 from tubealgo.services.video_fetcher import (
     get_full_video_details, get_all_channel_videos, 
     get_most_viewed_videos, get_latest_videos
 )
-from tubealgo.routes.api_routes import get_full_competitor_package
+from tubealgo.services.deep_analysis_service import get_deep_analysis
+from tubealgo.services.export_service import iter_video_rows, video_export_header, iter_csv, iter_xlsx
 from tubealgo.routes.utils import get_video_info_dict, sanitize_filename
 from datetime import datetime, timezone
 import json
@@ -25,6 +27,7 @@ analysis_bp = Blueprint('analysis', __name__)
 
 @analysis_bp.route('/deep-analysis/<string:channel_id>')
 @login_required
+@read_replica()
 def deep_analysis(channel_id):
     form = FlaskForm()
     competitor = Competitor.query.filter_by(user_id=current_user.id, channel_id_youtube=channel_id).first()
@@ -32,68 +35,23 @@ def deep_analysis(channel_id):
         flash("Competitor not found in your list.", "error")
         return redirect(url_for('competitor.competitors'))
     
-    data_package = get_full_competitor_package(competitor.id)
+    view_model = get_deep_analysis(competitor)
 
-    if 'error' in data_package:
-        flash(data_package['error'], 'error')
+    if 'error' in view_model:
+        flash(view_model['error'], 'error')
         return redirect(url_for('competitor.competitors'))
 
-    channel_data = data_package.get('details', {})
-    
-    recent_videos_data = data_package.get('recent_videos_data', {}) or {}
-    most_viewed_data = data_package.get('most_viewed_videos_data', {}) or {}
-    recent_videos_list = recent_videos_data.get('videos', [])
-    most_viewed_videos_list = most_viewed_data.get('videos', [])
-
-    top_tags = data_package.get('top_tags', [])
-    playlists = data_package.get('playlists', [])
-    
-    upload_schedule = get_upload_schedule_analysis(channel_id)
-    channel_keywords = channel_data.get('keywords', [])
-
-    upload_counts = {}
-    
-    all_videos_for_chart = get_all_channel_videos(channel_id)
-    if isinstance(all_videos_for_chart, list):
-        for video in all_videos_for_chart:
-            if video.get('upload_date'):
-                upload_month = datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00')).strftime('%Y-%m')
-                upload_counts[upload_month] = upload_counts.get(upload_month, 0) + 1
-    
-    sorted_months = sorted(upload_counts.keys(), reverse=True)[:6]
-    sorted_months.reverse()
-    upload_labels = [datetime.strptime(month, '%Y-%m').strftime('%b %Y') for month in sorted_months]
-    upload_data = [upload_counts.get(month, 0) for month in sorted_months]
-
-    processed_recent_videos = []
-    for v in recent_videos_list:
-        processed_recent_videos.append({
-            'id': v.get('id'), 'title': v.get('title'), 'thumbnail': v.get('thumbnail'),
-            'view_count': v.get('view_count', 0), 'like_count': v.get('like_count', 0),
-            'comment_count': v.get('comment_count', 0), 'upload_date': v.get('upload_date'),
-            'duration_seconds': v.get('duration_seconds', 0), 'is_short': v.get('is_short', False)
-        })
-
-    processed_most_viewed = []
-    for v in most_viewed_videos_list:
-        processed_most_viewed.append({
-            'id': v.get('id'), 'title': v.get('title'), 'thumbnail': v.get('thumbnail'),
-            'view_count': v.get('view_count', 0), 'like_count': v.get('like_count', 0),
-            'comment_count': v.get('comment_count', 0), 'upload_date': v.get('upload_date'),
-            'duration_seconds': v.get('duration_seconds', 0), 'is_short': v.get('is_short', False)
-        })
-
     return render_template('deep_analysis.html', 
                            form=form,
-                           channel_data=channel_data,
-                           top_tags=top_tags,
-                           playlists=playlists,
-                           upload_labels=json.dumps(upload_labels),
-                           upload_data=json.dumps(upload_data),
-                           recent_videos_json=json.dumps(processed_recent_videos),
-                           most_viewed_videos_json=json.dumps(processed_most_viewed),
-                           channel_keywords=channel_keywords,
-                           upload_schedule_json=json.dumps(upload_schedule),
+                           channel_data=view_model['channel_data'],
+                           top_tags=view_model['top_tags'],
+                           playlists=view_model['playlists'],
+                           upload_labels=json.dumps(view_model['upload_chart']['labels']),
+                           upload_data=json.dumps(view_model['upload_chart']['data']),
+                           recent_videos_json=json.dumps(view_model['recent_videos']),
+                           recent_videos_next_cursor=view_model['recent_videos_next_cursor'],
+                           channel_keywords=view_model['channel_keywords'],
+                           upload_schedule_json=json.dumps(view_model['upload_schedule']),
                            active_page='competitors')
 
 
@@ -107,42 +65,44 @@ def video_analysis(video_id):
     form = FlaskForm()
     return render_template('video_analysis.html', video=video_info, form=form)
 
+def _channel_export_filename(channel_id, suffix):
+    # The user's competitor row already has the title; avoid another channel fetch.
+    competitor = Competitor.query.filter_by(user_id=current_user.id, channel_id_youtube=channel_id).first()
+    title = competitor.channel_title if competitor else analyze_channel(channel_id).get('Title', 'channel')
+    return f"{sanitize_filename(title or 'channel')}_{suffix}"
+
+
+def _attachment_headers(filename):
+    ascii_filename = filename.encode('ascii', 'ignore').decode('ascii', 'ignore')
+    return {'Content-Disposition': 'attachment; filename*=UTF-8\'\'{}; filename="{}"'.format(quote(filename), ascii_filename)}
+
+
+def _channel_videos_for_export(channel_id):
+    all_videos = get_all_channel_videos(channel_id)
+    return all_videos if isinstance(all_videos, list) else []
+
+
 @analysis_bp.route('/analysis/export/excel/<string:channel_id>')
 @login_required
 def export_channel_videos_to_excel(channel_id):
     selected_columns = request.args.getlist('columns')
     if not selected_columns:
         return "Please select at least one column to export.", 400
-    all_videos = get_all_channel_videos(channel_id)
-    if not isinstance(all_videos, list):
-        all_videos = []
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Channel Video Data"
-    headers = [col.replace('_', ' ').title() for col in selected_columns]
-    ws.append(headers)
-    for video in all_videos:
-        row = []
-        for col in selected_columns:
-            if col == 'video_url':
-                row.append(f"https://www.youtube.com/watch?v={video.get('id', '')}")
-            elif col == 'upload_date':
-                date_str = video.get(col, '')
-                if date_str:
-                    row.append(datetime.fromisoformat(date_str.replace('Z', '')).strftime('%Y-%m-%d %H:%M'))
-                else:
-                    row.append('')
-            else:
-                row.append(video.get(col, 'N/A'))
-        ws.append(row)
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    channel_info = analyze_channel(channel_id)
-    filename = f"{sanitize_filename(channel_info.get('Title', 'channel'))}_videos_export.xlsx"
-    ascii_filename = filename.encode('ascii', 'ignore').decode('ascii', 'ignore')
-    headers = {'Content-Disposition': 'attachment; filename*=UTF-8\'\'{}; filename="{}"'.format(quote(filename), ascii_filename)}
-    return Response(buffer, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
+    rows = iter_video_rows(_channel_videos_for_export(channel_id), selected_columns)
+    headers = _attachment_headers(_channel_export_filename(channel_id, 'videos_export.xlsx'))
+    body = iter_xlsx(video_export_header(selected_columns), rows, "Channel Video Data")
+    return Response(stream_with_context(body), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
+
+@analysis_bp.route('/analysis/export/csv/<string:channel_id>')
+@login_required
+def export_channel_videos_to_csv(channel_id):
+    selected_columns = request.args.getlist('columns')
+    if not selected_columns:
+        return "Please select at least one column to export.", 400
+    rows = iter_video_rows(_channel_videos_for_export(channel_id), selected_columns)
+    headers = _attachment_headers(_channel_export_filename(channel_id, 'videos_export.csv'))
+    body = iter_csv(video_export_header(selected_columns), rows)
+    return Response(stream_with_context(body), mimetype='text/csv; charset=utf-8', headers=headers)
 
 @analysis_bp.route('/analysis/export_video/excel/<string:video_id>')
 @login_required
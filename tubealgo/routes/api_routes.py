@@ -2,28 +2,42 @@
 
 from flask import Blueprint, jsonify, request
 from flask_login import login_required, current_user
-# === बदलाव यहाँ है: VideoSnapshot और datetime को इम्पोर्ट किया गया ===
-from tubealgo.models import Competitor, ChannelSnapshot, VideoSnapshot
-from tubealgo.services.cache_manager import get_from_cache, set_to_cache
+from tubealgo import db
+from tubealgo.models import Competitor, ChannelSnapshot, log_system_event
+from tubealgo.db_router import read_replica
+from tubealgo.services.cache_manager import get_from_cache, set_to_cache, get_cache_etag, get_cached_body
 from tubealgo.services.channel_fetcher import (
     analyze_channel, get_channel_main_category, get_channel_playlists, 
     get_most_used_tags
 )
 from tubealgo.services.video_fetcher import (
-    get_latest_videos, get_most_viewed_videos, get_video_details,
-    get_all_channel_videos
+    get_most_viewed_videos, get_video_details, get_all_channel_videos
+)
+from tubealgo.services.video_index import (
+    index_channel_videos, query_channel_videos, has_channel_index,
+    build_channel_index, merge_channel_videos
 )
 from tubealgo.services.discovery_fetcher import search_for_channels
+from tubealgo.services.snapshot_service import get_video_view_history, compute_latest_vph
+from .utils import not_modified, with_etag, cached_json_response
 import json
 from datetime import date, timedelta, datetime, timezone
+from sqlalchemy.exc import IntegrityError
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# The package embeds only the first page of each list; the rest is paged
+# from the stored video index through /api/channel/<id>/videos.
+PACKAGE_VIDEO_PAGE_SIZE = 20
+
+def competitor_package_cache_key(competitor_id):
+    return f"competitor_package_v7:{competitor_id}" # वर्शन बदला गया
+
 def get_full_competitor_package(competitor_id, force_refresh=False):
     """
     Fetches ALL data for a competitor, including growth stats and trending status.
     """
-    cache_key = f"competitor_package_v6:{competitor_id}" # वर्शन बदला गया
+    cache_key = competitor_package_cache_key(competitor_id)
     if not force_refresh:
         cached_data = get_from_cache(cache_key)
         if cached_data:
@@ -44,52 +58,45 @@ def get_full_competitor_package(competitor_id, force_refresh=False):
     most_viewed_data_api = get_most_viewed_videos(comp.channel_id_youtube, max_results=50)
     most_viewed_videos_all = most_viewed_data_api.get('videos', [])
 
-    all_videos_dict = {}
-    for video in (latest_videos_all + most_viewed_videos_all):
-        if video and 'id' in video:
-            all_videos_dict[video['id']] = video
-    
-    all_videos_unique = list(all_videos_dict.values())
+    all_videos_unique = merge_channel_videos(latest_videos_all, most_viewed_videos_all)
 
-    # === बदलाव यहाँ से शुरू है: ट्रेंडिंग स्थिति की गणना ===
+    # Trending status: VPH for every video comes from one windowed snapshot query
+    vph_by_video = compute_latest_vph([video['id'] for video in all_videos_unique])
+    now_utc = datetime.now(timezone.utc)
     for video in all_videos_unique:
         video['trending_status'] = None
+        vph = vph_by_video.get(video['id'])
+        if vph is None or vph <= 500:
+            continue
         try:
-            # वीडियो के लिए नवीनतम दो स्नैपशॉट प्राप्त करें
-            snapshots = VideoSnapshot.query.filter_by(video_id=video['id']).order_by(VideoSnapshot.timestamp.desc()).limit(2).all()
-            
-            if len(snapshots) == 2:
-                latest_snapshot = snapshots[0]
-                previous_snapshot = snapshots[1]
-
-                views_gained = latest_snapshot.view_count - previous_snapshot.view_count
-                time_diff_seconds = (latest_snapshot.timestamp - previous_snapshot.timestamp).total_seconds()
-
-                if time_diff_seconds > 60: # कम से कम एक मिनट का अंतर हो
-                    vph = (views_gained / time_diff_seconds) * 3600
-                    
-                    upload_date = datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00'))
-                    days_since_upload = (datetime.now(timezone.utc) - upload_date).days
-
-                    # ट्रेंडिंग के लिए नियम
-                    if vph > 1000 and days_since_upload <= 3:
-                        video['trending_status'] = '🔥 Trending'
-                    elif vph > 500 and days_since_upload <= 7:
-                        video['trending_status'] = '🚀 Fast Growing'
-        except Exception:
-            # कोई त्रुटि होने पर चुपचाप जारी रखें
+            upload_date = datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00'))
+        except (KeyError, TypeError, ValueError):
             continue
-    # === बदलाव यहाँ खत्म है ===
-
-    recent_videos_data = {
-        'videos': sorted(all_videos_unique, key=lambda x: x.get('upload_date', ''), reverse=True),
-        'nextPageToken': None
-    }
-    
-    most_viewed_videos_data = {
-        'videos': sorted(all_videos_unique, key=lambda x: x.get('view_count', 0), reverse=True),
-        'nextPageToken': None
-    }
+        days_since_upload = (now_utc - upload_date).days
+
+        # ट्रेंडिंग के लिए नियम
+        if vph > 1000 and days_since_upload <= 3:
+            video['trending_status'] = '🔥 Trending'
+        elif vph > 500 and days_since_upload <= 7:
+            video['trending_status'] = '🚀 Fast Growing'
+
+    try:
+        index_channel_videos(comp.channel_id_youtube, all_videos_unique)
+        recent_videos_data = query_channel_videos(comp.channel_id_youtube, sort='date', limit=PACKAGE_VIDEO_PAGE_SIZE)
+        most_viewed_videos_data = query_channel_videos(comp.channel_id_youtube, sort='views', limit=PACKAGE_VIDEO_PAGE_SIZE)
+    except Exception as e:
+        db.session.rollback()
+        log_system_event("Could not index competitor videos", "WARNING",
+                         {'competitor_id': competitor_id, 'channel_id': comp.channel_id_youtube, 'error': str(e)})
+        # Without the index there is nothing to page through; ship the first pages only.
+        recent_videos_data = {
+            'videos': sorted(all_videos_unique, key=lambda x: x.get('upload_date') or '', reverse=True)[:PACKAGE_VIDEO_PAGE_SIZE],
+            'next_cursor': None
+        }
+        most_viewed_videos_data = {
+            'videos': sorted(all_videos_unique, key=lambda x: x.get('view_count', 0), reverse=True)[:PACKAGE_VIDEO_PAGE_SIZE],
+            'next_cursor': None
+        }
 
     playlists = get_channel_playlists(comp.channel_id_youtube)
     top_tags = get_most_used_tags(comp.channel_id_youtube, video_limit=50)
@@ -105,17 +112,30 @@ def get_full_competitor_package(competitor_id, force_refresh=False):
         'category': category
     }
     
-    set_to_cache(cache_key, final_data, expire_hours=4) 
+    # Served verbatim by get_competitor_data, so the response body is stored with it.
+    set_to_cache(cache_key, final_data, expire_hours=4, serialized=True)
     
     return final_data
 
 
 @api_bp.route('/competitor/<int:competitor_id>/data')
 @login_required
+@read_replica()
 def get_competitor_data(competitor_id):
     comp = Competitor.query.filter_by(id=competitor_id, user_id=current_user.id).first_or_404()
+    cache_key = competitor_package_cache_key(comp.id)
+    # Polls for an unchanged package get a 304 before the cached JSON is loaded;
+    # otherwise a cached package is sent as the bytes stored with it.
+    unchanged = not_modified(get_cache_etag(cache_key))
+    if unchanged:
+        return unchanged
+    cached = get_cached_body(cache_key)
+    if cached:
+        return cached_json_response(*cached)
+
     data_package = get_full_competitor_package(comp.id)
-    return jsonify(data_package)
+    # Error packages are not cached, so they get no ETag.
+    return with_etag(jsonify(data_package), get_cache_etag(cache_key))
 
 
 @api_bp.route('/competitor/<int:competitor_id>/refresh', methods=['POST'])
@@ -142,15 +162,56 @@ def api_video_details(video_id):
     return jsonify(details)
 
 
-@api_bp.route('/channel/<string:channel_id>/videos')
+@api_bp.route('/video/<string:video_id>/view-history')
 @login_required
-def get_channel_videos_paginated(channel_id):
-    page_token = request.args.get('page_token', None)
-    sort_by = request.args.get('sort_by', 'date')
+def api_video_view_history(video_id):
+    granularity = request.args.get('granularity', 'daily')
+    if granularity not in ('hourly', 'daily'):
+        return jsonify({'error': 'Invalid granularity.'}), 400
+    days = min(request.args.get('days', 30, type=int), 365)
+    return jsonify(get_video_view_history(video_id, granularity=granularity, days=days))
+
+
+def _date_arg(name, inclusive_end=False):
+    """Parses a YYYY-MM-DD query argument into a naive UTC datetime."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format.")
+    return day + timedelta(days=1) if inclusive_end else day
 
-    if sort_by == 'viewCount':
-        data = get_most_viewed_videos(channel_id, max_results=20, page_token=page_token)
-    else:
-        data = get_latest_videos(channel_id, max_results=20, page_token=page_token)
 
-    return jsonify(data)
\ No newline at end of file
+@api_bp.route('/channel/<string:channel_id>/videos')
+@login_required
+def get_channel_videos_paginated(channel_id):
+    """
+    Cursor-paginated videos from the stored index.
+    Query args: sort (date|views|comments), type (all|long|shorts),
+    from / to (YYYY-MM-DD, inclusive), cursor, limit.
+    """
+    # `sort_by=viewCount` is the pre-index spelling of sort=views.
+    sort = request.args.get('sort') or ('views' if request.args.get('sort_by') == 'viewCount' else 'date')
+    cursor = request.args.get('cursor')
+    try:
+        published_after = _date_arg('from')
+        published_before = _date_arg('to', inclusive_end=True)
+        if not cursor and not has_channel_index(channel_id):
+            # Building an index spends YouTube quota, so only for the user's own competitors.
+            if not Competitor.query.filter_by(user_id=current_user.id, channel_id_youtube=channel_id).first():
+                return jsonify({'error': 'Channel not found in your competitors.'}), 404
+            try:
+                build_channel_index(channel_id)
+            except IntegrityError:
+                # A parallel first request indexed the channel already.
+                db.session.rollback()
+        page = query_channel_videos(
+            channel_id, sort=sort, video_type=request.args.get('type', 'all'),
+            published_after=published_after, published_before=published_before,
+            cursor=cursor, limit=request.args.get('limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
\ No newline at end of file
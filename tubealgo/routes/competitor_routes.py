@@ -4,18 +4,21 @@ from flask import render_template, request, redirect, url_for, flash, Blueprint,
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
 from tubealgo import db
-from tubealgo.models import Competitor, SubscriptionPlan, User, ContentIdea
+from tubealgo.models import Competitor, get_plan, User, ContentIdea
 from tubealgo.services.channel_fetcher import analyze_channel
 from tubealgo.services.discovery_fetcher import (
     get_youtube_categories, get_top_channels_by_category, 
     find_similar_channels
 )
 from tubealgo.services.notification_service import send_telegram_photo_with_caption
+from tubealgo.services.competitor_onboarding import onboard_competitor, get_onboarding_status
+from tubealgo.services.dashboard_service import invalidate_dashboard
 from tubealgo.services.ai_service import generate_idea_from_competitor, analyze_transcript_with_ai
-from tubealgo.routes.api_routes import get_full_competitor_package
+from tubealgo.routes.api_routes import get_full_competitor_package, competitor_package_cache_key
 from tubealgo.routes.utils import get_video_info_dict
 from tubealgo.decorators import check_limits, RateLimitExceeded
 import json
+import uuid
 from youtube_transcript_api import YouTubeTranscriptApi
 
 
@@ -30,7 +33,7 @@ def competitors():
     # Pass the form object to the template for CSRF token
     form = FlaskForm() 
     
-    plan = SubscriptionPlan.query.filter_by(plan_id=current_user.subscription_plan).first() or SubscriptionPlan.query.filter_by(plan_id='free').first()
+    plan = get_plan(current_user.subscription_plan)
     
     return render_template('competitors.html', 
                            competitors=user_competitors_query,
@@ -43,7 +46,7 @@ def competitors():
 @login_required
 def add_competitor():
     try:
-        plan = SubscriptionPlan.query.filter_by(plan_id=current_user.subscription_plan).first() or SubscriptionPlan.query.filter_by(plan_id='free').first()
+        plan = get_plan(current_user.subscription_plan)
         limit = plan.competitors_limit if plan else 0
         if limit != -1 and current_user.competitors.count() >= limit:
             return jsonify({'success': False, 'error': f"You have reached your limit of {limit} competitors."}), 403
@@ -64,32 +67,18 @@ def add_competitor():
         if not search_input:
             return jsonify({'success': False, 'error': 'Please enter a channel name or URL.'}), 400
         
-        analysis_data = analyze_channel(search_input)
-        if 'error' in analysis_data:
-            return jsonify({'success': False, 'error': analysis_data['error']}), 400
-        
-        existing = Competitor.query.filter_by(user_id=current_user.id, channel_id_youtube=analysis_data['id']).first()
-        if existing:
-            return jsonify({'success': False, 'error': f"'{analysis_data['Title']}' is already in your list."}), 409
-
-        Competitor.query.filter_by(user_id=current_user.id).update({Competitor.position: Competitor.position + 1})
-        db.session.flush()
-
-        new_competitor = Competitor(
-            user_id=current_user.id, 
-            channel_id_youtube=analysis_data['id'], 
-            channel_title=analysis_data['Title'], 
-            thumbnail_url=analysis_data.get('Thumbnail URL', ''), 
-            position=1 
-        )
-        db.session.add(new_competitor)
-        db.session.commit()
+        if search_input.startswith('UC'):
+            existing = Competitor.query.filter_by(user_id=current_user.id, channel_id_youtube=search_input).first()
+            if existing:
+                return jsonify({'success': False, 'error': f"'{existing.channel_title}' is already in your list."}), 409
 
-        # *** UPDATED: Safe background task queuing ***
+        # Resolving the channel and warming its caches runs in the background;
+        # the page polls status_url for progress.
+        job_id = uuid.uuid4().hex
         try:
-            from tubealgo.jobs import perform_full_analysis
-            perform_full_analysis.apply_async(
-                args=[new_competitor.id],
+            from tubealgo.jobs import onboard_competitor as onboard_competitor_task
+            onboard_competitor_task.apply_async(
+                args=[current_user.id, search_input, job_id],
                 retry=True,
                 retry_policy={
                     'max_retries': 3,
@@ -99,23 +88,33 @@ def add_competitor():
                 }
             )
         except Exception as celery_error:
-            # Log but don't fail the request
+            # Without a broker, only add the competitor inline; warming every cache
+            # here would hold the request for the whole prefetch.
             print(f"WARNING: Background task failed to queue: {celery_error}")
-            # Data will load on-demand from frontend
+            status = onboard_competitor(current_user.id, search_input, job_id, prewarm=False)
+            if status.get('stage') == 'error':
+                return jsonify({'success': False, 'error': status['error']}), 400
+            return jsonify({'success': True, 'competitor': status['competitor']}), 200
 
         return jsonify({
             'success': True,
-            'competitor': {
-                "id": new_competitor.id, 
-                "channel_id_youtube": new_competitor.channel_id_youtube, 
-                "channel_title": new_competitor.channel_title
-            }
-        }), 200
+            'job_id': job_id,
+            'query': search_input,
+            'status_url': url_for('competitor.onboarding_status', job_id=job_id)
+        }), 202
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': f'An unexpected server error occurred: {str(e)}'}), 500
 
+@competitor_bp.route('/competitors/onboarding/<string:job_id>')
+@login_required
+def onboarding_status(job_id):
+    status = get_onboarding_status(job_id)
+    if not status or status.get('user_id') != current_user.id:
+        return jsonify({'job_id': job_id, 'stage': 'queued'})
+    return jsonify(status)
+
 @competitor_bp.route('/competitors/delete/<int:competitor_id>', methods=['POST'])
 @login_required
 def delete_competitor(competitor_id):
@@ -124,13 +123,14 @@ def delete_competitor(competitor_id):
         return redirect(url_for('competitor.competitors'))
     
     from tubealgo.models import ApiCache
-    cache_key = f"competitor_package_v6:{competitor_id}" 
+    cache_key = competitor_package_cache_key(competitor_id)
     ApiCache.query.filter_by(cache_key=cache_key).delete()
     
     deleted_position = comp.position
     db.session.delete(comp)
     
     Competitor.query.filter(Competitor.user_id == current_user.id, Competitor.position > deleted_position).update({Competitor.position: Competitor.position - 1})
+    invalidate_dashboard(current_user.id, 'competitors_changed')
     db.session.commit()
     flash(f"'{comp.channel_title}' has been removed.", 'success')
     return redirect(url_for('competitor.competitors'))
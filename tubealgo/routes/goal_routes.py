@@ -5,6 +5,7 @@ from flask_login import login_required, current_user
 from tubealgo import db
 from tubealgo.models import Goal, User
 from tubealgo.services.channel_fetcher import analyze_channel
+from tubealgo.services.dashboard_service import invalidate_dashboard
 from datetime import datetime
 
 goal_bp = Blueprint('goal', __name__, url_prefix='/api/goals')
@@ -58,6 +59,7 @@ def set_goal():
         is_active=True
     )
     db.session.add(new_goal)
+    invalidate_dashboard(current_user.id, 'goal_changed')
     db.session.commit()
 
     return jsonify({'success': True, 'message': 'Goal set successfully!'}), 201
\ No newline at end of file
@@ -19,7 +19,7 @@ from ..services.youtube_manager import (
 )
 from ..services.ai_service import generate_titles_and_tags, generate_description, generate_playlist_suggestions
 from ..decorators import check_limits, RateLimitExceeded
-from ..models import get_setting, log_system_event, SubscriptionPlan
+from ..models import get_setting, log_system_event, get_plan
 from .utils import get_credentials
 
 manager_bp = Blueprint('manager', __name__, url_prefix='/manage')
@@ -214,7 +214,7 @@ def generate_playlist_ideas():
                     'action_url': url_for('competitor.competitors', next=url_for('manager.manage_playlists'))
                 }), 400
 
-            plan = SubscriptionPlan.query.filter_by(plan_id=current_user.subscription_plan).first() or SubscriptionPlan.query.filter_by(plan_id='free').first()
+            plan = get_plan(current_user.subscription_plan)
             suggestion_limit = plan.playlist_suggestions_limit if plan else 3
             user_playlists = get_user_playlists(creds)
             user_playlist_titles = [p['title'] for p in user_playlists if 'title' in p]
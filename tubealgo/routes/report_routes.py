@@ -1,76 +1,52 @@
 # tubealgo/routes/report_routes.py
 
-from flask import Blueprint, render_template, Response
+import io
+
+from flask import Blueprint, render_template, send_file, jsonify, abort, url_for, flash, redirect
 from flask_login import login_required, current_user
-from datetime import datetime, timedelta, timezone
-from weasyprint import HTML
 
-from ..models import ChannelSnapshot
-from ..services.channel_fetcher import analyze_channel
-from ..services.youtube_manager import get_user_videos
-from .utils import get_credentials, sanitize_filename
+from ..models import ReportArtifact
+from ..services.report_service import request_monthly_report, is_artifact_available, load_artifact_content
 
 report_bp = Blueprint('report', __name__, url_prefix='/report')
 
+def _report_status(artifact):
+    status = {'report_id': artifact.id, 'status': artifact.status, 'error': artifact.error}
+    if is_artifact_available(artifact):
+        status['download_url'] = url_for('report.download_report', report_id=artifact.id)
+    return status
+
 @report_bp.route('/monthly')
 @login_required
 def generate_monthly_report():
-    # 1. आवश्यक डेटा इकट्ठा करें
-    today = datetime.now(timezone.utc)
-    thirty_days_ago = today - timedelta(days=30)
-    
-    # वर्तमान चैनल आँकड़े
-    channel_stats = analyze_channel(current_user.channel.channel_id_youtube)
-    if 'error' in channel_stats:
-        return "Could not generate report: " + channel_stats['error'], 500
-
-    # 30 दिन पहले के आँकड़े
-    past_snapshot = ChannelSnapshot.query.filter(
-        ChannelSnapshot.channel_db_id == current_user.channel.id,
-        ChannelSnapshot.date <= thirty_days_ago.date()
-    ).order_by(ChannelSnapshot.date.desc()).first()
-
-    # ग्रोथ की गणना करें
-    growth = {
-        "subscribers_gained": 0,
-        "views_gained": 0
-    }
-    if past_snapshot:
-        growth["subscribers_gained"] = channel_stats.get('Subscribers', 0) - past_snapshot.subscribers
-        growth["views_gained"] = channel_stats.get('Total Views', 0) - past_snapshot.views
+    if not current_user.channel:
+        flash("Please connect your YouTube channel to generate a report.", "error")
+        return redirect(url_for('dashboard.dashboard'))
 
-    # पिछले 30 दिनों के टॉप वीडियो
-    creds = get_credentials()
-    all_videos = get_user_videos(current_user, creds)
-    
-    top_videos = []
-    if isinstance(all_videos, list):
-        videos_in_period = [
-            v for v in all_videos 
-            if datetime.fromisoformat(v['published_at'].replace('Z', '+00:00')) >= thirty_days_ago
-        ]
-        top_videos = sorted(videos_in_period, key=lambda x: x.get('view_count', 0), reverse=True)[:5]
+    # PDF rendering runs in a Celery task; a report already built for this period is sent directly.
+    artifact = request_monthly_report(current_user)
+    if is_artifact_available(artifact):
+        return redirect(url_for('report.download_report', report_id=artifact.id))
 
-    # 2. HTML टेम्पलेट को डेटा के साथ रेंडर करें
-    report_period = f"{thirty_days_ago.strftime('%B %d, %Y')} - {today.strftime('%B %d, %Y')}"
-    generation_date = today.strftime('%B %d, %Y')
+    return render_template('reports/report_pending.html',
+                           report=_report_status(artifact),
+                           status_url=url_for('report.report_status', report_id=artifact.id))
 
-    html_string = render_template(
-        'reports/monthly_summary.html',
-        channel_stats=channel_stats,
-        report_period=report_period,
-        growth=growth,
-        top_videos=top_videos,
-        generation_date=generation_date
-    )
-
-    # 3. HTML से PDF बनाएं
-    pdf_file = HTML(string=html_string).write_pdf()
+@report_bp.route('/status/<int:report_id>')
+@login_required
+def report_status(report_id):
+    artifact = ReportArtifact.query.filter_by(id=report_id, user_id=current_user.id).first_or_404()
+    return jsonify(_report_status(artifact))
 
-    # 4. PDF को डाउनलोड के रूप में भेजें
-    filename = f"Monthly_Report_{sanitize_filename(channel_stats.get('Title', 'Channel'))}_{today.strftime('%Y_%m_%d')}.pdf"
-    
-    response = Response(pdf_file, mimetype='application/pdf')
-    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    return response
\ No newline at end of file
+@report_bp.route('/download/<int:report_id>')
+@login_required
+def download_report(report_id):
+    artifact = ReportArtifact.query.filter_by(id=report_id, user_id=current_user.id).first_or_404()
+    content = load_artifact_content(artifact) if artifact.status == 'ready' else None
+    if content is None:
+        abort(404)
+    # The file is stored under its content hash, so the hash is also a strong ETag.
+    response = send_file(io.BytesIO(content), mimetype='application/pdf', as_attachment=True,
+                         download_name=artifact.filename, etag=artifact.content_hash, conditional=True)
+    response.headers['Cache-Control'] = 'private, max-age=86400'
+    return response
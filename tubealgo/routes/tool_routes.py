@@ -7,10 +7,9 @@ from flask_wtf import FlaskForm
 from tubealgo import db
 from tubealgo.models import SearchHistory
 from tubealgo.services.suggestion_service import get_keyword_suggestions
+from tubealgo.services.keyword_research_service import research_keyword
 from tubealgo.services.ai_service import generate_titles_and_tags, generate_description, generate_script_outline
-from tubealgo.services.youtube_core import get_youtube_service
 from tubealgo.services.video_fetcher import get_trending_videos
-from collections import Counter
 from tubealgo.decorators import check_limits, RateLimitExceeded
 import re
 from youtube_transcript_api import YouTubeTranscriptApi
@@ -84,50 +83,14 @@ def keyword_research():
                 new_search = SearchHistory(user_id=current_user.id, topic=keyword_in)
                 db.session.add(new_search)
                 db.session.commit()
-                suggestions = get_keyword_suggestions(keyword_in)
-                top_video_tags = []
-                top_ranking_videos = []
-                competition_score = {"score": "N/A", "text": "Could not determine.", "color": "text-gray-500"}
-                try:
-                    youtube, error = get_youtube_service()
-                    if error:
-                        flash(f"API Error: {error}", "error")
-                    else:
-                        search_response = youtube.search().list(q=keyword_in, part='id', type='video', maxResults=5, order='relevance').execute()
-                        video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
-                        if video_ids:
-                            videos_response = youtube.videos().list(part='snippet,statistics,contentDetails', id=','.join(video_ids)).execute()
-                            all_tags = []
-                            total_views = 0
-                            high_view_count_videos = 0
-                            for item in videos_response.get('items', []):
-                                stats = item.get('statistics', {})
-                                view_count = int(stats.get('viewCount', 0))
-                                total_views += view_count
-                                if view_count > 500000:
-                                    high_view_count_videos += 1
-                                top_ranking_videos.append({
-                                    'id': item.get('id'),
-                                    'title': item.get('snippet', {}).get('title'),
-                                    'thumbnail': item.get('snippet', {}).get('thumbnails', {}).get('medium', {}).get('url'),
-                                    'channel_title': item.get('snippet', {}).get('channelTitle'),
-                                    'view_count': view_count,
-                                    'published_at': item.get('snippet', {}).get('publishedAt')
-                                })
-                                tags = item.get('snippet', {}).get('tags', [])
-                                if tags:
-                                    all_tags.extend(tags)
-                            if total_views > 2000000 and high_view_count_videos >= 2:
-                                competition_score = {"score": "High", "text": "Very competitive. Dominated by high-view videos.", "color": "text-red-500"}
-                            elif total_views > 500000 or high_view_count_videos >= 1:
-                                competition_score = {"score": "Medium", "text": "Moderately competitive. Opportunity exists.", "color": "text-yellow-500"}
-                            else:
-                                competition_score = {"score": "Low", "text": "Less competitive. Good opportunity to rank!", "color": "text-green-500"}
-                            if all_tags:
-                                tag_counts = Counter(all_tags)
-                                top_video_tags = tag_counts.most_common(30)
-                except Exception as e:
-                    flash(f"Could not fetch complete YouTube data: {e}", "error")
+                # Normalized, cached per (keyword, region); stages run concurrently on a miss.
+                research = research_keyword(keyword_in, request.form.get('region'))
+                for error in research['errors']:
+                    flash(error, "error")
+                suggestions = research['suggestions']
+                top_video_tags = research['top_video_tags']
+                top_ranking_videos = research['top_ranking_videos']
+                competition_score = research['competition_score']
 
                 # === 4. फॉर्म ऑब्जेक्ट को यहाँ भी पास करें ===
                 return render_template(
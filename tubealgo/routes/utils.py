@@ -2,6 +2,7 @@
 
 import re
 from datetime import datetime
+from flask import current_app, request
 from tubealgo.services.video_fetcher import get_full_video_details
 from tubealgo.services.channel_fetcher import get_most_used_tags as fetcher_get_most_used_tags
 from flask_login import current_user
@@ -110,4 +111,28 @@ def sanitize_filename(name):
     return name[:100] if name else "Untitled"
 
 def get_most_used_tags(channel_id, video_limit=50):
-    return fetcher_get_most_used_tags(channel_id, video_limit)
\ No newline at end of file
+    return fetcher_get_most_used_tags(channel_id, video_limit)
+
+# Sent with every ETagged JSON response: the browser may keep the body but
+# must revalidate it (If-None-Match) before each reuse.
+REVALIDATE_CACHE_CONTROL = 'private, no-cache'
+
+def not_modified(etag):
+    """A 304 response if the request's If-None-Match already holds `etag`, else None."""
+    # Weak comparison, as If-None-Match requires: compression weakens the ETag (see tubealgo/compression.py).
+    if not etag or not request.if_none_match.contains_weak(etag):
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+def cached_json_response(body, etag):
+    """Sends JSON bytes serialized when they were cached, with no parse/serialize round trip."""
+    return with_etag(current_app.response_class(body, mimetype=current_app.json.mimetype), etag)
+
+def with_etag(response, etag):
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
@@ -16,6 +16,7 @@ from ..services.youtube_manager import (
 )
 from ..models import get_setting, log_system_event, User
 from .utils import get_credentials
+from ..services.notification_service import user_event_channel
 from ..jobs import bulk_edit_videos
 from .. import db
 import traceback
@@ -449,8 +450,13 @@ def bulk_edit_route():
          log_system_event("Failed to update bulk edit counter", "ERROR", {'user_id': current_user.id, 'error': str(e)})
          return jsonify({'error': 'Could not process request due to a temporary issue (counter update failed).'}), 500
 
-    bulk_edit_videos.delay(current_user.id, operations, video_ids)
+    job_id = uuid.uuid4().hex
+    bulk_edit_videos.delay(current_user.id, operations, video_ids, job_id=job_id)
 
     limit_str = f"{int(limit)}/day" if limit != float('inf') else "Unlimited"
     updated_edits_used = edits_used_today + num_videos_to_edit
-    return jsonify({'message': f'Bulk update for {num_videos_to_edit} videos scheduled successfully! You have used {updated_edits_used}/{limit_str} of your daily edits for the {user_plan.capitalize()} plan. You will be notified on Telegram upon completion.'}), 202
+    return jsonify({
+        'message': f'Bulk update for {num_videos_to_edit} videos scheduled successfully! You have used {updated_edits_used}/{limit_str} of your daily edits for the {user_plan.capitalize()} plan. You will be notified on Telegram upon completion.',
+        'job_id': job_id,
+        'stream_url': url_for('sse.stream', channel=user_event_channel(current_user.id))
+    }), 202
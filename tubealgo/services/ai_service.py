@@ -3,6 +3,8 @@
 import os
 import openai
 import json
+import copy
+import hashlib
 import traceback
 from datetime import datetime
 import google.generativeai as genai
@@ -16,12 +18,25 @@ from .cache_manager import get_from_cache, set_to_cache
 # --- ---
 from tubealgo.models import get_config_value, get_setting, APIKeyStatus, log_system_event
 from tubealgo import db
+from tubealgo.db_router import primary
 import re # <-- रेगेक्स (regex) के लिए यह इम्पोर्ट ज़रूरी है
 
 # Global variables for managing AI clients
 gemini_keys = []
 openai_client = None
 
+# Opt-in response cache: a caller passes cache_feature only when its prompt is
+# built from shared inputs (a topic, a competitor's title). Features whose
+# prompts carry user data (channel name, social handles, own videos) are never
+# listed here, so their responses are not cached even if a caller opts in.
+AI_CACHE_TTL_HOURS = {
+    'motivational_suggestion': 24,
+    'idea_from_competitor': 24,
+    'titles_and_tags': 12,
+    'idea_set': 12,
+}
+AI_CACHE_KEY_VERSION = 'v1'
+
 def _mask_gemini_key(key):
     """Masks a Gemini API key for logging."""
     if isinstance(key, str) and len(key) > 8:
@@ -51,6 +66,8 @@ def initialize_ai_clients():
         print("INFO: Initializing OpenAI Client.")
         openai_client = openai.OpenAI(api_key=openai_key)
 
+# Key status is read and upserted here, so it must never come from a lagging replica.
+@primary()
 def get_next_gemini_client():
     """
     Finds a valid, active Gemini key, configures the service, and returns it.
@@ -137,10 +154,41 @@ def get_next_gemini_client():
     return None
 
 
-def generate_ai_response(system_prompt, user_prompt, is_json=False):
+def _ai_cache_key(feature, system_prompt, user_prompt, is_json):
+    model_name = get_config_value('SELECTED_AI_MODEL', 'gemini-1.5-flash-latest')
+    raw = json.dumps([system_prompt, user_prompt, model_name, bool(is_json)], ensure_ascii=False)
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    return f"ai_response_{AI_CACHE_KEY_VERSION}:{feature}:{digest}"
+
+
+def _is_ai_error(response):
+    if isinstance(response, dict):
+        return 'error' in response
+    return isinstance(response, str) and response.startswith('Error:')
+
+
+def generate_ai_response(system_prompt, user_prompt, is_json=False, cache_feature=None):
     """
     Generates a response from the AI, using the robust key management system.
+    With a cache_feature listed in AI_CACHE_TTL_HOURS, identical prompts for
+    the same model are answered from the cache; errors are never cached.
     """
+    ttl_hours = AI_CACHE_TTL_HOURS.get(cache_feature)
+    if not ttl_hours:
+        return _generate_ai_response(system_prompt, user_prompt, is_json)
+
+    cache_key = _ai_cache_key(cache_feature, system_prompt, user_prompt, is_json)
+    cached = get_from_cache(cache_key)
+    if cached is not None:
+        # Callers personalize results in place (e.g. adding the channel name tag).
+        return copy.deepcopy(cached)
+    response = _generate_ai_response(system_prompt, user_prompt, is_json)
+    if response and not _is_ai_error(response):
+        set_to_cache(cache_key, copy.deepcopy(response), expire_hours=ttl_hours)
+    return response
+
+
+def _generate_ai_response(system_prompt, user_prompt, is_json=False):
     gemini_model = get_next_gemini_client() # अब यह मॉडल ऑब्जेक्ट लौटाता है
 
     if gemini_model:
@@ -243,7 +291,7 @@ def generate_idea_set(topic, language='English', description=None, video_type='a
         "Return your response as a single, valid JSON object with a single top-level key: `ideas`. The value of `ideas` should be the array of the 3 idea objects."
     )
     
-    return generate_ai_response(system_prompt, user_prompt, is_json=True)
+    return generate_ai_response(system_prompt, user_prompt, is_json=True, cache_feature='idea_set')
 
 # --- NEW FUNCTION FOR RETENTION INSIGHTS ---
 # (यह फ़ंक्शन जैसा था वैसा ही रहता है)
@@ -343,7 +391,10 @@ def generate_titles_and_tags(user, topic, exclude_tags=None):
         "Return a single, valid JSON object with two top-level keys: 'titles' (containing the array of title objects) and 'tags' (containing the tag object with its categories)."
     )
     
-    return generate_ai_response(system_prompt, user_prompt, is_json=True)
+    # The prompt only carries the topic, so popular topics share one response.
+    # A regenerate (exclude_tags given) asks for a fresh answer instead.
+    cache_feature = None if exclude_tags else 'titles_and_tags'
+    return generate_ai_response(system_prompt, user_prompt, is_json=True, cache_feature=cache_feature)
 
 # (यह फ़ंक्शन जैसा था वैसा ही रहता है, लेकिन यूजर ऑब्जेक्ट पास किया गया है)
 def generate_description(user, topic, title, language='English'):
@@ -397,7 +448,8 @@ def generate_script_outline(video_title, language='English'):
 def generate_motivational_suggestion(video_title):
     system_prompt = "You are a YouTube growth strategist. Your goal is to provide creative, motivational video ideas in Hindi, formatted for a Telegram message."
     user_prompt = (f"My competitor had success with a video titled: '{video_title}'.\n\nBased on this topic, do the following in a friendly, motivational tone:\n1. Generate 2 alternative, more engaging, video titles for me in Hindi.\n2. Provide one short, actionable 'Pro Tip' in English with Hindi translation for making the video better.\nFormat the output as a single string for a Telegram message, using Markdown (*bold*). Start with a motivational sentence.")
-    return generate_ai_response(system_prompt, user_prompt, is_json=False)
+    # Every user tracking the same competitor gets the same upload alert.
+    return generate_ai_response(system_prompt, user_prompt, is_json=False, cache_feature='motivational_suggestion')
 
 # (यह फ़ंक्शन जैसा था वैसा ही रहता है)
 def generate_playlist_suggestions(user, user_playlists_titles, competitor_video_titles, limit=3):
@@ -419,7 +471,7 @@ def generate_idea_from_competitor(title):
                    "Generate one new, unique, and engaging title for my own video on this topic.\n\n"
                    "Return your response as a single, valid JSON object with one key: `new_title`.")
 
-    return generate_ai_response(system_prompt, user_prompt, is_json=True)
+    return generate_ai_response(system_prompt, user_prompt, is_json=True, cache_feature='idea_from_competitor')
 
 # --- Transcript Analysis Functions ---
 # (_split_text फ़ंक्शन जैसा था वैसा ही रहता है)
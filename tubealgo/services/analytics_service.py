@@ -5,6 +5,7 @@ import time
 from functools import wraps # Import wraps for decorator preservation
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from .youtube_core import QuotaCountingHttpRequest
 from datetime import date, timedelta
 import numpy as np # Make sure numpy is installed
 
@@ -118,7 +119,7 @@ def find_key_moments(retention_data):
 @retry_api_call()
 def get_recent_video_ids(credentials, max_results=20):
     """Fetches the IDs of the user's most recent videos."""
-    youtube = build('youtube', 'v3', credentials=credentials)
+    youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
     channels_response = youtube.channels().list(mine=True, part='contentDetails').execute()
 
     if not channels_response.get('items'):
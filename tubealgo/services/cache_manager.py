@@ -1,7 +1,10 @@
 # Filepath: tubealgo/services/cache_manager.py
+from flask import current_app
 from tubealgo import db
+from tubealgo.db_router import primary
 from tubealgo.models import ApiCache
 from datetime import datetime, timedelta
+import hashlib
 import json
 
 def get_from_cache(key):
@@ -18,27 +21,72 @@ def get_from_cache(key):
     print(f"CACHE MISS for key: {key}")
     return None
 
-def set_to_cache(key, value, expire_hours=4):
+def serialize_payload(value):
+    """The JSON body jsonify sends for `value`, and its ETag (the body's SHA-1)."""
+    body = current_app.json.dumps(value).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()
+
+def set_to_cache(key, value, expire_hours=4, serialized=False):
     """
-    Saves a value to the cache with an expiration time.
+    Saves a value to the cache with an expiration time. With serialized=True
+    the response body and ETag are stored too, for get_cached_body.
     """
     now = datetime.utcnow()
     expires_at = now + timedelta(hours=expire_hours)
+    cache_bytes, etag = serialize_payload(value) if serialized else (None, None)
     
-    # Check if an entry already exists and update it, or create a new one
-    cache_entry = ApiCache.query.filter_by(cache_key=key).first()
-    
-    if cache_entry:
-        cache_entry.cache_value = value
-        cache_entry.expires_at = expires_at
-    else:
-        cache_entry = ApiCache(
-            cache_key=key,
-            cache_value=value,
-            expires_at=expires_at
-        )
-        db.session.add(cache_entry)
+    # Check if an entry already exists and update it, or create a new one.
+    # The lookup runs on the primary: a lagging replica would miss a fresh row
+    # and the INSERT would hit the unique cache_key.
+    with primary():
+        cache_entry = ApiCache.query.filter_by(cache_key=key).first()
         
-    db.session.commit()
+        if cache_entry:
+            cache_entry.cache_value = value
+            cache_entry.expires_at = expires_at
+            cache_entry.cache_bytes = cache_bytes
+            cache_entry.etag = etag
+        else:
+            cache_entry = ApiCache(
+                cache_key=key,
+                cache_value=value,
+                expires_at=expires_at,
+                cache_bytes=cache_bytes,
+                etag=etag
+            )
+            db.session.add(cache_entry)
+            
+        db.session.commit()
     print(f"CACHE SET for key: {key}")
 
+
+def delete_from_cache(*keys):
+    """
+    Removes one or more entries from the cache.
+    """
+    if not keys:
+        return 0
+    deleted = ApiCache.query.filter(ApiCache.cache_key.in_(keys)).delete(synchronize_session=False)
+    db.session.commit()
+    print(f"CACHE DELETE for keys: {', '.join(keys)}")
+    return deleted
+
+
+def get_cache_etag(key):
+    """ETag of a valid, pre-serialized cache entry, read without its value. None otherwise."""
+    return db.session.query(ApiCache.etag).filter(
+        ApiCache.cache_key == key, ApiCache.expires_at > datetime.utcnow()
+    ).scalar()
+
+
+def get_cached_body(key):
+    """
+    (body_bytes, etag) of a valid entry stored with serialized=True, without
+    loading or parsing its JSON value. None on a miss or a plain entry.
+    """
+    row = db.session.query(ApiCache.cache_bytes, ApiCache.etag).filter(
+        ApiCache.cache_key == key, ApiCache.expires_at > datetime.utcnow()
+    ).first()
+    if row is None or row.cache_bytes is None:
+        return None
+    return row.cache_bytes, row.etag
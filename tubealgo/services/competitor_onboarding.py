@@ -0,0 +1,173 @@
+# tubealgo/services/competitor_onboarding.py
+"""
+Background onboarding for a newly added competitor.
+
+`add_competitor` only validates the request and queues the `onboard_competitor`
+task with a job id. The task resolves the channel (which can cost a 100-unit
+search.list), creates the Competitor row, warms the independent per-channel
+caches in parallel (uploads index, most viewed, playlists, tags, category,
+upload schedule) and then builds the competitor package and the deep-analysis
+artifact from those warm caches.
+
+Each step is stored in the API cache, where the page polls it through
+`/competitors/onboarding/<job_id>`, and is also published to the user's SSE
+channel as a `competitor_onboarding` event.
+
+Without a broker the route runs onboarding inline with `prewarm=False`, adding
+the competitor only; its card and deep analysis then load on demand.
+"""
+
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flask import current_app
+
+from tubealgo import db
+from tubealgo.models import Competitor, User, get_plan, log_system_event
+from .cache_manager import get_from_cache, set_to_cache
+from .channel_fetcher import (
+    analyze_channel, get_channel_playlists, get_channel_main_category,
+    get_most_used_tags, get_upload_schedule_analysis
+)
+from .dashboard_service import invalidate_dashboard
+from .notification_service import publish_user_event
+from .video_fetcher import get_all_channel_videos, get_most_viewed_videos
+
+ONBOARDING_EVENT = 'competitor_onboarding'
+ONBOARDING_STATUS_HOURS = 1
+
+_executor = ThreadPoolExecutor(max_workers=12, thread_name_prefix='competitor-onboarding')
+
+# Independent per-channel fetches; get_full_competitor_package and the
+# deep-analysis view model read all of them from the cache afterwards.
+PREFETCH_STEPS = {
+    'uploads': lambda channel_id: get_all_channel_videos(channel_id),
+    'most_viewed': lambda channel_id: get_most_viewed_videos(channel_id, max_results=50),
+    'playlists': lambda channel_id: get_channel_playlists(channel_id),
+    'tags': lambda channel_id: get_most_used_tags(channel_id, video_limit=50),
+    'category': lambda channel_id: get_channel_main_category(channel_id),
+    'upload_schedule': lambda channel_id: get_upload_schedule_analysis(channel_id),
+}
+
+
+def _status_key(job_id):
+    return f"competitor_onboarding:{job_id}"
+
+
+def get_onboarding_status(job_id):
+    return get_from_cache(_status_key(job_id))
+
+
+def report_progress(user_id, job_id, stage, **data):
+    status = {'job_id': job_id, 'user_id': user_id, 'stage': stage, **data}
+    set_to_cache(_status_key(job_id), status, expire_hours=ONBOARDING_STATUS_HOURS)
+    publish_user_event(user_id, ONBOARDING_EVENT, status)
+    return status
+
+
+def competitor_card(competitor):
+    return {
+        "id": competitor.id,
+        "channel_id_youtube": competitor.channel_id_youtube,
+        "channel_title": competitor.channel_title
+    }
+
+
+def _run_in_app(app, fn, *args):
+    with app.app_context():
+        return fn(*args)
+
+
+def _create_competitor(user, analysis_data):
+    """Inserts the competitor at position 1. Returns (competitor, error)."""
+    plan = get_plan(user.plan.plan_id if user.plan else None)
+    limit = plan.competitors_limit if plan else 0
+    if limit != -1 and user.competitors.count() >= limit:
+        return None, f"You have reached your limit of {limit} competitors."
+
+    existing = Competitor.query.filter_by(user_id=user.id, channel_id_youtube=analysis_data['id']).first()
+    if existing:
+        return None, f"'{analysis_data['Title']}' is already in your list."
+
+    Competitor.query.filter_by(user_id=user.id).update({Competitor.position: Competitor.position + 1})
+    db.session.flush()
+    competitor = Competitor(
+        user_id=user.id,
+        channel_id_youtube=analysis_data['id'],
+        channel_title=analysis_data['Title'],
+        thumbnail_url=analysis_data.get('Thumbnail URL', ''),
+        position=1
+    )
+    db.session.add(competitor)
+    invalidate_dashboard(user.id, 'competitors_changed')
+    db.session.commit()
+    return competitor, None
+
+
+def prewarm_competitor(user_id, job_id, competitor):
+    """Warms every cache the competitor card and deep-analysis page read."""
+    from tubealgo.routes.api_routes import get_full_competitor_package
+    from .deep_analysis_service import compute_deep_analysis
+
+    app = current_app._get_current_object()
+    channel_id = competitor.channel_id_youtube
+    total = len(PREFETCH_STEPS) + 2
+    done = 0
+    futures = {_executor.submit(_run_in_app, app, fetch, channel_id): name for name, fetch in PREFETCH_STEPS.items()}
+    for future in as_completed(futures):
+        done += 1
+        try:
+            future.result()
+        except Exception as e:
+            # The package build below fetches anything that is still missing.
+            print(f"Competitor onboarding prefetch '{futures[future]}' failed for {channel_id}: {e}")
+        report_progress(user_id, job_id, 'prefetching', step=futures[future], done=done, total=total,
+                        competitor=competitor_card(competitor))
+
+    get_full_competitor_package(competitor.id, force_refresh=True)
+    done += 1
+    report_progress(user_id, job_id, 'prefetching', step='package', done=done, total=total,
+                    competitor=competitor_card(competitor))
+
+    compute_deep_analysis(competitor)
+    done += 1
+    report_progress(user_id, job_id, 'prefetching', step='deep_analysis', done=done, total=total,
+                    competitor=competitor_card(competitor))
+
+
+def onboard_competitor(user_id, search_input, job_id, prewarm=True):
+    """
+    Runs the whole onboarding pipeline and returns the final status. A
+    competitor whose prefetch fails is still added; its card loads on demand.
+    With prewarm=False the competitor is only resolved and created.
+    """
+    user = db.session.get(User, user_id)
+    if not user:
+        return {'stage': 'error', 'error': 'User not found.'}
+
+    report_progress(user_id, job_id, 'resolving', query=search_input)
+    analysis_data = analyze_channel(search_input)
+    if 'error' in analysis_data:
+        return report_progress(user_id, job_id, 'error', error=analysis_data['error'])
+
+    try:
+        competitor, error = _create_competitor(user, analysis_data)
+    except Exception as e:
+        db.session.rollback()
+        log_system_event("Competitor onboarding: could not add competitor", "ERROR",
+                         {'user_id': user_id, 'error': str(e), 'traceback': traceback.format_exc()})
+        return report_progress(user_id, job_id, 'error', error='An unexpected server error occurred.')
+    if error:
+        return report_progress(user_id, job_id, 'error', error=error)
+
+    if not prewarm:
+        return report_progress(user_id, job_id, 'ready', competitor=competitor_card(competitor))
+
+    report_progress(user_id, job_id, 'resolved', competitor=competitor_card(competitor))
+    try:
+        prewarm_competitor(user_id, job_id, competitor)
+    except Exception as e:
+        db.session.rollback()
+        log_system_event("Competitor onboarding: cache prewarm failed", "WARNING",
+                         {'user_id': user_id, 'competitor_id': competitor.id, 'error': str(e)})
+    return report_progress(user_id, job_id, 'ready', competitor=competitor_card(competitor))
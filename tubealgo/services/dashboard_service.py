@@ -0,0 +1,395 @@
+# tubealgo/services/dashboard_service.py
+"""
+Builds the dashboard widgets.
+
+Each widget can be loaded on its own (`get_widget`) and is cached in its own
+DashboardCache row with a TTL from WIDGETS; INVALIDATION_TRIGGERS name the
+events that drop which widgets. The combined main-data payload (DashboardBuild)
+is kept for API clients that still load everything at once.
+
+The YouTube calls behind main-data (the user's channel, each competitor's
+latest videos and upload schedule, the user's own uploads for a video goal)
+are independent, so they run concurrently on a shared thread pool. The request
+waits at most DASHBOARD_DEADLINE_SECONDS; widgets whose inputs are not ready
+by then are filled from the last payload and listed as `pending`. Their
+fetches keep running and warm the API cache, so the client's next poll
+completes, and only a complete payload is cached in DashboardCache.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from tubealgo import db
+from tubealgo.models import DashboardCache, Goal, User
+from .cache_manager import serialize_payload
+from .channel_fetcher import analyze_channel, get_upload_schedule_analysis
+from .snapshot_service import SnapshotSeries
+from .suggestion_service import analyze_best_time_to_post
+from .video_fetcher import get_latest_videos
+from .youtube_manager import get_user_videos
+
+DASHBOARD_DEADLINE_SECONDS = 4
+DASHBOARD_COMPETITOR_LIMIT = 5
+
+DEFAULT_LAYOUT = {
+    'left': ['kpis', 'growth_chart', 'top_videos'],
+    'right': ['goal', 'best_time', 'ai_assistant']
+}
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='dashboard')
+
+
+def _run_in_app(app, fn, *args, **kwargs):
+    with app.app_context():
+        return fn(*args, **kwargs)
+
+
+def _user_videos_for(user_id, creds):
+    user = db.session.get(User, user_id)
+    return get_user_videos(user, creds) if user else []
+
+
+def get_user_layout(user):
+    try:
+        layout = json.loads(user.dashboard_layout) if user.dashboard_layout else None
+    except (ValueError, TypeError):
+        layout = None
+    if not layout or not isinstance(layout, dict) or 'left' not in layout or 'right' not in layout:
+        layout = DEFAULT_LAYOUT
+    return layout
+
+
+# --- Widget builders: plain functions of already-fetched inputs ---
+
+def build_kpis(channel_data):
+    if 'error' in channel_data:
+        raise Exception(channel_data['error'])
+    return {
+        'subscribers': channel_data.get('Subscribers', 0),
+        'views': channel_data.get('Total Views', 0),
+        'videos': channel_data.get('Video Count', 0),
+    }
+
+
+def build_top_recent_videos(competitor_videos):
+    """competitor_videos: [(channel_title, get_latest_videos result)]"""
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    recent = []
+    for channel_title, comp_videos_data in competitor_videos:
+        if comp_videos_data and 'videos' in comp_videos_data:
+            for video in comp_videos_data['videos']:
+                upload_date = datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00'))
+                if upload_date > thirty_days_ago:
+                    video['channel_title'] = channel_title
+                    recent.append(video)
+    return sorted(recent, key=lambda x: x.get('view_count', 0), reverse=True)[:4]
+
+
+def build_ai_assistant(top_recent_videos):
+    suggestions = []
+    if top_recent_videos:
+        top_topic_title = top_recent_videos[0]['title']
+        suggestions.append({
+            "type": "topic",
+            "title": "Popular Topic",
+            "text": f"Your competitors are finding success with recent videos like '{top_topic_title[:50]}...'. Consider making a video on a similar topic."
+        })
+    suggestions.append({
+        "type": "consistency",
+        "title": "Consistency Tip",
+        "text": "Uploading a new video every week can boost your channel's momentum. Plan your next upload now!"
+    })
+    return suggestions
+
+
+def build_best_time(schedules):
+    if not schedules:
+        return None
+    aggregated_by_day = [0] * 7
+    aggregated_by_hour = [0] * 24
+    for schedule in schedules:
+        if schedule:
+            aggregated_by_day = [a + b for a, b in zip(aggregated_by_day, schedule.get('by_day', [0]*7))]
+            aggregated_by_hour = [a + b for a, b in zip(aggregated_by_hour, schedule.get('by_hour', [0]*24))]
+    return analyze_best_time_to_post({'by_day': aggregated_by_day, 'by_hour': aggregated_by_hour})
+
+
+def goal_snapshot(goal):
+    """Plain copy of an active Goal, safe to hand to another thread."""
+    if not goal:
+        return None
+    return {
+        'goal_type': goal.goal_type,
+        'start_value': goal.start_value,
+        'target_value': goal.target_value,
+        'target_date': goal.target_date.isoformat() if goal.target_date else None,
+        'created_at': goal.created_at,
+    }
+
+
+def build_goal(goal, kpis, user_videos=None):
+    if not goal:
+        return None
+    current_value = 0
+    if goal['goal_type'] == 'subscribers':
+        current_value = kpis['subscribers']
+    elif goal['goal_type'] == 'views':
+        current_value = kpis['views']
+    elif goal['goal_type'] == 'videos_uploaded' and isinstance(user_videos, list):
+        goal_start_time = goal['created_at'].replace(tzinfo=timezone.utc)
+        current_value = len([
+            v for v in user_videos
+            if datetime.fromisoformat(v['published_at'].replace('Z', '+00:00')) >= goal_start_time
+        ])
+
+    progress_percentage = 0
+    if goal['target_value'] > goal['start_value']:
+        progress_percentage = ((current_value - goal['start_value']) / (goal['target_value'] - goal['start_value'])) * 100
+
+    return {
+        'goal_type': goal['goal_type'],
+        'target_value': goal['target_value'],
+        'current_value': current_value,
+        'target_date': goal['target_date'],
+        'progress_percentage': min(100, max(0, progress_percentage)),
+        'projection_text': "🚀 Keep up the great work!"
+    }
+
+
+class DashboardBuild:
+    """One in-flight dashboard build: the submitted fetches and the widgets derived from them."""
+
+    # widget -> names of the fetch groups it needs
+    WIDGET_INPUTS = {
+        'kpis': ('channel',),
+        'top_recent_videos': ('videos',),
+        'ai_assistant': ('videos',),
+        'goal': ('channel', 'user_videos'),
+        'best_time_to_post': ('schedules',),
+    }
+
+    def __init__(self, app, user, creds_loader=None):
+        self.app = app
+        self.user_id = user.id
+        self.layout = get_user_layout(user)
+        self.goal = goal_snapshot(Goal.query.filter_by(user_id=user.id, is_active=True).first())
+        channel_db_id = user.channel.id
+        self.growth_chart = SnapshotSeries.fetch([channel_db_id], days=30).chart_data(channel_db_id)
+
+        competitors = user.competitors.limit(DASHBOARD_COMPETITOR_LIMIT).all()
+        submit = lambda fn, *args: _executor.submit(_run_in_app, app, fn, *args)
+        self.futures = {
+            'channel': [submit(analyze_channel, user.channel.channel_id_youtube)],
+            'videos': [(comp.channel_title, submit(get_latest_videos, comp.channel_id_youtube, 20)) for comp in competitors],
+            'schedules': [submit(get_upload_schedule_analysis, comp.channel_id_youtube) for comp in competitors],
+            'user_videos': [],
+        }
+        if self.goal and self.goal['goal_type'] == 'videos_uploaded' and creds_loader:
+            creds = creds_loader()
+            if creds:
+                self.futures['user_videos'] = [submit(_user_videos_for, user.id, creds)]
+
+    def _group_futures(self, group):
+        return [f[1] if isinstance(f, tuple) else f for f in self.futures[group]]
+
+    def all_futures(self):
+        return [f for group in self.futures for f in self._group_futures(group)]
+
+    def is_ready(self, widget):
+        return all(f.done() for group in self.WIDGET_INPUTS[widget] for f in self._group_futures(group))
+
+    def build_widget(self, widget):
+        if widget == 'kpis':
+            return build_kpis(self.futures['channel'][0].result())
+        if widget in ('top_recent_videos', 'ai_assistant'):
+            top = build_top_recent_videos([(title, f.result()) for title, f in self.futures['videos']])
+            return top if widget == 'top_recent_videos' else build_ai_assistant(top)
+        if widget == 'goal':
+            user_videos = self.futures['user_videos'][0].result() if self.futures['user_videos'] else None
+            return build_goal(self.goal, self.build_widget('kpis'), user_videos)
+        if widget == 'best_time_to_post':
+            return build_best_time([f.result() for f in self.futures['schedules']])
+        raise KeyError(widget)
+
+    def collect(self, timeout, stale=None):
+        """
+        Waits up to `timeout` and returns (payload, pending_widget_names).
+        Pending widgets are filled from `stale` (an older payload) when given.
+        """
+        wait(self.all_futures(), timeout=timeout)
+        payload = {'growth_chart': self.growth_chart, 'layout': self.layout}
+        pending = []
+        for widget in self.WIDGET_INPUTS:
+            if self.is_ready(widget):
+                payload[widget] = self.build_widget(widget)
+            else:
+                payload[widget] = (stale or {}).get(widget)
+                pending.append(widget)
+        return payload, pending
+
+
+# --- Per-widget cache ---
+# Each widget is cached in its own DashboardCache row with its own TTL and is
+# dropped by the triggers that can change it. The combined main-data payload
+# is cached under MAIN_CACHE_KEY and dropped by every trigger.
+
+MAIN_CACHE_KEY = 'main'
+MAIN_CACHE_TTL_SECONDS = 4 * 3600
+
+WIDGETS = {
+    'kpis': {'ttl': 3600},
+    'growth_chart': {'ttl': 6 * 3600},
+    'top_recent_videos': {'ttl': 3600},
+    'ai_assistant': {'ttl': 3600},
+    'goal': {'ttl': 15 * 60},
+    'best_time_to_post': {'ttl': 24 * 3600},
+}
+
+INVALIDATION_TRIGGERS = {
+    'channel_changed': list(WIDGETS),
+    'channel_snapshot': ['kpis', 'growth_chart', 'goal'],
+    'competitors_changed': ['top_recent_videos', 'ai_assistant', 'best_time_to_post'],
+    'new_competitor_video': ['top_recent_videos', 'ai_assistant'],
+    'goal_changed': ['goal'],
+    'layout_changed': [],
+}
+
+
+def _is_fresh(entry, ttl):
+    return entry is not None and entry.data is not None and (datetime.utcnow() - entry.updated_at).total_seconds() < ttl
+
+
+def get_cached_main(user_id):
+    """Returns (entry, is_fresh) for the combined main-data payload."""
+    entry = DashboardCache.query.filter_by(user_id=user_id, widget=MAIN_CACHE_KEY).first()
+    return entry, _is_fresh(entry, MAIN_CACHE_TTL_SECONDS)
+
+
+def _fresh_since(name):
+    ttl = MAIN_CACHE_TTL_SECONDS if name == MAIN_CACHE_KEY else WIDGETS[name]['ttl']
+    return datetime.utcnow() - timedelta(seconds=ttl)
+
+
+def get_widget_etag(user_id, name):
+    """ETag of a fresh cached widget (or the MAIN_CACHE_KEY payload), read without its data."""
+    return db.session.query(DashboardCache.etag).filter(
+        DashboardCache.user_id == user_id, DashboardCache.widget == name,
+        DashboardCache.updated_at > _fresh_since(name)
+    ).scalar()
+
+
+def get_widget_body(user_id, name):
+    """
+    (payload_bytes, etag) of a fresh cached widget, the pre-serialized JSON
+    stored with it, so the API can send it without parsing the data column.
+    None if missing, expired or stored before payloads were pre-serialized.
+    """
+    row = db.session.query(DashboardCache.payload, DashboardCache.etag).filter(
+        DashboardCache.user_id == user_id, DashboardCache.widget == name,
+        DashboardCache.updated_at > _fresh_since(name)
+    ).first()
+    if row is None or row.payload is None:
+        return None
+    return row.payload, row.etag
+
+
+def _competitors(user):
+    return user.competitors.limit(DASHBOARD_COMPETITOR_LIMIT).all()
+
+
+def _fetch_all(app, fn, args_list):
+    futures = [_executor.submit(_run_in_app, app, fn, *args) for args in args_list]
+    return [f.result() for f in futures]
+
+
+def _build_single_widget(app, user, name, creds_loader=None):
+    if name == 'kpis':
+        return build_kpis(analyze_channel(user.channel.channel_id_youtube))
+    if name == 'growth_chart':
+        return SnapshotSeries.fetch([user.channel.id], days=30).chart_data(user.channel.id)
+    if name == 'top_recent_videos':
+        competitors = _competitors(user)
+        results = _fetch_all(app, get_latest_videos, [(comp.channel_id_youtube, 20) for comp in competitors])
+        return build_top_recent_videos([(comp.channel_title, result) for comp, result in zip(competitors, results)])
+    if name == 'ai_assistant':
+        return build_ai_assistant(get_widget(app, user, 'top_recent_videos'))
+    if name == 'goal':
+        goal = goal_snapshot(Goal.query.filter_by(user_id=user.id, is_active=True).first())
+        if not goal:
+            return None
+        user_videos = None
+        if goal['goal_type'] == 'videos_uploaded' and creds_loader:
+            creds = creds_loader()
+            user_videos = get_user_videos(user, creds) if creds else None
+        return build_goal(goal, get_widget(app, user, 'kpis'), user_videos)
+    if name == 'best_time_to_post':
+        competitors = _competitors(user)
+        return build_best_time(_fetch_all(app, get_upload_schedule_analysis, [(comp.channel_id_youtube,) for comp in competitors]))
+    raise KeyError(name)
+
+
+def get_widget(app, user, name, creds_loader=None):
+    """Returns one widget's data, from its cache row while fresh, rebuilding it otherwise."""
+    entry = DashboardCache.query.filter_by(user_id=user.id, widget=name).first()
+    if _is_fresh(entry, WIDGETS[name]['ttl']):
+        return entry.data
+    try:
+        data = _build_single_widget(app, user, name, creds_loader)
+    except Exception:
+        if entry is not None and entry.data is not None:
+            # Serve the stale value rather than an empty card.
+            print(f"Dashboard widget '{name}' rebuild failed for user {user.id}, serving stale data.")
+            return entry.data
+        raise
+    store_widgets(user.id, {name: data})
+    return data
+
+
+def store_widgets(user_id, widgets, commit=True):
+    """
+    Replaces the DashboardCache rows for {widget_name: data}. Delete-then-insert
+    keeps it correct when the reads of a request were served by a replica; if a
+    parallel request stored the same widget first, this write is simply dropped.
+    Each row also stores its JSON pre-serialized with its ETag. Returns
+    {widget_name: etag}, or None if the write was dropped.
+    """
+    now = datetime.utcnow()
+    DashboardCache.query.filter(
+        DashboardCache.user_id == user_id, DashboardCache.widget.in_(list(widgets))
+    ).delete(synchronize_session=False)
+    etags = {}
+    for name, data in widgets.items():
+        payload, etags[name] = serialize_payload(data)
+        db.session.add(DashboardCache(user_id=user_id, widget=name, data=data, payload=payload,
+                                      etag=etags[name], updated_at=now))
+    if not commit:
+        return etags
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return etags
+
+
+def invalidate_dashboard(user_id, trigger, commit=False):
+    """
+    Drops the cached widgets a change can affect, plus the combined payload.
+    Joins the caller's transaction unless commit=True.
+    """
+    names = INVALIDATION_TRIGGERS[trigger] + [MAIN_CACHE_KEY]
+    DashboardCache.query.filter(
+        DashboardCache.user_id == user_id, DashboardCache.widget.in_(names)
+    ).delete(synchronize_session=False)
+    if commit:
+        db.session.commit()
+
+
+def save_dashboard_cache(user_id, payload):
+    """Caches a complete main-data payload and each widget in it. Returns store_widgets' result."""
+    widgets = {name: payload[name] for name in WIDGETS if name in payload}
+    widgets[MAIN_CACHE_KEY] = payload
+    return store_widgets(user_id, widgets)
@@ -0,0 +1,122 @@
+# tubealgo/services/deep_analysis_service.py
+"""
+Precomputed view model for the /deep-analysis page.
+
+`perform_full_analysis` builds everything the page renders (channel details,
+tags, playlists, processed video lists, the monthly upload chart and the
+upload schedule) and stores it in the competitor's CompetitorAnalysisCache
+row, so a page view reads one row. A row older than DEEP_ANALYSIS_TTL_SECONDS
+is still served while a refresh is queued in the background; only a
+competitor without any row is analysed inside the request.
+"""
+
+from datetime import datetime
+
+from tubealgo import db
+from tubealgo.db_router import primary
+from tubealgo.models import CompetitorAnalysisCache
+from .cache_manager import get_from_cache, set_to_cache
+from .channel_fetcher import get_upload_schedule_analysis
+from .video_fetcher import get_all_channel_videos
+
+DEEP_ANALYSIS_TTL_SECONDS = 4 * 3600
+# Bumped when the view model's shape changes; older rows are rebuilt on read.
+DEEP_ANALYSIS_VERSION = 2
+UPLOAD_CHART_MONTHS = 6
+# Stops every view of a stale page from queueing its own refresh.
+REFRESH_QUEUED_HOURS = 0.25
+
+
+def _video_summary(video):
+    return {
+        'id': video.get('id'), 'title': video.get('title'), 'thumbnail': video.get('thumbnail'),
+        'view_count': video.get('view_count', 0), 'like_count': video.get('like_count', 0),
+        'comment_count': video.get('comment_count', 0), 'upload_date': video.get('upload_date'),
+        'duration_seconds': video.get('duration_seconds', 0), 'is_short': video.get('is_short', False),
+        'trending_status': video.get('trending_status')
+    }
+
+
+def build_upload_chart(videos, months=UPLOAD_CHART_MONTHS):
+    """Uploads per month for the last `months` months that have uploads, oldest first."""
+    upload_counts = {}
+    for video in videos:
+        if video.get('upload_date'):
+            upload_month = datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00')).strftime('%Y-%m')
+            upload_counts[upload_month] = upload_counts.get(upload_month, 0) + 1
+
+    sorted_months = sorted(upload_counts.keys(), reverse=True)[:months]
+    sorted_months.reverse()
+    return {
+        'labels': [datetime.strptime(month, '%Y-%m').strftime('%b %Y') for month in sorted_months],
+        'data': [upload_counts[month] for month in sorted_months],
+    }
+
+
+def build_deep_analysis(competitor, data_package):
+    """Turns a full competitor package into the deep-analysis page's view model."""
+    channel_data = data_package.get('details', {})
+    recent_videos_data = data_package.get('recent_videos_data', {}) or {}
+
+    # Served from the cache the package build just filled.
+    all_videos = get_all_channel_videos(competitor.channel_id_youtube)
+
+    return {
+        'version': DEEP_ANALYSIS_VERSION,
+        'channel_data': channel_data,
+        'top_tags': data_package.get('top_tags', []),
+        'playlists': data_package.get('playlists', []),
+        'channel_keywords': channel_data.get('keywords', []),
+        'upload_chart': build_upload_chart(all_videos if isinstance(all_videos, list) else []),
+        # First page only; the page fetches further pages and other sorts from the video index.
+        'recent_videos': [_video_summary(v) for v in recent_videos_data.get('videos', [])],
+        'recent_videos_next_cursor': recent_videos_data.get('next_cursor'),
+        'upload_schedule': get_upload_schedule_analysis(competitor.channel_id_youtube),
+    }
+
+
+def compute_deep_analysis(competitor, force_refresh=False):
+    """
+    Builds and stores the view model for a competitor. Returns it, or
+    {'error': ...} without touching the stored row if the channel could not
+    be fetched.
+    """
+    from tubealgo.routes.api_routes import get_full_competitor_package
+
+    data_package = get_full_competitor_package(competitor.id, force_refresh=force_refresh)
+    if 'error' in data_package:
+        return {'error': data_package['error']}
+
+    view_model = build_deep_analysis(competitor, data_package)
+    # Looked up on the primary so a lagging replica cannot cause a duplicate insert.
+    with primary():
+        entry = CompetitorAnalysisCache.query.filter_by(competitor_id=competitor.id).first()
+        if not entry:
+            entry = CompetitorAnalysisCache(competitor_id=competitor.id)
+            db.session.add(entry)
+        entry.data = view_model
+        entry.updated_at = datetime.utcnow()
+        db.session.commit()
+    return view_model
+
+
+def _queue_refresh(competitor_id):
+    flag_key = f"deep_analysis_refresh_queued:{competitor_id}"
+    if get_from_cache(flag_key):
+        return
+    try:
+        from tubealgo.jobs import perform_full_analysis
+        perform_full_analysis.apply_async(args=[competitor_id])
+        set_to_cache(flag_key, True, expire_hours=REFRESH_QUEUED_HOURS)
+    except Exception as e:
+        print(f"WARNING: Could not queue deep analysis refresh for competitor {competitor_id}: {e}")
+
+
+def get_deep_analysis(competitor):
+    """The stored view model for a competitor, computing it only if none exists yet."""
+    entry = CompetitorAnalysisCache.query.filter_by(competitor_id=competitor.id).first()
+    if entry is None or entry.data is None or entry.data.get('version') != DEEP_ANALYSIS_VERSION:
+        return compute_deep_analysis(competitor)
+    if (datetime.utcnow() - entry.updated_at).total_seconds() >= DEEP_ANALYSIS_TTL_SECONDS:
+        _queue_refresh(competitor.id)
+    return entry.data
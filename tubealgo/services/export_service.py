@@ -0,0 +1,92 @@
+# tubealgo/services/export_service.py
+"""
+Streaming exports of channel video lists.
+
+Column selection is resolved once into a list of extractor functions and
+applied row by row, so neither format builds the whole sheet in memory. CSV
+rows are yielded as they are produced. An .xlsx file is a zip archive and can
+only be sent once it is complete, so the workbook is written in openpyxl's
+write-only mode (rows go straight to a temporary file) and the finished file
+is then streamed in chunks.
+"""
+
+import csv
+import io
+import tempfile
+from datetime import datetime
+
+from openpyxl import Workbook
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Spill the finished workbook to disk instead of memory above this size.
+XLSX_SPOOL_MAX_BYTES = 1024 * 1024
+# Spreadsheet apps evaluate a cell starting with one of these as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _escape_formula(value):
+    """Neutralizes third-party text (e.g. video titles) that would run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _format_upload_date(video):
+    date_str = video.get('upload_date', '')
+    if not date_str:
+        return ''
+    return datetime.fromisoformat(date_str.replace('Z', '')).strftime('%Y-%m-%d %H:%M')
+
+
+_COLUMN_EXTRACTORS = {
+    'video_url': lambda video: f"https://www.youtube.com/watch?v={video.get('id', '')}",
+    'upload_date': _format_upload_date,
+}
+
+
+def _extractor_for(column):
+    return _COLUMN_EXTRACTORS.get(column) or (lambda video: _escape_formula(video.get(column, 'N/A')))
+
+
+def video_export_header(columns):
+    return [col.replace('_', ' ').title() for col in columns]
+
+
+def iter_video_rows(videos, columns):
+    """Yields one list of cell values per video, containing only the selected columns."""
+    extractors = [_extractor_for(col) for col in columns]
+    for video in videos:
+        yield [extract(video) for extract in extractors]
+
+
+def iter_csv(header, rows):
+    """Yields CSV text one line at a time, starting with a UTF-8 BOM so Excel detects the encoding."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_xlsx(header, rows, sheet_title):
+    """Writes a write-only workbook to a temporary file and yields it in chunks."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES) as fh:
+        wb.save(fh)
+        fh.seek(0)
+        while True:
+            chunk = fh.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,225 @@
+# tubealgo/services/job_lease.py
+"""
+Overlap protection for periodic Celery tasks.
+
+`with_job_lease` makes a task acquire a DB-row lease before it runs. While the
+task is running a heartbeat thread keeps extending the lease, so a long run
+keeps it, and a crashed worker's lease simply expires. A second copy that
+finds the lease held skips its run instead of repeating the work. If the
+heartbeat loses the lease anyway (it expired or another worker took it),
+`check_lease` raises LeaseLost at the next item, so the two copies never
+keep writing side by side.
+
+Idempotency keys mark per-item work (one channel, one user) as done for the
+current schedule window, so a retried or overlapping run never repeats the
+API calls for items that already finished.
+
+Lease and key writes go through their own connections, so they commit
+independently of the task's session.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from functools import wraps
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+
+from tubealgo import db
+from tubealgo.models import JobLease, JobIdempotencyKey, log_system_event
+
+LEASE_TTL_SECONDS = 600
+IDEMPOTENCY_KEY_TTL_SECONDS = 2 * 24 * 3600
+
+_current_heartbeat = ContextVar('current_lease_heartbeat', default=None)
+
+
+class LeaseLost(Exception):
+    """The running task no longer holds its lease and must stop."""
+
+
+def _new_owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(engine, name, owner, ttl_seconds=LEASE_TTL_SECONDS):
+    """Takes the lease if it is free, expired, or already ours. Returns True on success."""
+    table = JobLease.__table__
+    now = datetime.utcnow()
+    values = {'owner': owner, 'acquired_at': now, 'heartbeat_at': now, 'expires_at': now + timedelta(seconds=ttl_seconds)}
+
+    with engine.begin() as conn:
+        result = conn.execute(
+            table.update()
+            .where(table.c.name == name, or_(table.c.expires_at < now, table.c.owner == owner))
+            .values(**values)
+        )
+        if result.rowcount:
+            return True
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(table.insert().values(name=name, **values))
+        return True
+    except IntegrityError:
+        # Another worker holds a live lease (or inserted it first).
+        return False
+
+
+def renew_lease(engine, name, owner, ttl_seconds=LEASE_TTL_SECONDS):
+    """Extends a lease we still own. Returns False if it was lost."""
+    table = JobLease.__table__
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        result = conn.execute(
+            table.update()
+            .where(table.c.name == name, table.c.owner == owner)
+            .values(heartbeat_at=now, expires_at=now + timedelta(seconds=ttl_seconds))
+        )
+        return bool(result.rowcount)
+
+
+def release_lease(engine, name, owner):
+    table = JobLease.__table__
+    with engine.begin() as conn:
+        conn.execute(
+            table.update()
+            .where(table.c.name == name, table.c.owner == owner)
+            .values(expires_at=datetime.utcnow())
+        )
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Renews a lease every third of its TTL until stopped."""
+
+    def __init__(self, engine, name, owner, ttl_seconds):
+        super().__init__(name=f"lease-heartbeat:{name}", daemon=True)
+        self.engine = engine
+        self.lease_name = name
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+        self.lost = False
+        self.renewed_at = time.monotonic()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = max(1, self.ttl_seconds / 3)
+        while not self._stop_event.wait(interval):
+            try:
+                if not renew_lease(self.engine, self.lease_name, self.owner, self.ttl_seconds):
+                    self.lost = True
+                    print(f"WARNING: Lost lease '{self.lease_name}' while the task was still running.")
+                    return
+                self.renewed_at = time.monotonic()
+            except Exception as e:
+                print(f"WARNING: Lease heartbeat for '{self.lease_name}' failed: {e}")
+
+    def is_lost(self):
+        # Renewals that keep failing let the lease expire without `lost` being set.
+        return self.lost or time.monotonic() - self.renewed_at >= self.ttl_seconds
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=5)
+
+
+def with_job_lease(ttl_seconds=LEASE_TTL_SECONDS):
+    """
+    Decorator for periodic Celery tasks. Place it between `@celery.task` and
+    `@track_job_run` so skipped runs do not show up in the job ledger.
+    """
+    def decorator(func):
+        lease_name = f"{func.__module__}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            engine = db.engine
+            owner = _new_owner_id()
+            try:
+                acquired = acquire_lease(engine, lease_name, owner, ttl_seconds)
+            except Exception as e:
+                # Without the lease table we fall back to the old, unprotected behaviour.
+                print(f"WARNING: Could not acquire lease '{lease_name}', running unprotected: {e}")
+                return func(*args, **kwargs)
+
+            if not acquired:
+                log_system_event(
+                    message=f"Skipped {lease_name}: a previous run still holds the lease",
+                    log_type='WARNING',
+                    details={'lease': lease_name}
+                )
+                return None
+
+            heartbeat = LeaseHeartbeat(engine, lease_name, owner, ttl_seconds)
+            heartbeat.start()
+            token = _current_heartbeat.set(heartbeat)
+            try:
+                return func(*args, **kwargs)
+            except LeaseLost:
+                log_system_event(
+                    message=f"Stopped {lease_name}: its lease was lost while it was running",
+                    log_type='WARNING',
+                    details={'lease': lease_name}
+                )
+                return None
+            finally:
+                _current_heartbeat.reset(token)
+                heartbeat.stop()
+                try:
+                    release_lease(engine, lease_name, owner)
+                except Exception as e:
+                    print(f"WARNING: Could not release lease '{lease_name}': {e}")
+
+        return wrapper
+    return decorator
+
+
+def check_lease():
+    """
+    Called by leased tasks before each item of work, outside the per-item
+    error handling. Raises LeaseLost once the lease is gone; a no-op outside
+    a leased task.
+    """
+    heartbeat = _current_heartbeat.get()
+    if heartbeat is not None and heartbeat.is_lost():
+        raise LeaseLost(heartbeat.lease_name)
+
+
+def window_key(hours, now=None):
+    """Start of the current `hours`-long UTC schedule window, e.g. '2024052109' for 3h windows."""
+    now = now or datetime.utcnow()
+    if hours >= 24:
+        return now.strftime('%Y%m%d')
+    return now.replace(hour=now.hour - now.hour % hours).strftime('%Y%m%d%H')
+
+
+def is_item_done(key):
+    table = JobIdempotencyKey.__table__
+    with db.engine.connect() as conn:
+        row = conn.execute(
+            select(table.c.key).where(table.c.key == key, table.c.expires_at > datetime.utcnow())
+        ).first()
+    return row is not None
+
+
+def mark_item_done(key, ttl_seconds=IDEMPOTENCY_KEY_TTL_SECONDS):
+    table = JobIdempotencyKey.__table__
+    now = datetime.utcnow()
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.key == key, table.c.expires_at <= now))
+            conn.execute(table.insert().values(key=key, created_at=now, expires_at=now + timedelta(seconds=ttl_seconds)))
+    except IntegrityError:
+        pass  # Already marked by an earlier attempt.
+
+
+def purge_expired_idempotency_keys(now=None):
+    table = JobIdempotencyKey.__table__
+    with db.engine.begin() as conn:
+        result = conn.execute(table.delete().where(table.c.expires_at <= (now or datetime.utcnow())))
+    return result.rowcount
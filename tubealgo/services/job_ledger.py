@@ -0,0 +1,161 @@
+# tubealgo/services/job_ledger.py
+"""
+Job run ledger for Celery tasks.
+
+`track_job_run` wraps a task body and writes a JobRun row with its duration,
+item counts, YouTube API units and peak memory (the Python heap peak of that
+run, measured with tracemalloc). Code running inside a task
+reports progress through `job_item_processed`, `job_item_failed` and
+`record_api_units`; outside a tracked task these calls are no-ops.
+"""
+
+import threading
+import time
+import traceback
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+from tubealgo import db
+
+_current_run = ContextVar('current_job_run', default=None)
+
+
+class JobRunTracker:
+    """Thread-safe counters for one task execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items_processed = 0
+        self.items_failed = 0
+        self.api_units = 0
+
+    def add(self, field, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+
+def current_job_run():
+    """Returns the tracker of the task running in this context, or None."""
+    return _current_run.get()
+
+
+def job_item_processed(count=1):
+    tracker = _current_run.get()
+    if tracker:
+        tracker.add('items_processed', count)
+
+
+def job_item_failed(count=1):
+    tracker = _current_run.get()
+    if tracker:
+        tracker.add('items_failed', count)
+
+
+def record_api_units(units):
+    tracker = _current_run.get()
+    if tracker:
+        tracker.add('api_units', units)
+
+
+def _start_memory_tracking():
+    """
+    Starts (or restarts) the peak measurement for one run. ru_maxrss is the
+    process-wide high-water mark, so with a solo pool every run after the
+    largest one would report the same number. Returns True if tracing was
+    started here and should be stopped by _peak_memory_kb.
+    """
+    try:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            return False
+        tracemalloc.start()
+        return True
+    except Exception:
+        return False
+
+
+def _peak_memory_kb(started_tracing):
+    try:
+        if not tracemalloc.is_tracing():
+            return None
+        peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        if started_tracing:
+            tracemalloc.stop()
+        return peak_kb
+    except Exception:
+        return None
+
+
+def _celery_request_info():
+    """Returns (task_id, queue, wait_seconds) for the Celery task running now."""
+    try:
+        from celery import current_task
+        from .task_queues import task_queue_name, task_queue_wait
+        if not current_task or current_task.request.id is None:
+            return None, None, None
+        request = current_task.request
+        return request.id, task_queue_name(request), task_queue_wait(request)
+    except Exception:
+        return None, None, None
+
+
+def track_job_run(func):
+    """
+    Decorator for Celery task functions. Place it below `@celery.task`.
+    Ledger failures are logged and never break the task itself.
+    """
+    from tubealgo.models import JobRun
+
+    task_name = f"{func.__module__}.{func.__name__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        tracker = JobRunTracker()
+        token = _current_run.set(tracker)
+        started = time.monotonic()
+        started_tracing = _start_memory_tracking()
+
+        run_id = None
+        try:
+            task_id, queue, wait_seconds = _celery_request_info()
+            run = JobRun(
+                task_name=task_name, celery_task_id=task_id, queue=queue, wait_seconds=wait_seconds,
+                status='running', started_at=datetime.utcnow()
+            )
+            db.session.add(run)
+            db.session.commit()
+            run_id = run.id
+        except Exception as e:
+            db.session.rollback()
+            print(f"WARNING: Could not record job run start for {task_name}: {e}")
+
+        status, error = 'success', None
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            status, error = 'failed', f"{e}\n\n{traceback.format_exc()}"
+            raise
+        finally:
+            _current_run.reset(token)
+            peak_memory_kb = _peak_memory_kb(started_tracing)
+            if run_id is not None:
+                try:
+                    if status == 'failed':
+                        db.session.rollback()
+                    run = db.session.get(JobRun, run_id)
+                    run.status = status
+                    run.error = error
+                    run.finished_at = datetime.utcnow()
+                    run.duration_seconds = round(time.monotonic() - started, 3)
+                    run.items_processed = tracker.items_processed
+                    run.items_failed = tracker.items_failed
+                    run.api_units = tracker.api_units
+                    run.peak_memory_kb = peak_memory_kb
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"WARNING: Could not record job run end for {task_name}: {e}")
+
+    return wrapper
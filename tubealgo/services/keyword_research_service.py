@@ -0,0 +1,141 @@
+# tubealgo/services/keyword_research_service.py
+"""
+Keyword research pipeline behind /keyword-research.
+
+The keyword is normalized (Unicode NFKC, lower case, collapsed whitespace) so
+"Python  Tutorial" and "python tutorial" share one result, and each
+(keyword, region) result, including its computed competition score, is kept
+in the API cache (searches without a region run globally, as before, and are
+cached under GLOBAL_REGION_KEY) for KEYWORD_RESEARCH_CACHE_HOURS. On a miss the suggestion
+lookup and the search -> video details chain run concurrently. Results with a
+failed stage are returned but not cached, so the next search retries them.
+"""
+
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from .cache_manager import get_from_cache, set_to_cache
+from .suggestion_service import get_keyword_suggestions
+from .youtube_core import get_youtube_service
+
+KEYWORD_RESEARCH_CACHE_HOURS = 12
+GLOBAL_REGION_KEY = 'global'
+TOP_RANKING_VIDEO_COUNT = 5
+TOP_TAG_COUNT = 30
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='keyword-research')
+
+_UNKNOWN_COMPETITION = {"score": "N/A", "text": "Could not determine.", "color": "text-gray-500"}
+
+
+def normalize_keyword(keyword):
+    return ' '.join(unicodedata.normalize('NFKC', keyword or '').lower().split())
+
+
+def normalize_region(region):
+    """An ISO 3166-1 alpha-2 code, or None for a global search."""
+    region = (region or '').strip().upper()
+    return region if len(region) == 2 and region.isalpha() else None
+
+
+def _cache_key(keyword, region):
+    return f"keyword_research_v1:{region or GLOBAL_REGION_KEY}:{keyword}"
+
+
+def _run_in_app(app, fn, *args):
+    with app.app_context():
+        return fn(*args)
+
+
+def score_competition(top_ranking_videos):
+    """Rates how hard it is to rank from the view counts of the current top results."""
+    if not top_ranking_videos:
+        return dict(_UNKNOWN_COMPETITION)
+    total_views = sum(video['view_count'] for video in top_ranking_videos)
+    high_view_count_videos = sum(1 for video in top_ranking_videos if video['view_count'] > 500000)
+    if total_views > 2000000 and high_view_count_videos >= 2:
+        return {"score": "High", "text": "Very competitive. Dominated by high-view videos.", "color": "text-red-500"}
+    if total_views > 500000 or high_view_count_videos >= 1:
+        return {"score": "Medium", "text": "Moderately competitive. Opportunity exists.", "color": "text-yellow-500"}
+    return {"score": "Low", "text": "Less competitive. Good opportunity to rank!", "color": "text-green-500"}
+
+
+def fetch_top_ranking_videos(keyword, region):
+    """search.list followed by one videos.list for the details. Returns (videos, tags, error)."""
+    youtube, error = get_youtube_service()
+    if error:
+        return [], [], f"API Error: {error}"
+    try:
+        search_params = {'q': keyword, 'part': 'id', 'type': 'video',
+                         'maxResults': TOP_RANKING_VIDEO_COUNT, 'order': 'relevance'}
+        if region:
+            search_params['regionCode'] = region
+        search_response = youtube.search().list(**search_params).execute()
+        video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
+        if not video_ids:
+            return [], [], None
+
+        videos_response = youtube.videos().list(part='snippet,statistics,contentDetails', id=','.join(video_ids)).execute()
+        videos, all_tags = [], []
+        for item in videos_response.get('items', []):
+            snippet = item.get('snippet', {})
+            videos.append({
+                'id': item.get('id'),
+                'title': snippet.get('title'),
+                'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url'),
+                'channel_title': snippet.get('channelTitle'),
+                'view_count': int(item.get('statistics', {}).get('viewCount', 0)),
+                'published_at': snippet.get('publishedAt')
+            })
+            all_tags.extend(snippet.get('tags', []) or [])
+        return videos, all_tags, None
+    except Exception as e:
+        return [], [], f"Could not fetch complete YouTube data: {e}"
+
+
+def research_keyword(keyword, region=None):
+    """
+    Returns {'keyword', 'region', 'suggestions', 'top_ranking_videos',
+    'top_video_tags', 'competition_score', 'errors'} for a keyword.
+    """
+    keyword = normalize_keyword(keyword)
+    region = normalize_region(region)
+    cache_key = _cache_key(keyword, region)
+    cached = get_from_cache(cache_key)
+    if cached:
+        return cached
+
+    app = current_app._get_current_object()
+    suggestions_future = _executor.submit(_run_in_app, app, get_keyword_suggestions, keyword)
+    videos_future = _executor.submit(_run_in_app, app, fetch_top_ranking_videos, keyword, region)
+
+    errors = []
+    try:
+        suggestions = suggestions_future.result()
+    except Exception as e:
+        suggestions = {'error': f'An unexpected error occurred: {e}'}
+    if 'error' in suggestions:
+        errors.append(suggestions['error'])
+
+    try:
+        top_ranking_videos, all_tags, videos_error = videos_future.result()
+    except Exception as e:
+        top_ranking_videos, all_tags, videos_error = [], [], f"Could not fetch complete YouTube data: {e}"
+    if videos_error:
+        errors.append(videos_error)
+
+    result = {
+        'keyword': keyword,
+        'region': region,
+        'suggestions': suggestions,
+        'top_ranking_videos': top_ranking_videos,
+        'top_video_tags': Counter(all_tags).most_common(TOP_TAG_COUNT) if all_tags else [],
+        'competition_score': score_competition(top_ranking_videos) if not videos_error else dict(_UNKNOWN_COMPETITION),
+        'errors': errors,
+    }
+    if not errors:
+        set_to_cache(cache_key, result, expire_hours=KEYWORD_RESEARCH_CACHE_HOURS)
+    return result
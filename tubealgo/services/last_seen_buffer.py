@@ -0,0 +1,91 @@
+# tubealgo/services/last_seen_buffer.py
+"""
+Buffered `User.last_seen` tracking.
+
+Requests only record "user X was seen at T" in a per-process dict. A daemon
+thread writes the newest timestamp per user with one bulk UPDATE every
+FLUSH_INTERVAL_SECONDS, so page loads never open a write transaction just to
+move last_seen forward.
+"""
+
+import atexit
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+
+FLUSH_INTERVAL_SECONDS = 60
+
+
+class LastSeenBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._thread = None
+        self._pid = None
+        self._app = None
+
+    def touch(self, user_id, seen_at=None):
+        """Records that a user was active. Never touches the database."""
+        if not self._ensure_started():
+            return
+        with self._lock:
+            self._pending[user_id] = seen_at or datetime.utcnow()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return True
+        from flask import current_app, has_app_context
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return True
+            if has_app_context():
+                self._app = current_app._get_current_object()
+            if self._app is None:
+                return False
+            if self._pid != os.getpid():
+                # Timestamps buffered by the parent belong to the parent.
+                self._pending = {}
+                self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='last-seen-flusher', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL_SECONDS)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"!!! last_seen flush error: {e}\n{traceback.format_exc()}")
+
+    def flush(self):
+        """Writes all buffered timestamps in one executemany UPDATE."""
+        if self._app is None:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        from sqlalchemy import bindparam, or_, update
+        from tubealgo import db
+        from tubealgo.models import User
+
+        users = User.__table__
+        stmt = update(users).where(
+            users.c.id == bindparam('user_id'),
+            or_(users.c.last_seen.is_(None), users.c.last_seen < bindparam('seen_at'))
+        ).values(last_seen=bindparam('seen_at'))
+        rows = [{'user_id': user_id, 'seen_at': seen_at} for user_id, seen_at in pending.items()]
+        with self._app.app_context():
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(stmt, rows)
+            except Exception as e:
+                print(f"!!! FAILED TO WRITE last_seen FOR {len(rows)} USERS: {e}")
+
+
+last_seen_buffer = LastSeenBuffer()
+atexit.register(last_seen_buffer.flush)
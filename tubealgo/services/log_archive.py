@@ -0,0 +1,75 @@
+# tubealgo/services/log_archive.py
+"""
+SystemLog retention. Rows older than SYSTEM_LOG_RETENTION_DAYS are written to
+SystemLogArchive as one gzipped JSON Lines batch per day and then deleted in
+the same transaction, so the live table only holds the recent window the admin
+search works on.
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from tubealgo import db
+from tubealgo.models import SystemLog, SystemLogArchive
+
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def _build_archive_batches(rows):
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(row.timestamp.date(), []).append(row)
+
+    archives = []
+    for day, day_rows in by_day.items():
+        lines = [
+            json.dumps({
+                'id': row.id,
+                'timestamp': row.timestamp.isoformat(),
+                'log_type': row.log_type,
+                'message': row.message,
+                'details': row.details,
+            }, ensure_ascii=False)
+            for row in day_rows
+        ]
+        content = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+        archives.append(SystemLogArchive(
+            day=day,
+            first_log_id=min(row.id for row in day_rows),
+            last_log_id=max(row.id for row in day_rows),
+            row_count=len(day_rows),
+            content=content,
+            size_bytes=len(content),
+        ))
+    return archives
+
+
+def archive_old_system_logs(retention_days=None, now=None):
+    """
+    Archives and deletes SystemLog rows older than the retention window in
+    batches, oldest first. Each batch's archive rows and its delete commit
+    together, so a failure leaves the logs in place. Returns the number of
+    rows archived.
+    """
+    if retention_days is None:
+        retention_days = current_app.config.get('SYSTEM_LOG_RETENTION_DAYS', 30)
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+
+    archived = 0
+    while True:
+        rows = SystemLog.query.filter(
+            SystemLog.timestamp < cutoff
+        ).order_by(SystemLog.timestamp.asc(), SystemLog.id.asc()).limit(ARCHIVE_BATCH_SIZE).all()
+        if not rows:
+            break
+
+        db.session.add_all(_build_archive_batches(rows))
+        SystemLog.query.filter(SystemLog.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(rows)
+        if len(rows) < ARCHIVE_BATCH_SIZE:
+            break
+    return archived
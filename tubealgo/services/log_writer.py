@@ -0,0 +1,206 @@
+# tubealgo/services/log_writer.py
+"""
+Buffered, non-blocking SystemLog writer.
+
+`log_system_event` only puts the event on an in-memory queue. A daemon
+thread in each process drains the queue every few seconds, inserts the
+events in one batch, and sends Telegram alerts for critical types. Duplicate
+alerts are coalesced per (type, message) window and alerts overall are rate
+limited; suppressed repeats are reported in one summary message when their
+window closes.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+
+FLUSH_INTERVAL_SECONDS = 2
+FLUSH_BATCH_SIZE = 200
+MAX_BUFFERED_EVENTS = 10000
+ALERT_COALESCE_SECONDS = 300
+ALERT_RATE_LIMIT_PER_MINUTE = 10
+CRITICAL_LOG_TYPES = ('QUOTA_EXCEEDED', 'ERROR', 'PROJECT_QUOTA_EXCEEDED')
+
+
+class AlertThrottle:
+    """Decides which critical events become Telegram alerts."""
+
+    def __init__(self, window_seconds=ALERT_COALESCE_SECONDS, per_minute=ALERT_RATE_LIMIT_PER_MINUTE, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.per_minute = per_minute
+        self.clock = clock
+        self._windows = {}
+        self._sent_at = deque()
+
+    def admit(self, log_type, message):
+        """True if this event should be alerted now; otherwise it is counted for a later summary."""
+        now = self.clock()
+        key = (log_type, message)
+        window = self._windows.get(key)
+        if window and now - window['opened_at'] < self.window_seconds:
+            window['suppressed'] += 1
+            return False
+
+        while self._sent_at and now - self._sent_at[0] >= 60:
+            self._sent_at.popleft()
+        if len(self._sent_at) >= self.per_minute:
+            self._windows[key] = {'opened_at': now, 'suppressed': 1}
+            return False
+
+        self._sent_at.append(now)
+        self._windows[key] = {'opened_at': now, 'suppressed': 0}
+        return True
+
+    def due_summaries(self):
+        """Closes expired windows and returns [(log_type, message, suppressed_count)] for those with repeats."""
+        now = self.clock()
+        summaries = []
+        for key, window in list(self._windows.items()):
+            if now - window['opened_at'] >= self.window_seconds:
+                del self._windows[key]
+                if window['suppressed']:
+                    summaries.append((key[0], key[1], window['suppressed']))
+        return summaries
+
+
+class SystemLogWriter:
+    def __init__(self):
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=MAX_BUFFERED_EVENTS)
+        self._thread = None
+        self._pid = None
+        self._app = None
+        self._dropped = 0
+        self.throttle = AlertThrottle()
+
+    def enqueue(self, event):
+        """Queues one event dict (timestamp, log_type, message, details). Never blocks."""
+        if not self._ensure_started():
+            print(f"[{event['log_type']}] {event['message']} (no app context, not persisted)")
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._dropped += 1
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return True
+        from flask import current_app, has_app_context
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return True
+            if has_app_context():
+                self._app = current_app._get_current_object()
+            if self._app is None:
+                return False
+            if self._pid != os.getpid():
+                # A forked worker must not inherit the parent's queue or its locks.
+                self._queue = queue.Queue(maxsize=MAX_BUFFERED_EVENTS)
+                self._flush_lock = threading.Lock()
+                self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='system-log-writer', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        while True:
+            try:
+                self.flush(wait_seconds=FLUSH_INTERVAL_SECONDS)
+            except Exception as e:
+                print(f"!!! SystemLog writer loop error: {e}\n{traceback.format_exc()}")
+                time.sleep(FLUSH_INTERVAL_SECONDS)
+
+    def _drain(self, wait_seconds):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=wait_seconds) if wait_seconds else self._queue.get_nowait())
+        except queue.Empty:
+            return batch
+        while len(batch) < FLUSH_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, wait_seconds=0):
+        """Writes everything currently queued. Safe to call from any thread."""
+        if self._app is None:
+            return
+        while True:
+            batch = self._drain(wait_seconds)
+            with self._flush_lock, self._app.app_context():
+                if batch:
+                    self._write(batch)
+                    self._send_alerts(batch)
+                self._send_summaries()
+                if self._dropped:
+                    print(f"WARNING: SystemLog buffer was full, dropped {self._dropped} events.")
+                    self._dropped = 0
+            if len(batch) < FLUSH_BATCH_SIZE:
+                return
+            wait_seconds = 0
+
+    def _write(self, batch):
+        from tubealgo import db
+        from tubealgo.models import SystemLog
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(SystemLog.__table__.insert(), batch)
+        except Exception as e:
+            print(f"!!! FAILED TO WRITE {len(batch)} SYSTEM LOG EVENTS: {e}")
+            for event in batch:
+                print(f"[{event['log_type']}] {event['message']}")
+
+    def _send_alerts(self, batch):
+        from tubealgo.models import get_setting
+        from .notification_service import send_telegram_message
+
+        critical = [e for e in batch if e['log_type'] in CRITICAL_LOG_TYPES]
+        if not critical:
+            return
+        admin_chat_id = get_setting('ADMIN_TELEGRAM_CHAT_ID')
+        if not admin_chat_id:
+            return
+
+        for event in critical:
+            if not self.throttle.admit(event['log_type'], event['message']):
+                continue
+            log_type = event['log_type']
+            alert_title = "Critical Alert" if log_type == 'ERROR' else "Quota Alert"
+            icon = "🚨" if log_type == 'ERROR' else "⚠️"
+            telegram_message = (
+                f"{icon} *{alert_title}: {log_type}*\n\n"
+                f"*Message:* {event['message']}\n\n"
+            )
+            details_str = event.get('details') or ''
+            if details_str:
+                truncated_details = details_str[:1000] + ('...' if len(details_str) > 1000 else '')
+                telegram_message += f"*Details:* ```\n{truncated_details}\n```"
+            send_telegram_message(admin_chat_id, telegram_message)
+
+    def _send_summaries(self):
+        summaries = self.throttle.due_summaries()
+        if not summaries:
+            return
+        from tubealgo.models import get_setting
+        from .notification_service import send_telegram_message
+
+        admin_chat_id = get_setting('ADMIN_TELEGRAM_CHAT_ID')
+        if not admin_chat_id:
+            return
+        lines = [f"• `{log_type}` ×{count}: {message[:200]}" for log_type, message, count in summaries]
+        send_telegram_message(
+            admin_chat_id,
+            f"🔁 *Suppressed Alerts (last {ALERT_COALESCE_SECONDS // 60} min)*\n\n" + "\n".join(lines)
+        )
+
+
+system_log_writer = SystemLogWriter()
+atexit.register(system_log_writer.flush)
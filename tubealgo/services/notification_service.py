@@ -1,6 +1,9 @@
 # Filepath: tubealgo/services/notification_service.py
+import hashlib
+import hmac
 import requests
 import json # json को इम्पोर्ट करें
+from flask import current_app
 
 def send_telegram_message(chat_id, message, reply_markup=None):
     # इम्पोर्ट को फंक्शन के अंदर ले जाया गया है
@@ -53,4 +56,28 @@ def send_telegram_photo_with_caption(chat_id, photo_url, caption):
     except Exception as e:
         print(f"Error sending Telegram photo: {e}")
         # Fallback to text message if photo fails
-        return send_telegram_message(chat_id, caption)
\ No newline at end of file
+        return send_telegram_message(chat_id, caption)
+
+USER_CHANNEL_PREFIX = 'user-'
+
+def user_event_channel(user_id):
+    """
+    Name of the per-user SSE channel served by the /stream blueprint. The
+    name is an HMAC of the user id under SECRET_KEY, so it cannot be guessed.
+    """
+    secret = current_app.config['SECRET_KEY'].encode('utf-8')
+    digest = hmac.new(secret, f"user-events:{user_id}".encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"{USER_CHANNEL_PREFIX}{digest[:32]}"
+
+def publish_user_event(user_id, event_type, data):
+    """
+    Pushes a live update to the user's SSE channel.
+    Failures (e.g. Redis unavailable) are swallowed so background work never breaks on them.
+    """
+    try:
+        from flask_sse import sse
+        sse.publish(data, type=event_type, channel=user_event_channel(user_id))
+        return True
+    except Exception as e:
+        print(f"Error publishing SSE event '{event_type}' for user {user_id}: {e}")
+        return False
@@ -0,0 +1,180 @@
+# tubealgo/services/report_service.py
+"""
+Monthly PDF reports, rendered by a Celery task instead of the request thread.
+
+A report is generated once per user and period (the UTC day its 30-day window
+ends on) and tracked by a ReportArtifact row. The PDF itself is stored
+content-addressed under its SHA-256 hash in ReportFile, so identical reports
+share one row and the web service can serve what the worker rendered (they
+do not share a disk). Artifacts older than REPORT_RETENTION_DAYS, and files
+no artifact references any more, are pruned daily.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from flask import render_template
+from sqlalchemy.exc import IntegrityError
+
+from tubealgo import db
+from tubealgo.db_router import primary
+from tubealgo.models import ChannelSnapshot, ReportArtifact, ReportFile
+from .channel_fetcher import analyze_channel
+from .youtube_manager import get_user_videos
+
+REPORT_TYPE_MONTHLY = 'monthly'
+REPORT_WINDOW_DAYS = 30
+# A report still pending after this long is assumed lost (e.g. a worker
+# restart) and is queued again on the next request.
+REPORT_PENDING_TIMEOUT_MINUTES = 10
+REPORT_RETENTION_DAYS = 30
+
+
+def _has_report_file(content_hash):
+    # Selects only the key, so the PDF bytes are not loaded.
+    return db.session.query(ReportFile.content_hash).filter_by(content_hash=content_hash).first() is not None
+
+
+def store_artifact(content):
+    """Stores bytes under their SHA-256 hash unless already stored. Returns the hash."""
+    content_hash = hashlib.sha256(content).hexdigest()
+    with primary():
+        if _has_report_file(content_hash):
+            return content_hash
+        db.session.add(ReportFile(content_hash=content_hash, content=content, size_bytes=len(content)))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same bytes first.
+            db.session.rollback()
+    return content_hash
+
+
+def load_artifact_content(artifact):
+    """The stored PDF bytes for an artifact, or None."""
+    if not artifact.content_hash:
+        return None
+    return db.session.query(ReportFile.content).filter_by(content_hash=artifact.content_hash).scalar()
+
+
+def monthly_period_key(now=None):
+    return (now or datetime.now(timezone.utc)).date().isoformat()
+
+
+def is_artifact_available(artifact):
+    return artifact.status == 'ready' and bool(artifact.content_hash) and _has_report_file(artifact.content_hash)
+
+
+def prune_report_artifacts(now=None):
+    """
+    Deletes artifacts requested more than REPORT_RETENTION_DAYS ago, then the
+    files no remaining artifact points to. Returns (artifacts, files) deleted.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=REPORT_RETENTION_DAYS)
+    deleted_artifacts = ReportArtifact.query.filter(
+        ReportArtifact.requested_at < cutoff
+    ).delete(synchronize_session=False)
+    referenced = db.session.query(ReportArtifact.content_hash).filter(ReportArtifact.content_hash.isnot(None))
+    # Recent files may belong to a report whose artifact is not marked ready yet.
+    deleted_files = ReportFile.query.filter(
+        ReportFile.created_at < cutoff, ReportFile.content_hash.notin_(referenced)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted_artifacts, deleted_files
+
+
+def request_monthly_report(user, now=None):
+    """
+    Returns the user's ReportArtifact for the current period, queueing its
+    generation unless it is ready or already being generated.
+    """
+    now_utc = now or datetime.utcnow()
+    period_key = monthly_period_key(now_utc)
+    artifact = ReportArtifact.query.filter_by(user_id=user.id, report_type=REPORT_TYPE_MONTHLY, period_key=period_key).first()
+
+    if artifact and is_artifact_available(artifact):
+        return artifact
+    if artifact and artifact.status == 'pending' and artifact.requested_at > now_utc - timedelta(minutes=REPORT_PENDING_TIMEOUT_MINUTES):
+        return artifact
+
+    if artifact is None:
+        artifact = ReportArtifact(user_id=user.id, report_type=REPORT_TYPE_MONTHLY, period_key=period_key)
+        db.session.add(artifact)
+    artifact.status = 'pending'
+    artifact.error = None
+    artifact.requested_at = now_utc
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A parallel request created the row first; it has queued the task.
+        db.session.rollback()
+        return ReportArtifact.query.filter_by(user_id=user.id, report_type=REPORT_TYPE_MONTHLY, period_key=period_key).first()
+
+    from tubealgo.jobs import generate_monthly_report
+    generate_monthly_report.delay(artifact.id)
+    return artifact
+
+
+def build_monthly_report_context(user, creds, now=None):
+    """Collects everything the report template shows. Raises if the channel cannot be fetched."""
+    today = now or datetime.now(timezone.utc)
+    thirty_days_ago = today - timedelta(days=REPORT_WINDOW_DAYS)
+
+    channel_stats = analyze_channel(user.channel.channel_id_youtube)
+    if 'error' in channel_stats:
+        raise Exception(f"Could not generate report: {channel_stats['error']}")
+
+    past_snapshot = ChannelSnapshot.query.filter(
+        ChannelSnapshot.channel_db_id == user.channel.id,
+        ChannelSnapshot.date <= thirty_days_ago.date()
+    ).order_by(ChannelSnapshot.date.desc()).first()
+
+    growth = {
+        "subscribers_gained": 0,
+        "views_gained": 0
+    }
+    if past_snapshot:
+        growth["subscribers_gained"] = channel_stats.get('Subscribers', 0) - past_snapshot.subscribers
+        growth["views_gained"] = channel_stats.get('Total Views', 0) - past_snapshot.views
+
+    all_videos = get_user_videos(user, creds) if creds else []
+    top_videos = []
+    if isinstance(all_videos, list):
+        videos_in_period = [
+            v for v in all_videos
+            if datetime.fromisoformat(v['published_at'].replace('Z', '+00:00')) >= thirty_days_ago
+        ]
+        top_videos = sorted(videos_in_period, key=lambda x: x.get('view_count', 0), reverse=True)[:5]
+
+    return {
+        'channel_stats': channel_stats,
+        'report_period': f"{thirty_days_ago.strftime('%B %d, %Y')} - {today.strftime('%B %d, %Y')}",
+        'growth': growth,
+        'top_videos': top_videos,
+        'generation_date': today.strftime('%B %d, %Y'),
+    }
+
+
+def render_monthly_report_pdf(context):
+    # Imported here so web processes, which no longer render PDFs, skip loading WeasyPrint.
+    from weasyprint import HTML
+    html_string = render_template('reports/monthly_summary.html', **context)
+    return HTML(string=html_string).write_pdf()
+
+
+def generate_report_artifact(artifact, user, creds):
+    """Renders and stores the PDF for a pending artifact and marks it ready."""
+    context = build_monthly_report_context(user, creds)
+    pdf_file = render_monthly_report_pdf(context)
+    content_hash = store_artifact(pdf_file)
+
+    from tubealgo.routes.utils import sanitize_filename
+    title = sanitize_filename(context['channel_stats'].get('Title', 'Channel'))
+    artifact.content_hash = content_hash
+    artifact.size_bytes = len(pdf_file)
+    artifact.filename = f"Monthly_Report_{title}_{artifact.period_key.replace('-', '_')}.pdf"
+    artifact.status = 'ready'
+    artifact.error = None
+    artifact.completed_at = datetime.utcnow()
+    db.session.commit()
+    return artifact
@@ -0,0 +1,354 @@
+# tubealgo/services/snapshot_service.py
+
+from datetime import date, datetime, timedelta
+import numpy as np
+from tubealgo import db
+from tubealgo.models import VideoSnapshot, VideoSnapshotHourly, VideoSnapshotDaily, ChannelSnapshot
+
+# Raw rows only need to live until they are safely rolled up into hourly buckets.
+RAW_SNAPSHOT_RETENTION_DAYS = 7
+HOURLY_ROLLUP_RETENTION_DAYS = 90
+# Daily rollups are tiny (one row per video per day) and are kept forever.
+
+# Keeps the IN (...) list of the latest-snapshot query well below driver limits.
+LATEST_SNAPSHOT_BATCH_SIZE = 500
+CHANNEL_SERIES_BATCH_SIZE = 500
+
+
+def _hour_start(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _compute_vph(prev_views, prev_ts, views, ts):
+    """Views-per-hour between two samples, or None if they are too close together."""
+    if prev_views is None or prev_ts is None:
+        return None
+    seconds = (ts - prev_ts).total_seconds()
+    if seconds <= 60:
+        return None
+    return round(((views - prev_views) / seconds) * 3600, 2)
+
+
+def _aggregate(rows, bucket_of, prev_last):
+    """
+    Folds time-ordered (video_id, timestamp, min, max, last) rows into buckets.
+    `prev_last` maps video_id -> (last_views, last_timestamp) of the bucket
+    preceding the window so the first bucket's VPH can still be computed.
+    """
+    buckets = {}
+    for video_id, ts, low, high, last in rows:
+        key = (video_id, bucket_of(ts))
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = {'min': low, 'max': high, 'last': last, 'last_ts': ts, 'count': 1}
+        else:
+            bucket['min'] = min(bucket['min'], low)
+            bucket['max'] = max(bucket['max'], high)
+            bucket['last'], bucket['last_ts'] = last, ts
+            bucket['count'] += 1
+
+    for (video_id, _), bucket in sorted(buckets.items(), key=lambda item: item[0]):
+        prev_views, prev_ts = prev_last.get(video_id, (None, None))
+        bucket['vph'] = _compute_vph(prev_views, prev_ts, bucket['last'], bucket['last_ts'])
+        prev_last[video_id] = (bucket['last'], bucket['last_ts'])
+    return buckets
+
+
+def rollup_hourly(now=None):
+    """
+    Compacts raw VideoSnapshot rows into VideoSnapshotHourly buckets.
+    Only complete hours are rolled up, and the most recent rolled-up hour is
+    recomputed so late-arriving rows are never lost. Returns the bucket count.
+    """
+    now = now or datetime.utcnow()
+    window_end = _hour_start(now)
+
+    latest_bucket = db.session.query(db.func.max(VideoSnapshotHourly.bucket_start)).scalar()
+    if latest_bucket:
+        window_start = latest_bucket
+    else:
+        window_start = db.session.query(db.func.min(VideoSnapshot.timestamp)).scalar()
+        if not window_start:
+            return 0
+        window_start = _hour_start(window_start)
+
+    if window_start >= window_end:
+        return 0
+
+    rows = db.session.query(
+        VideoSnapshot.video_id, VideoSnapshot.timestamp, VideoSnapshot.view_count
+    ).filter(
+        VideoSnapshot.timestamp >= window_start, VideoSnapshot.timestamp < window_end
+    ).order_by(VideoSnapshot.timestamp.asc()).all()
+
+    previous = VideoSnapshotHourly.query.filter(
+        VideoSnapshotHourly.bucket_start >= window_start - timedelta(days=1),
+        VideoSnapshotHourly.bucket_start < window_start
+    ).order_by(VideoSnapshotHourly.bucket_start.asc()).all()
+    prev_last = {row.video_id: (row.last_views, row.last_timestamp) for row in previous}
+
+    buckets = _aggregate(
+        ((r.video_id, r.timestamp, r.view_count, r.view_count, r.view_count) for r in rows),
+        _hour_start, prev_last
+    )
+
+    VideoSnapshotHourly.query.filter(
+        VideoSnapshotHourly.bucket_start >= window_start,
+        VideoSnapshotHourly.bucket_start < window_end
+    ).delete(synchronize_session=False)
+    db.session.bulk_save_objects([
+        VideoSnapshotHourly(
+            video_id=video_id, bucket_start=bucket_start,
+            min_views=b['min'], max_views=b['max'], last_views=b['last'],
+            last_timestamp=b['last_ts'], sample_count=b['count'], vph=b['vph']
+        )
+        for (video_id, bucket_start), b in buckets.items()
+    ])
+    db.session.commit()
+    return len(buckets)
+
+
+def rollup_daily(now=None):
+    """
+    Compacts VideoSnapshotHourly buckets into VideoSnapshotDaily rows for
+    every complete day. Returns the number of daily rows written.
+    """
+    now = now or datetime.utcnow()
+    window_end = now.date()
+
+    latest_day = db.session.query(db.func.max(VideoSnapshotDaily.date)).scalar()
+    if latest_day:
+        window_start = latest_day
+    else:
+        first_bucket = db.session.query(db.func.min(VideoSnapshotHourly.bucket_start)).scalar()
+        if not first_bucket:
+            return 0
+        window_start = first_bucket.date()
+
+    if window_start >= window_end:
+        return 0
+
+    start_dt = datetime.combine(window_start, datetime.min.time())
+    end_dt = datetime.combine(window_end, datetime.min.time())
+    hourly = VideoSnapshotHourly.query.filter(
+        VideoSnapshotHourly.bucket_start >= start_dt, VideoSnapshotHourly.bucket_start < end_dt
+    ).order_by(VideoSnapshotHourly.bucket_start.asc()).all()
+
+    previous = VideoSnapshotDaily.query.filter(
+        VideoSnapshotDaily.date >= window_start - timedelta(days=7),
+        VideoSnapshotDaily.date < window_start
+    ).order_by(VideoSnapshotDaily.date.asc()).all()
+    prev_last = {row.video_id: (row.last_views, row.last_timestamp) for row in previous}
+
+    buckets = _aggregate(
+        ((h.video_id, h.last_timestamp, h.min_views, h.max_views, h.last_views) for h in hourly),
+        lambda ts: ts.date(), prev_last
+    )
+    sample_counts = {}
+    for h in hourly:
+        key = (h.video_id, h.last_timestamp.date())
+        sample_counts[key] = sample_counts.get(key, 0) + h.sample_count
+
+    VideoSnapshotDaily.query.filter(
+        VideoSnapshotDaily.date >= window_start, VideoSnapshotDaily.date < window_end
+    ).delete(synchronize_session=False)
+    db.session.bulk_save_objects([
+        VideoSnapshotDaily(
+            video_id=video_id, date=day,
+            min_views=b['min'], max_views=b['max'], last_views=b['last'],
+            last_timestamp=b['last_ts'], sample_count=sample_counts.get((video_id, day), b['count']),
+            vph=b['vph']
+        )
+        for (video_id, day), b in buckets.items()
+    ])
+    db.session.commit()
+    return len(buckets)
+
+
+def prune_rolled_up_snapshots(now=None):
+    """
+    Deletes raw rows that are both past retention and already covered by an
+    hourly bucket, and hourly buckets that are past their own retention.
+    Returns (raw_deleted, hourly_deleted).
+    """
+    now = now or datetime.utcnow()
+
+    latest_bucket = db.session.query(db.func.max(VideoSnapshotHourly.bucket_start)).scalar()
+    raw_deleted = 0
+    if latest_bucket:
+        raw_cutoff = min(now - timedelta(days=RAW_SNAPSHOT_RETENTION_DAYS), latest_bucket)
+        raw_deleted = VideoSnapshot.query.filter(
+            VideoSnapshot.timestamp < raw_cutoff
+        ).delete(synchronize_session=False)
+
+    latest_day = db.session.query(db.func.max(VideoSnapshotDaily.date)).scalar()
+    hourly_deleted = 0
+    if latest_day:
+        hourly_cutoff = min(
+            now - timedelta(days=HOURLY_ROLLUP_RETENTION_DAYS),
+            datetime.combine(latest_day, datetime.min.time())
+        )
+        hourly_deleted = VideoSnapshotHourly.query.filter(
+            VideoSnapshotHourly.bucket_start < hourly_cutoff
+        ).delete(synchronize_session=False)
+
+    db.session.commit()
+    return raw_deleted, hourly_deleted
+
+
+def get_video_view_history(video_id, granularity='daily', days=30):
+    """Reads a video's view history from the rollup tables for charting."""
+    since = datetime.utcnow() - timedelta(days=days)
+    if granularity == 'hourly':
+        rows = VideoSnapshotHourly.query.filter(
+            VideoSnapshotHourly.video_id == video_id, VideoSnapshotHourly.bucket_start >= since
+        ).order_by(VideoSnapshotHourly.bucket_start.asc()).all()
+        labels = [r.bucket_start.strftime('%d %b %H:00') for r in rows]
+    else:
+        rows = VideoSnapshotDaily.query.filter(
+            VideoSnapshotDaily.video_id == video_id, VideoSnapshotDaily.date >= since.date()
+        ).order_by(VideoSnapshotDaily.date.asc()).all()
+        labels = [r.date.strftime('%d %b') for r in rows]
+
+    return {
+        'labels': labels,
+        'views': [r.last_views for r in rows],
+        'min_views': [r.min_views for r in rows],
+        'max_views': [r.max_views for r in rows],
+        'vph': [r.vph for r in rows]
+    }
+
+
+def get_latest_snapshots(video_ids, per_video=2):
+    """
+    Returns {video_id: [(timestamp, view_count), ...]} with the `per_video`
+    most recent raw snapshots of every video, newest first, using one
+    windowed query per batch of IDs instead of one query per video.
+    """
+    video_ids = list(dict.fromkeys(video_ids))
+    latest = {}
+    for start in range(0, len(video_ids), LATEST_SNAPSHOT_BATCH_SIZE):
+        batch = video_ids[start:start + LATEST_SNAPSHOT_BATCH_SIZE]
+        row_number = db.func.row_number().over(
+            partition_by=VideoSnapshot.video_id,
+            order_by=VideoSnapshot.timestamp.desc()
+        ).label('rn')
+        ranked = db.session.query(
+            VideoSnapshot.video_id, VideoSnapshot.timestamp, VideoSnapshot.view_count, row_number
+        ).filter(VideoSnapshot.video_id.in_(batch)).subquery()
+
+        rows = db.session.query(
+            ranked.c.video_id, ranked.c.timestamp, ranked.c.view_count
+        ).filter(ranked.c.rn <= per_video).order_by(ranked.c.video_id, ranked.c.rn).all()
+
+        for video_id, ts, views in rows:
+            latest.setdefault(video_id, []).append((ts, views))
+    return latest
+
+
+def compute_latest_vph(video_ids):
+    """
+    Views-per-hour between each video's two latest snapshots, computed for
+    all videos in one vectorized pass. Videos with fewer than two snapshots,
+    or whose snapshots are a minute or less apart, are left out.
+    """
+    pairs = [(video_id, snaps) for video_id, snaps in get_latest_snapshots(video_ids).items() if len(snaps) == 2]
+    if not pairs:
+        return {}
+
+    ids = [video_id for video_id, _ in pairs]
+    latest_views = np.array([snaps[0][1] for _, snaps in pairs], dtype=np.float64)
+    previous_views = np.array([snaps[1][1] for _, snaps in pairs], dtype=np.float64)
+    seconds = np.array([(snaps[0][0] - snaps[1][0]).total_seconds() for _, snaps in pairs], dtype=np.float64)
+
+    valid = seconds > 60
+    vph = np.divide((latest_views - previous_views) * 3600, seconds, out=np.zeros_like(seconds), where=valid)
+    return {video_id: float(value) for video_id, value, ok in zip(ids, vph, valid) if ok}
+
+
+class SnapshotSeries:
+    """
+    Dense, gap-filled daily subscriber/view series for a set of channels.
+
+    `SnapshotSeries.fetch` loads the window plus each channel's last snapshot
+    before it in one query per batch of channels, then forward-fills every
+    channel at once with NumPy. Days before a channel's first snapshot take
+    that first value; channels without snapshots are all zeros.
+    """
+
+    def __init__(self, channel_ids, start_date, days, subscribers, views):
+        self.start_date = start_date
+        self.days = days
+        self.labels = [(start_date + timedelta(days=i)).strftime('%d %b') for i in range(days)]
+        self.subscribers = subscribers
+        self.views = views
+        self._row_of = {channel_id: row for row, channel_id in enumerate(channel_ids)}
+
+    @classmethod
+    def fetch(cls, channel_ids, days=30, end_date=None):
+        channel_ids = list(dict.fromkeys(channel_ids))
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+        row_of = {channel_id: row for row, channel_id in enumerate(channel_ids)}
+
+        # Column 0 holds the last snapshot before the window; columns 1..days the window itself.
+        subscribers = np.zeros((len(channel_ids), days + 1), dtype=np.int64)
+        views = np.zeros((len(channel_ids), days + 1), dtype=np.int64)
+        present = np.zeros((len(channel_ids), days + 1), dtype=bool)
+
+        for start in range(0, len(channel_ids), CHANNEL_SERIES_BATCH_SIZE):
+            batch = channel_ids[start:start + CHANNEL_SERIES_BATCH_SIZE]
+            for channel_id, day, subs, total_views in cls._query_rows(batch, start_date, end_date):
+                if isinstance(day, str):
+                    day = date.fromisoformat(day)
+                column = max(0, (day - start_date).days + 1)
+                row = row_of[channel_id]
+                subscribers[row, column], views[row, column], present[row, column] = subs, total_views, True
+
+        return cls(channel_ids, start_date, days, *cls._forward_fill(present, subscribers, views))
+
+    @staticmethod
+    def _query_rows(channel_ids, start_date, end_date):
+        in_window = db.session.query(
+            ChannelSnapshot.channel_db_id, ChannelSnapshot.date, ChannelSnapshot.subscribers, ChannelSnapshot.views
+        ).filter(
+            ChannelSnapshot.channel_db_id.in_(channel_ids),
+            ChannelSnapshot.date >= start_date, ChannelSnapshot.date <= end_date
+        )
+
+        ranked = db.session.query(
+            ChannelSnapshot.channel_db_id, ChannelSnapshot.date, ChannelSnapshot.subscribers, ChannelSnapshot.views,
+            db.func.row_number().over(
+                partition_by=ChannelSnapshot.channel_db_id, order_by=ChannelSnapshot.date.desc()
+            ).label('rn')
+        ).filter(
+            ChannelSnapshot.channel_db_id.in_(channel_ids), ChannelSnapshot.date < start_date
+        ).subquery()
+        before_window = db.session.query(
+            ranked.c.channel_db_id, ranked.c.date, ranked.c.subscribers, ranked.c.views
+        ).filter(ranked.c.rn == 1)
+
+        return in_window.union_all(before_window).all()
+
+    @staticmethod
+    def _forward_fill(present, *matrices):
+        days = present.shape[1]
+        # Index of the most recent present column at or before each column.
+        last_seen = np.maximum.accumulate(np.where(present, np.arange(days), -1), axis=1)
+        # Leading gaps (no earlier value at all) take the first value in the row.
+        first_seen = np.where(present.any(axis=1), present.argmax(axis=1), 0)
+        source = np.where(last_seen >= 0, last_seen, first_seen[:, None])
+        rows = np.arange(present.shape[0])[:, None]
+        return [matrix[rows, source][:, 1:] for matrix in matrices]
+
+    def chart_data(self, channel_id):
+        """The `growth_chart` payload used by the dashboard for one channel."""
+        row = self._row_of.get(channel_id)
+        if row is None:
+            zeros = [0] * self.days
+            return {'labels': list(self.labels), 'subscribers': zeros, 'views': list(zeros)}
+        return {
+            'labels': list(self.labels),
+            'subscribers': self.subscribers[row].tolist(),
+            'views': self.views[row].tolist()
+        }
@@ -0,0 +1,207 @@
+# tubealgo/services/task_queues.py
+"""
+Celery queue layout, task routing and queue monitoring.
+
+User-triggered work goes to `interactive`, scheduled sweeps to `batch` and
+outgoing Telegram messages to `notifications`, so a user never waits behind an
+hour-long sweep. `create_app` applies the layout; `WORKER_PROFILES` describe
+how each kind of worker should be started.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from celery.signals import before_task_publish, celeryd_after_setup
+from kombu import Exchange, Queue
+
+INTERACTIVE_QUEUE = 'interactive'
+BATCH_QUEUE = 'batch'
+NOTIFICATIONS_QUEUE = 'notifications'
+ALL_QUEUES = (INTERACTIVE_QUEUE, NOTIFICATIONS_QUEUE, BATCH_QUEUE)
+
+# With the Redis broker a lower number is served first within a queue (0-9).
+PRIORITY_STEPS = list(range(10))
+QUEUE_SEP = ':'
+DEFAULT_PRIORITY = 5
+
+TASK_QUEUES = tuple(Queue(name, Exchange(name, type='direct'), routing_key=name) for name in ALL_QUEUES)
+
+TASK_ROUTES = {
+    'tubealgo.jobs.perform_full_analysis': {'queue': INTERACTIVE_QUEUE, 'priority': 2},
+    'tubealgo.jobs.onboard_competitor': {'queue': INTERACTIVE_QUEUE, 'priority': 2},
+    'tubealgo.jobs.bulk_edit_videos': {'queue': INTERACTIVE_QUEUE, 'priority': 4},
+    'tubealgo.jobs.generate_monthly_report': {'queue': INTERACTIVE_QUEUE, 'priority': 4},
+    'tubealgo.jobs.start_thumbnail_test': {'queue': INTERACTIVE_QUEUE, 'priority': 4},
+    'tubealgo.jobs.advance_thumbnail_test': {'queue': INTERACTIVE_QUEUE, 'priority': 6},
+    'tubealgo.jobs.finalize_thumbnail_test': {'queue': INTERACTIVE_QUEUE, 'priority': 6},
+    'tubealgo.jobs.send_telegram_notification': {'queue': NOTIFICATIONS_QUEUE, 'priority': 3},
+    'tubealgo.jobs.check_for_new_videos': {'queue': BATCH_QUEUE, 'priority': 3},
+    'tubealgo.jobs.take_video_snapshots': {'queue': BATCH_QUEUE, 'priority': 5},
+    'tubealgo.jobs.update_all_dashboards': {'queue': BATCH_QUEUE, 'priority': 5},
+    'tubealgo.jobs.take_daily_snapshots': {'queue': BATCH_QUEUE, 'priority': 5},
+    'tubealgo.jobs.rollup_video_snapshots': {'queue': BATCH_QUEUE, 'priority': 7},
+    'tubealgo.jobs.cleanup_old_snapshots': {'queue': BATCH_QUEUE, 'priority': 8},
+    'tubealgo.jobs.archive_system_logs': {'queue': BATCH_QUEUE, 'priority': 8},
+    'tubealgo.jobs.prune_old_reports': {'queue': BATCH_QUEUE, 'priority': 8},
+}
+
+# Select one with CELERY_WORKER_PROFILE. Without a profile a worker consumes
+# every queue, which keeps a single small worker deployment working as before.
+WORKER_PROFILES = {
+    # Short, latency-sensitive tasks: small prefetch so one slow task never
+    # holds others hostage on the same worker.
+    'interactive': {
+        'queues': [INTERACTIVE_QUEUE, NOTIFICATIONS_QUEUE],
+        'worker_concurrency': 4,
+        'worker_prefetch_multiplier': 1,
+        'task_acks_late': True,
+    },
+    # Long sweeps: few processes so they cannot starve the interactive tier
+    # of database connections or API quota.
+    'batch': {
+        'queues': [BATCH_QUEUE],
+        'worker_concurrency': 2,
+        'worker_prefetch_multiplier': 1,
+        'task_acks_late': True,
+    },
+    'notifications': {
+        'queues': [NOTIFICATIONS_QUEUE],
+        'worker_concurrency': 2,
+        'worker_prefetch_multiplier': 4,
+        'task_acks_late': False,
+    },
+    'all': {
+        'queues': list(ALL_QUEUES),
+        'worker_prefetch_multiplier': 1,
+        'task_acks_late': True,
+    },
+}
+
+
+def celery_queue_config():
+    """Settings passed to `celery.conf.update` by `create_app`."""
+    return {
+        'task_queues': TASK_QUEUES,
+        'task_default_queue': BATCH_QUEUE,
+        'task_routes': TASK_ROUTES,
+        'task_default_priority': DEFAULT_PRIORITY,
+        'task_queue_max_priority': PRIORITY_STEPS[-1],
+        'broker_transport_options': {
+            'priority_steps': PRIORITY_STEPS,
+            'sep': QUEUE_SEP,
+            'queue_order_strategy': 'priority',
+        },
+    }
+
+
+def worker_profile_config(profile_name):
+    """Worker settings for a profile name, or {} if no (known) profile is set."""
+    profile = WORKER_PROFILES.get(profile_name or '')
+    if not profile:
+        return {}
+    return {key: value for key, value in profile.items() if key != 'queues'}
+
+
+_active_profile = {'name': None}
+
+
+def activate_worker_profile(profile_name):
+    if profile_name and profile_name not in WORKER_PROFILES:
+        print(f"WARNING: Unknown CELERY_WORKER_PROFILE '{profile_name}', consuming all queues.")
+        return
+    _active_profile['name'] = profile_name
+
+
+@celeryd_after_setup.connect
+def _select_profile_queues(sender, instance, **kwargs):
+    profile_name = _active_profile['name']
+    if not profile_name:
+        return
+    queues = WORKER_PROFILES[profile_name]['queues']
+    instance.app.amqp.queues.select(queues)
+    print(f"Celery worker profile '{profile_name}': consuming {', '.join(queues)}")
+
+
+@before_task_publish.connect
+def _stamp_enqueued_at(headers=None, **kwargs):
+    # Read back by the job ledger to measure how long a task sat in its queue.
+    if headers is not None:
+        headers.setdefault('enqueued_at', time.time())
+
+
+def task_queue_wait(request):
+    """
+    Seconds a Celery task request waited between publish (or its ETA) and
+    starting, or None if the publisher did not stamp it.
+    """
+    enqueued_at = getattr(request, 'enqueued_at', None) or (getattr(request, 'headers', None) or {}).get('enqueued_at')
+    if not enqueued_at:
+        return None
+    ready_at = float(enqueued_at)
+    eta = getattr(request, 'eta', None)
+    if eta:
+        try:
+            eta_dt = datetime.fromisoformat(eta) if isinstance(eta, str) else eta
+            ready_at = max(ready_at, eta_dt.timestamp())
+        except (TypeError, ValueError):
+            pass
+    return round(max(0.0, time.time() - ready_at), 3)
+
+
+def task_queue_name(request):
+    delivery_info = getattr(request, 'delivery_info', None) or {}
+    return delivery_info.get('routing_key') or delivery_info.get('queue')
+
+
+def get_queue_depths(broker_url):
+    """Number of messages waiting in each queue, counting every priority sub-list."""
+    import redis
+
+    depths = {}
+    client = redis.Redis.from_url(broker_url, socket_timeout=2)
+    try:
+        pipe = client.pipeline()
+        for queue in ALL_QUEUES:
+            pipe.llen(queue)
+            for priority in PRIORITY_STEPS[1:]:
+                pipe.llen(f"{queue}{QUEUE_SEP}{priority}")
+        counts = pipe.execute()
+    finally:
+        client.close()
+
+    per_queue = len(PRIORITY_STEPS)
+    for i, queue in enumerate(ALL_QUEUES):
+        depths[queue] = sum(counts[i * per_queue:(i + 1) * per_queue])
+    return depths
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 2)
+
+
+def get_queue_wait_stats(hours=1):
+    """p50/p95/max queue wait per queue over the last `hours`, from the job ledger."""
+    from tubealgo.models import JobRun
+
+    since = datetime.utcnow() - timedelta(hours=hours)
+    rows = JobRun.query.with_entities(JobRun.queue, JobRun.wait_seconds).filter(
+        JobRun.started_at >= since, JobRun.wait_seconds.isnot(None)
+    ).all()
+
+    waits = {}
+    for queue, wait_seconds in rows:
+        waits.setdefault(queue or 'unknown', []).append(wait_seconds)
+
+    stats = {}
+    for queue, values in waits.items():
+        values.sort()
+        stats[queue] = {
+            'count': len(values),
+            'p50': _percentile(values, 0.5),
+            'p95': _percentile(values, 0.95),
+            'max': round(values[-1], 2),
+        }
+    return stats
@@ -5,6 +5,7 @@ from googleapiclient.discovery import build
 from flask_login import current_user
 from .. import db
 from ..models import User, YouTubeChannel
+from .youtube_core import QuotaCountingHttpRequest
 import secrets
 from datetime import datetime
 
@@ -97,7 +98,7 @@ def process_google_login(credentials, flow_type):
         category = 'success'
 
         if flow_type == 'youtube':
-            youtube_service = build('youtube', 'v3', credentials=credentials)
+            youtube_service = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
             channels_response = youtube_service.channels().list(mine=True, part='snippet').execute()
 
             if channels_response.get('items'):
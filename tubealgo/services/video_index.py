@@ -0,0 +1,197 @@
+# tubealgo/services/video_index.py
+"""
+Stored per-channel video index behind the cursor-paginated video API.
+
+Every competitor package build writes the channel's videos (latest uploads
+plus the most viewed ones) into ChannelVideo, so paging, sorting and
+filtering a channel's videos is a single indexed query instead of another
+YouTube API round trip per page.
+
+Pages use keyset pagination: the opaque cursor carries the sort key and
+video_id of the last row served, and the next page starts strictly after it
+in (sort column desc, video_id desc) order. Unlike an offset, a cursor stays
+correct while the index is refreshed between page loads.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, or_
+
+from tubealgo import db
+from tubealgo.db_router import primary
+from tubealgo.models import ChannelVideo
+from .video_fetcher import get_all_channel_videos, get_most_viewed_videos
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+VIDEO_SORTS = {
+    'date': ChannelVideo.upload_date,
+    'views': ChannelVideo.view_count,
+    'comments': ChannelVideo.comment_count,
+}
+VIDEO_TYPES = ('all', 'long', 'shorts')
+
+
+def _parse_upload_date(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        # Stored as naive UTC, like every other timestamp column.
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _format_upload_date(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ') if value else None
+
+
+def serialize_video(row):
+    """Same keys as the video dicts built by fetcher_utils._create_video_objects."""
+    return {
+        'id': row.video_id,
+        'title': row.title,
+        'thumbnail': row.thumbnail,
+        'view_count': row.view_count,
+        'like_count': row.like_count,
+        'comment_count': row.comment_count,
+        'upload_date': _format_upload_date(row.upload_date),
+        'duration_seconds': row.duration_seconds,
+        'is_short': row.is_short,
+        'trending_status': row.trending_status,
+    }
+
+
+def index_channel_videos(channel_id, videos):
+    """
+    Replaces the stored index for a channel with the given video dicts:
+    existing rows are updated, new ones inserted and videos no longer in the
+    snapshot (deleted or made private) removed. Returns the number indexed.
+    """
+    incoming = {}
+    for video in videos:
+        upload_date = _parse_upload_date(video.get('upload_date'))
+        if video.get('id') and upload_date:
+            incoming[video['id']] = (video, upload_date)
+
+    now = datetime.utcnow()
+    # The diff must start from the primary's rows, not a lagging replica's.
+    with primary():
+        existing = {row.video_id: row for row in ChannelVideo.query.filter_by(channel_id_youtube=channel_id)}
+        for video_id, row in existing.items():
+            if video_id not in incoming:
+                db.session.delete(row)
+
+        for video_id, (video, upload_date) in incoming.items():
+            row = existing.get(video_id)
+            if row is None:
+                row = ChannelVideo(channel_id_youtube=channel_id, video_id=video_id)
+                db.session.add(row)
+            row.title = (video.get('title') or '')[:255]
+            row.thumbnail = video.get('thumbnail')
+            row.upload_date = upload_date
+            row.view_count = video.get('view_count', 0) or 0
+            row.like_count = video.get('like_count', 0) or 0
+            row.comment_count = video.get('comment_count', 0) or 0
+            row.duration_seconds = video.get('duration_seconds', 0) or 0
+            row.is_short = bool(video.get('is_short'))
+            row.trending_status = video.get('trending_status')
+            row.updated_at = now
+
+        db.session.commit()
+    return len(incoming)
+
+
+def has_channel_index(channel_id):
+    return db.session.query(ChannelVideo.query.filter_by(channel_id_youtube=channel_id).exists()).scalar()
+
+
+def merge_channel_videos(latest_videos, most_viewed_videos):
+    """Latest uploads and most viewed videos, deduplicated by id."""
+    videos_by_id = {}
+    for video in (latest_videos + most_viewed_videos):
+        if video and 'id' in video:
+            videos_by_id[video['id']] = video
+    return list(videos_by_id.values())
+
+
+def build_channel_index(channel_id):
+    """
+    Indexes a channel that has no stored rows yet (e.g. one browsed before
+    its competitor package was rebuilt) from the cached video lists.
+    """
+    latest_videos = get_all_channel_videos(channel_id)
+    if not isinstance(latest_videos, list):
+        latest_videos = []
+    most_viewed_videos = get_most_viewed_videos(channel_id, max_results=50).get('videos', [])
+    return index_channel_videos(channel_id, merge_channel_videos(latest_videos, most_viewed_videos))
+
+
+def encode_cursor(sort, row):
+    value = getattr(row, VIDEO_SORTS[sort].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, row.video_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Returns (sort_value, video_id). Raises ValueError for a malformed cursor or one from another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, value, video_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError('Invalid cursor.')
+    if cursor_sort != sort or not isinstance(video_id, str):
+        raise ValueError('Cursor does not match the requested sort.')
+    if sort == 'date':
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor.')
+    elif not isinstance(value, int):
+        raise ValueError('Invalid cursor.')
+    return value, video_id
+
+
+def query_channel_videos(channel_id, sort='date', video_type='all', published_after=None,
+                         published_before=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of a channel's indexed videos, newest / most viewed / most
+    commented first. Returns {'videos': [...], 'next_cursor': str or None}.
+    Raises ValueError for an unknown sort or type, or a bad cursor.
+    """
+    if sort not in VIDEO_SORTS:
+        raise ValueError(f"Unknown sort '{sort}'.")
+    if video_type not in VIDEO_TYPES:
+        raise ValueError(f"Unknown video type '{video_type}'.")
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    sort_column = VIDEO_SORTS[sort]
+
+    query = ChannelVideo.query.filter(ChannelVideo.channel_id_youtube == channel_id)
+    if video_type == 'shorts':
+        query = query.filter(ChannelVideo.is_short.is_(True))
+    elif video_type == 'long':
+        query = query.filter(ChannelVideo.is_short.is_(False))
+    if published_after:
+        query = query.filter(ChannelVideo.upload_date >= published_after)
+    if published_before:
+        query = query.filter(ChannelVideo.upload_date < published_before)
+    if cursor:
+        value, video_id = decode_cursor(cursor, sort)
+        query = query.filter(or_(
+            sort_column < value,
+            and_(sort_column == value, ChannelVideo.video_id < video_id)
+        ))
+
+    # One extra row tells us whether another page exists.
+    rows = query.order_by(sort_column.desc(), ChannelVideo.video_id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+    return {'videos': [serialize_video(row) for row in rows[:limit]], 'next_cursor': next_cursor}
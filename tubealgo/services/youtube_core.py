@@ -5,11 +5,38 @@ import logging
 from datetime import datetime, timedelta
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 from tubealgo.models import get_config_value, APIKeyStatus
 from tubealgo import db
+from tubealgo.db_router import primary
+from .job_ledger import record_api_units
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Quota cost per call in YouTube Data API units. Anything not listed costs 1 unit.
+API_UNIT_COSTS = {
+    'youtube.search.list': 100,
+    'youtube.videos.insert': 1600,
+    'youtube.videos.update': 50,
+    'youtube.thumbnails.set': 50,
+    'youtube.playlists.insert': 50,
+    'youtube.playlists.update': 50,
+    'youtube.playlists.delete': 50,
+    'youtube.playlistItems.insert': 50,
+    'youtube.playlistItems.update': 50,
+    'youtube.playlistItems.delete': 50,
+    'youtube.commentThreads.insert': 50,
+    'youtube.comments.insert': 50,
+}
+
+class QuotaCountingHttpRequest(HttpRequest):
+    """HttpRequest that reports the quota cost of every executed call to the job ledger."""
+    def execute(self, *args, **kwargs):
+        record_api_units(API_UNIT_COSTS.get(self.methodId, 1))
+        return super().execute(*args, **kwargs)
+
+# Key status is read and upserted here, so it must never come from a lagging replica.
+@primary()
 def get_youtube_service():
     """
     Creates and returns a YouTube Data API service object.
@@ -52,7 +79,7 @@ def get_youtube_service():
             continue
 
         try:
-            service = build('youtube', 'v3', developerKey=api_key)
+            service = build('youtube', 'v3', developerKey=api_key, requestBuilder=QuotaCountingHttpRequest)
             # A lightweight call to check if the key is valid and has quota
             service.i18nLanguages().list(part='snippet').execute()
             logging.info(f"Using API Key starting with: {api_key[:5]}")
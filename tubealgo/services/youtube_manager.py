@@ -15,6 +15,7 @@ from ..services.cache_manager import get_from_cache, set_to_cache
 from ..services.fetcher_utils import _get_uploads_playlist_id
 from ..services.video_fetcher import get_latest_videos as get_videos_by_channel_id
 from ..models import log_system_event
+from .youtube_core import QuotaCountingHttpRequest
 
 logging.basicConfig(level=logging.INFO)
 
@@ -52,7 +53,7 @@ def get_user_videos(user, credentials):
         return cached_videos
 
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         if not user.channel or not user.channel.channel_id_youtube: 
             return []
             
@@ -95,7 +96,7 @@ def get_user_videos(user, credentials):
 
 def get_user_playlists(credentials):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         playlists_request = youtube.playlists().list(
             part="snippet,contentDetails,status",
             mine=True,
@@ -150,7 +151,7 @@ def get_single_video(credentials, video_id):
     if cached_data:
         return cached_data
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         request = youtube.videos().list(part="snippet,status,contentDetails", id=video_id)
         response = request.execute()
         if not response.get('items'):
@@ -167,7 +168,7 @@ def get_single_video(credentials, video_id):
 
 def get_single_playlist(credentials, playlist_id):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         request = youtube.playlists().list(part="snippet,status", id=playlist_id)
         response = request.execute()
         if not response.get('items'):
@@ -183,7 +184,7 @@ def get_single_playlist(credentials, playlist_id):
 
 def create_playlist(credentials, title, description, privacy_status):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         body = {
             "snippet": { "title": title, "description": description },
             "status": { "privacyStatus": privacy_status }
@@ -201,7 +202,7 @@ def create_playlist(credentials, title, description, privacy_status):
 
 def update_playlist(credentials, playlist_id, title, description, privacy_status):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         playlist_response = youtube.playlists().list(part='snippet,status', id=playlist_id).execute()
         if not playlist_response.get('items'):
             return {'error': 'Playlist not found.'}
@@ -222,7 +223,7 @@ def update_playlist(credentials, playlist_id, title, description, privacy_status
 
 def update_video_details(credentials, video_id, title, description, tags, privacy_status, publish_at=None):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         video_response = youtube.videos().list(part='snippet,status', id=video_id).execute()
         if not video_response.get('items'): return {'error': 'Video not found.'}
         video = video_response['items'][0]
@@ -245,9 +246,45 @@ def update_video_details(credentials, video_id, title, description, tags, privac
         logging.error(f"Could not update video {video_id}: {e}")
         return {'error': str(e)}
 
+def get_videos_for_edit(credentials, video_ids):
+    """
+    Fetches fresh (uncached) snippet and status for many videos, 50 per API call.
+    Returns a dict of video_id -> video resource, or {'error': ...}.
+    """
+    try:
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
+        videos = {}
+        for i in range(0, len(video_ids), 50):
+            batch_ids = video_ids[i:i+50]
+            response = youtube.videos().list(part="snippet,status", id=",".join(batch_ids)).execute()
+            for item in response.get('items', []):
+                videos[item['id']] = item
+        return videos
+    except HttpError as e:
+        user_id = _get_user_id_from_creds(credentials)
+        logging.error(f"Could not fetch videos for edit: {e}")
+        return _handle_quota_error(e, user_id)
+    except Exception as e:
+        logging.error(f"Could not fetch videos for edit: {e}")
+        return {'error': str(e)}
+
+def update_video_resource(credentials, video):
+    """Writes back an already-fetched video resource without re-reading it first."""
+    try:
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
+        body = {'id': video['id'], 'snippet': video['snippet'], 'status': video['status']}
+        return youtube.videos().update(part="snippet,status", body=body).execute()
+    except HttpError as e:
+        user_id = _get_user_id_from_creds(credentials)
+        logging.error(f"Could not update video {video.get('id')}: {e}")
+        return _handle_quota_error(e, user_id)
+    except Exception as e:
+        logging.error(f"Could not update video {video.get('id')}: {e}")
+        return {'error': str(e)}
+
 def upload_video(credentials, video_filepath, metadata):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         body = {
             "snippet": {
                 "title": metadata.get('title'), "description": metadata.get('description'),
@@ -275,7 +312,7 @@ def upload_video(credentials, video_filepath, metadata):
 
 def set_video_thumbnail(credentials, video_id, image_filepath):
     try:
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build('youtube', 'v3', credentials=credentials, requestBuilder=QuotaCountingHttpRequest)
         mimetype, _ = mimetypes.guess_type(image_filepath)
         with open(image_filepath, 'rb') as file_handle:
             media_body = MediaIoBaseUpload(file_handle, mimetype=mimetype, resumable=True)